@@ -0,0 +1,597 @@
+"""Micro-benchmarks for the simulated file system model.
+
+Run all benchmarks with ``python benchmarks.py`` or pick some by name, e.g.
+``python benchmarks.py allocator``.
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+from datetime import datetime
+
+import file_management_system as fms
+
+
+def _report(label, seconds, operations):
+    per_op_us = seconds / operations * 1e6 if operations else 0.0
+    print(f"  {label:<40} {seconds * 1000:10.1f} ms  {per_op_us:8.2f} us/op")
+
+
+def bench_allocator(block_counts=(1 << 20, 1 << 22), operations=20000):
+    """Allocation/free latency of the bitmap allocator on a fragmented disk"""
+    print("Block allocator")
+    for total_blocks in block_counts:
+        for strategy in (fms.AllocationStrategy.FIRST_FIT, fms.AllocationStrategy.BEST_FIT):
+            rng = random.Random(42)
+            device = fms.BlockDevice(total_blocks, strategy)
+            runs = []
+
+            # Fill the disk to ~70% with a mix of run sizes, then punch holes
+            start_time = time.perf_counter()
+            while device.free_blocks > total_blocks * 0.3:
+                count = rng.randint(1, 64)
+                start = device.allocate(count)
+                if start is None:
+                    break
+                runs.append((start, count))
+            fill_time = time.perf_counter() - start_time
+
+            rng.shuffle(runs)
+            start_time = time.perf_counter()
+            for start, count in runs[:len(runs) // 2]:
+                device.free(start, count)
+            free_time = time.perf_counter() - start_time
+            freed = len(runs) // 2
+            runs = runs[freed:]
+
+            # Steady state: interleaved allocate/free on the fragmented disk
+            start_time = time.perf_counter()
+            for _ in range(operations):
+                count = rng.randint(1, 64)
+                start = device.allocate(count)
+                if start is not None:
+                    runs.append((start, count))
+                index = rng.randrange(len(runs))
+                runs[index], runs[-1] = runs[-1], runs[index]
+                device.free(*runs.pop())
+            steady_time = time.perf_counter() - start_time
+
+            label = f"{total_blocks:>8} blocks {strategy}"
+            _report(f"{label} fill", fill_time, len(runs) + freed)
+            _report(f"{label} free", free_time, freed)
+            _report(f"{label} alloc+free", steady_time, operations)
+
+
+class _DictFile:
+    """Stand-in for the dict-backed File: string timestamps, no interning"""
+
+    def __init__(self, inode, name, allocation, permissions=1):
+        self.inode = inode
+        self.name = name
+        self.start_block = 0
+        self.block_count = 0
+        self.permissions = permissions
+        self.allocation = allocation
+        self.content = ""
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.size_bytes = 0
+        self.parent = None
+        self.original_location = None
+        self.original_parent = None
+
+
+class _DictDirectory:
+    """Stand-in for the dict-backed Directory, with the same name indexes"""
+
+    def __init__(self, inode, name):
+        self.inode = inode
+        self.name = name
+        self.files = []
+        self.subdirectories = []
+        self.file_index = {}
+        self.directory_index = {}
+        self.shadowed_entries = {}
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.parent = None
+        self.original_location = None
+        self.original_parent = None
+
+
+def _build_dict_tree(node_count, files_per_directory):
+    # Same bookkeeping as the real model (inode table, name indexes, parent
+    # pointers) so only the node representation differs
+    inodes = {}
+    root = inodes[1] = _DictDirectory(1, "root")
+    directory = root
+    for i in range(node_count - 1):
+        inode = i + 2
+        if i % (files_per_directory + 1) == 0:
+            directory = inodes[inode] = _DictDirectory(inode, f"dir{i}")
+            root.subdirectories.append(directory)
+            root.directory_index[directory.name] = directory
+            directory.parent = root
+        else:
+            # Strings decoded from a save file are distinct objects per node
+            allocation = "".join(("Contig", "uous"))
+            file = inodes[inode] = _DictFile(inode, f"file{i}.txt", allocation)
+            directory.files.append(file)
+            directory.file_index[file.name] = file
+            file.parent = directory
+    return inodes
+
+
+def _build_slotted_tree(node_count, files_per_directory):
+    root = fms.Directory("root")
+    directory = root
+    for i in range(node_count - 1):
+        if i % (files_per_directory + 1) == 0:
+            directory = fms.Directory(f"dir{i}")
+            root.add_subdirectory(directory)
+        else:
+            allocation = "".join(("Contig", "uous"))
+            directory.add_file(fms.File(f"file{i}.txt", allocation))
+    return root
+
+
+def _measure(build, node_count, files_per_directory):
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    tree = build(node_count, files_per_directory)
+    elapsed = time.perf_counter() - start_time
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return allocated, elapsed
+
+
+def bench_memory(node_count=10 ** 6, files_per_directory=1000):
+    """Bytes per node of the original dict-backed nodes vs the __slots__ nodes"""
+    print(f"Node memory ({node_count} nodes, {files_per_directory} files per directory)")
+    saved_inode_table = fms.inode_table
+    try:
+        before, before_time = _measure(_build_dict_tree, node_count, files_per_directory)
+        fms.inode_table = fms.InodeTable()
+        after, after_time = _measure(_build_slotted_tree, node_count, files_per_directory)
+    finally:
+        fms.inode_table = saved_inode_table
+    print(f"  {'dict-backed nodes':<40} {before / node_count:10.1f} bytes/node  {before_time:6.2f} s")
+    print(f"  {'__slots__ nodes':<40} {after / node_count:10.1f} bytes/node  {after_time:6.2f} s")
+    print(f"  {'saving':<40} {(1 - after / before) * 100:10.1f} %")
+
+
+def bench_append(appends=100000, baseline_appends=10000, line="2025-01-01 12:00 INFO request ok\n"):
+    """Latency of many small appends to one log-style file"""
+    print(f"File append ({len(line)} byte lines)")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.content_index, fms.journal)
+    fms.disk = fms.BlockDevice(1 << 20)
+    fms.inode_table = fms.InodeTable()
+    fms.content_store = fms.ContentStore(os.devnull)
+    fms.content_index = fms.ContentIndex()
+    fms.journal = fms.Journal()
+    try:
+        # Old behaviour: rebuild and re-encode the whole content on every append
+        file = fms.File("baseline.log")
+        start_time = time.perf_counter()
+        for _ in range(baseline_appends):
+            file.set_content(file.content + line)
+        _report(f"set_content(content + line) x{baseline_appends}", time.perf_counter() - start_time, baseline_appends)
+        file.release()
+
+        file = fms.File("chunked.log")
+        start_time = time.perf_counter()
+        for _ in range(appends):
+            file.add_content(line)
+        _report(f"add_content(line) x{appends}", time.perf_counter() - start_time, appends)
+        start_time = time.perf_counter()
+        content = file.content
+        _report("first read (join chunks)", time.perf_counter() - start_time, 1)
+        assert len(content) == appends * len(line) and file.size_bytes == len(content)
+        file.release()
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.content_index, fms.journal) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def bench_copy(file_counts=(1000, 10000), file_size=4096):
+    """Copy-paste of a whole folder (copy-on-write clone)"""
+    print(f"Folder copy ({file_size} byte files)")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.content_index, fms.journal)
+    fms.disk = fms.BlockDevice(1 << 22)
+    fms.inode_table = fms.InodeTable()
+    fms.content_store = fms.ContentStore(os.devnull)
+    fms.content_index = fms.ContentIndex()
+    fms.journal = fms.Journal()
+    try:
+        for file_count in file_counts:
+            folder = fms.Directory("project")
+            for i in range(file_count):
+                file = fms.File(f"file{i}.txt")
+                file.set_content("x" * file_size)
+                folder.add_file(file)
+            used_before = fms.disk.free_blocks
+            start_time = time.perf_counter()
+            copy = folder.clone()
+            _report(f"clone {file_count} files", time.perf_counter() - start_time, file_count)
+            print(f"  {'blocks allocated by the copy':<40} {used_before - fms.disk.free_blocks:10d}")
+            copy.release()
+            folder.release()
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.content_index, fms.journal) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def bench_restore(file_counts=(1000, 10000, 100000)):
+    """Bulk trash restore: cost per item should stay flat as the trash grows"""
+    print("Trash bulk restore")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.journal, fms.root_directories, fms.trash_dir)
+    try:
+        for file_count in file_counts:
+            fms.disk = fms.BlockDevice(1 << 20)
+            fms.inode_table = fms.InodeTable()
+            fms.journal = fms.Journal()
+            folder = fms.Directory("Documents")
+            fms.trash_dir = fms.Directory("Trash")
+            fms.root_directories = [folder, fms.trash_dir]
+            names = [f"file{i}.txt" for i in range(file_count)]
+            for name in names:
+                folder.add_file(fms.File(name))
+            for name in names:
+                folder.delete_file(name)
+            # Newest first: each restore would scan the whole trash if folders were lists
+            start_time = time.perf_counter()
+            for name in reversed(names):
+                fms.trash_dir.restore_file(name)
+            _report(f"restore {file_count} files", time.perf_counter() - start_time, file_count)
+            assert len(folder.files) == file_count and not fms.trash_dir.files
+    finally:
+        (fms.disk, fms.inode_table, fms.journal, fms.root_directories, fms.trash_dir) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def bench_content_search(file_counts=(1000, 10000), words_per_file=200, queries=200):
+    """Content queries through the inverted index vs reading every file"""
+    print(f"Content search ({words_per_file} words per file)")
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.content_index)
+    rng = random.Random(1)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    try:
+        for file_count in file_counts:
+            fms.disk = fms.BlockDevice(1 << 22)
+            fms.inode_table = fms.InodeTable()
+            fms.content_store = fms.ContentStore(os.devnull)
+            fms.content_index = fms.ContentIndex()
+            files = []
+            start_time = time.perf_counter()
+            for i in range(file_count):
+                file = fms.File(f"file{i}.txt")
+                file.set_content(" ".join(rng.choice(vocabulary) for _ in range(words_per_file)))
+                files.append(file)
+            _report(f"{file_count} files: set_content + index", time.perf_counter() - start_time, file_count)
+
+            query_list = [f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}" if i % 2 else rng.choice(vocabulary)
+                          for i in range(queries)]
+            start_time = time.perf_counter()
+            indexed = [len(fms.content_index.search(query)) for query in query_list]
+            _report(f"{file_count} files: indexed query", time.perf_counter() - start_time, queries)
+
+            scan_queries = query_list[:10]
+            start_time = time.perf_counter()
+            scanned = [sum(1 for file in files if set(fms.tokenize(query)) <= set(fms.tokenize(file.content)))
+                       for query in scan_queries]
+            _report(f"{file_count} files: full content scan", time.perf_counter() - start_time, len(scan_queries))
+            assert scanned == indexed[:len(scan_queries)]
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.content_index) = saved_globals
+
+
+def bench_name_search(node_counts=(10 ** 5, 10 ** 6), queries=20):
+    """Recursive name search: prefix glob through the sorted name index vs walking the tree"""
+    print("Name search")
+    saved_globals = (fms.disk, fms.inode_table)
+    try:
+        for node_count in node_counts:
+            fms.disk = fms.BlockDevice(1 << 22)
+            fms.inode_table = fms.InodeTable()
+            roots = _build_snapshot_tree(node_count)
+            start_time = time.perf_counter()
+            fms.inode_table.names.sorted_keys()
+            _report(f"{node_count} nodes: build name index", time.perf_counter() - start_time, 1)
+
+            query_list = [f"file{i * 7919 % node_count}*.py" for i in range(queries)]
+            start_time = time.perf_counter()
+            indexed = []
+            for query in query_list:
+                search = fms.NameSearch(roots[0], query)
+                search.thread.join()
+                indexed.append(len(search.poll()))
+            _report(f"{node_count} nodes: indexed prefix glob", time.perf_counter() - start_time, queries)
+
+            scan_queries = query_list[:3]
+            start_time = time.perf_counter()
+            walked = []
+            for query in scan_queries:
+                match = fms.compile_name_query(query)[0]
+                walked.append(sum(1 for node, parent_inode in fms.iter_tree(roots[:1])
+                                  if node is not roots[0] and match(node.name.casefold())))
+            _report(f"{node_count} nodes: tree walk", time.perf_counter() - start_time, len(scan_queries))
+            assert walked == indexed[:len(scan_queries)]
+
+        # Search-as-you-type in a 10k-entry folder: each keystroke that extends the
+        # query only re-filters the results already shown
+        folder = fms.Directory("Folder")
+        for i in range(10000):
+            folder.add_file(fms.File(f"report_{i:05d}.txt"))
+        typed = "report_0123"
+        search = fms.NameSearch(folder, typed[0])
+        search.thread.join()
+        shown = search.poll()
+        start_time = time.perf_counter()
+        for length in range(2, len(typed) + 1):
+            assert fms.query_narrows(typed[:length - 1], typed[:length])
+            match = fms.compile_name_query(typed[:length])[0]
+            shown = [(node, folded) for node, folded in shown if fms.inode_table.contains(node) and match(folded)
+                     and fms.is_subdirectory_of(node, folder)]
+        _report("10000 entries: refine per keystroke", time.perf_counter() - start_time, len(typed) - 1)
+        assert len(shown) == 10
+    finally:
+        (fms.disk, fms.inode_table) = saved_globals
+
+
+def bench_persist(file_counts=(1000, 10000), renames=200):
+    """Cost of persisting one rename: journal commit vs a full state rewrite"""
+    print("Persisting a rename")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.journal, fms.root_directories)
+    try:
+        for file_count in file_counts:
+            fms.disk = fms.BlockDevice(1 << 20)
+            fms.inode_table = fms.InodeTable()
+            fms.content_store = fms.ContentStore()
+            fms.journal = fms.Journal()
+            folder = fms.Directory("Documents")
+            fms.root_directories = [folder]
+            for i in range(file_count):
+                file = fms.File(f"file{i}.txt")
+                file.set_content(f"file {i}\n" * 50)
+                folder.add_file(file)
+            fms.save_file_system()
+
+            start_time = time.perf_counter()
+            for i in range(renames):
+                folder.rename_file(f"file{i}.txt", f"renamed{i}.txt")
+                fms.journal.commit()
+            _report(f"{file_count} files: rename + journal commit", time.perf_counter() - start_time, renames)
+
+            checkpoints = max(1, renames // 20)
+            start_time = time.perf_counter()
+            for i in range(checkpoints):
+                folder.rename_file(f"renamed{i}.txt", f"file{i}.txt")
+                fms.save_file_system()
+            _report(f"{file_count} files: rename + full save", time.perf_counter() - start_time, checkpoints)
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.journal, fms.root_directories) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def _build_snapshot_tree(node_count, files_per_directory=100):
+    roots = [fms.Directory("Documents"), fms.Directory("Trash")]
+    directory = roots[0]
+    for i in range(node_count - len(roots)):
+        if i % (files_per_directory + 1) == 0:
+            directory = fms.Directory(f"folder{i}")
+            roots[0].add_subdirectory(directory)
+        else:
+            directory.add_file(fms.File(f"file{i}.{('txt', 'py', 'md', 'csv')[i % 4]}"))
+    return roots
+
+
+def bench_snapshot(node_counts=(10 ** 4, 10 ** 5, 10 ** 6)):
+    """Save/load throughput and save memory of the JSON and binary (.fsb) snapshot formats"""
+    print("Snapshot save/load")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.journal,
+                     fms.root_directories, fms.trash_dir, fms.SAVE_FILE_PATH)
+    try:
+        for node_count in node_counts:
+            for path in ("state.json", "state.fsb"):
+                fms.SAVE_FILE_PATH = path
+                fms.disk = fms.BlockDevice(1 << 20)
+                fms.inode_table = fms.InodeTable()
+                fms.content_store = fms.ContentStore()
+                fms.journal = fms.Journal()
+                fms.root_directories = _build_snapshot_tree(node_count)
+                fms.trash_dir = fms.root_directories[-1]
+                gc.collect()
+
+                start_time = time.perf_counter()
+                message = fms.save_file_system()
+                save_time = time.perf_counter() - start_time
+                assert not message.startswith("Error"), message
+                size = os.path.getsize(path)
+
+                # Saving again under tracemalloc shows what the writer holds beyond the tree itself
+                tracemalloc.start()
+                fms.write_snapshot(path + ".peak", {}, fms.content_store.to_dict(),
+                                   fms.snapshot_records(fms.root_directories), fms.snapshot_format(path))
+                save_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                os.remove(path + ".peak")
+
+                fms.root_directories = None
+                gc.collect()
+                start_time = time.perf_counter()
+                message = fms.load_file_system()
+                load_time = time.perf_counter() - start_time
+                assert not message.startswith("Error"), message
+                assert len(fms.inode_table.nodes) == node_count
+
+                label = f"{node_count:>8} nodes {fms.snapshot_format(path):<6}"
+                print(f"  {label} save {save_time:7.2f} s ({node_count / save_time:9.0f} nodes/s)  "
+                      f"load {load_time:7.2f} s ({node_count / load_time:9.0f} nodes/s)  "
+                      f"{size / node_count:6.1f} bytes/node  save peak {save_peak / 1e6:7.1f} MB")
+                os.remove(path)
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.journal,
+         fms.root_directories, fms.trash_dir, fms.SAVE_FILE_PATH) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def bench_checkpoint(node_counts=(10 ** 5, 10 ** 6)):
+    """How long a checkpoint blocks the UI thread when written inline vs in the background"""
+    print("Checkpoint UI stall")
+    saved_cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    saved_globals = (fms.disk, fms.inode_table, fms.content_store, fms.journal, fms.root_directories)
+    try:
+        for node_count in node_counts:
+            fms.disk = fms.BlockDevice(1 << 20)
+            fms.inode_table = fms.InodeTable()
+            fms.content_store = fms.ContentStore()
+            fms.journal = fms.Journal()
+            fms.root_directories = _build_snapshot_tree(node_count)
+            gc.collect()
+
+            start_time = time.perf_counter()
+            message = fms.save_file_system()
+            inline_time = time.perf_counter() - start_time
+            assert not message.startswith("Error"), message
+
+            # The UI thread blocks while the snapshot is taken, then keeps
+            # running 1 ms ticks while the worker writes; the longest gap
+            # between ticks is what a user would notice
+            writer = fms.CheckpointWriter()
+            start_time = time.perf_counter()
+            writer.start()
+            stall = time.perf_counter() - start_time
+            longest_tick = 0.0
+            while writer.busy:
+                tick_start = time.perf_counter()
+                time.sleep(0.001)
+                message = writer.poll()
+                longest_tick = max(longest_tick, time.perf_counter() - tick_start)
+            assert not message.startswith("Error"), message
+
+            print(f"  {node_count:>8} nodes  inline save blocks {inline_time * 1000:8.0f} ms  "
+                  f"background: snapshot blocks {stall * 1000:6.0f} ms, "
+                  f"write {writer.write_seconds * 1000:6.0f} ms, longest UI tick {longest_tick * 1000:4.0f} ms")
+    finally:
+        (fms.disk, fms.inode_table, fms.content_store, fms.journal, fms.root_directories) = saved_globals
+        os.chdir(saved_cwd)
+
+
+def _widget_icon_item(parent, name):
+    """The per-item widgets the icon view used to build: a Frame, two Labels and nine bindings"""
+    frame = tk.Frame(parent, width=fms.ICON_ITEM_WIDTH, height=fms.ICON_ITEM_HEIGHT, bg="#2e2e2e")
+    frame.pack_propagate(False)
+    icon_label = tk.Label(frame, text="📄", font=("Arial", 56), bg="#2e2e2e", fg="white")
+    icon_label.pack(pady=(12, 8))
+    name_label = tk.Label(frame, text=name, font=("Arial", 11), wraplength=110, bg="#2e2e2e", fg="white")
+    name_label.pack(pady=(0, 12), fill=tk.X)
+    for widget in (frame, icon_label, name_label):
+        widget.bind("<Double-Button-1>", lambda e: "break")
+        widget.bind("<Button-3>", lambda e: "break")
+        widget.bind("<Button-1>", lambda e: "break")
+    return frame
+
+
+def bench_icon_render(item_counts=(1000, 10000, 100000), scroll_steps=200):
+    """Opening a folder in the icon view: a widget per item vs the single-canvas renderer"""
+    print("Icon view rendering")
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"  skipped: no display ({e})")
+        return
+    root.geometry("1200x900")
+    saved_globals = (fms.disk, fms.inode_table)
+    try:
+        for item_count in item_counts:
+            fms.disk = fms.BlockDevice(1 << 22)
+            fms.inode_table = fms.InodeTable()
+            folder = fms.Directory("Folder")
+            for i in range(item_count):
+                folder.add_file(fms.File(f"file{i}.txt"))
+            rows = folder.entries()
+
+            frame = tk.Frame(root, bg="#2e2e2e")
+            frame.pack(fill=tk.BOTH, expand=True)
+            root.update()
+            columns = max(1, frame.winfo_width() // fms.ICON_CELL_WIDTH)
+            start_time = time.perf_counter()
+            items = []
+            for i, node in enumerate(rows):
+                item = _widget_icon_item(frame, node.name)
+                item.grid(row=i // columns, column=i % columns, padx=25, pady=25)
+                items.append(item)
+            root.update_idletasks()
+            _report(f"{item_count} items: widgets, open", time.perf_counter() - start_time, item_count)
+            start_time = time.perf_counter()
+            frame.destroy()
+            root.update_idletasks()
+            _report(f"{item_count} items: widgets, destroy", time.perf_counter() - start_time, item_count)
+
+            canvas = tk.Canvas(root, bg="#2e2e2e", highlightthickness=0)
+            canvas.pack(fill=tk.BOTH, expand=True)
+            root.update()
+            renderer = fms.IconGridRenderer(canvas, lambda node: (None, "📄"), lambda node: node.name)
+            start_time = time.perf_counter()
+            renderer.set_rows(rows)
+            root.update_idletasks()
+            _report(f"{item_count} items: canvas, open", time.perf_counter() - start_time, item_count)
+            start_time = time.perf_counter()
+            for step in range(scroll_steps):
+                canvas.yview_moveto(step / scroll_steps)
+                renderer.render()
+                root.update_idletasks()
+            _report(f"{item_count} items: canvas, scroll step", time.perf_counter() - start_time, scroll_steps)
+            start_time = time.perf_counter()
+            renderer.set_rows(rows)
+            renderer.set_highlight(0, True)
+            root.update_idletasks()
+            _report(f"{item_count} items: canvas, refresh", time.perf_counter() - start_time, 1)
+            canvas.destroy()
+    finally:
+        (fms.disk, fms.inode_table) = saved_globals
+        root.destroy()
+
+
+BENCHMARKS = {
+    "allocator": bench_allocator,
+    "memory": bench_memory,
+    "append": bench_append,
+    "copy": bench_copy,
+    "restore": bench_restore,
+    "content_search": bench_content_search,
+    "name_search": bench_name_search,
+    "icon_render": bench_icon_render,
+    "persist": bench_persist,
+    "snapshot": bench_snapshot,
+    "checkpoint": bench_checkpoint,
+}
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            return 1
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,14 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox, font
 from datetime import datetime
-import random
+import bisect
+import fnmatch
+import hashlib
+import heapq
+import itertools
 import json
 import os
-import copy
 import platform
+import queue
+import re
+import struct
 import sys
 import subprocess
 import tempfile
+import threading
+import time
 import webbrowser
 
 # Initialize TTKBOOTSTRAP_AVAILABLE first
@@ -38,8 +46,40 @@ except ImportError:
 # Constants
 MAX_FILES = 100
 MAX_DIRS = 50
-MAX_BLOCKS = 1000
-SAVE_FILE_PATH = "file_system_state.json"
+MAX_BLOCKS = 65536  # Simulated disk size in blocks (32 MB at 512 bytes per block)
+BLOCK_SIZE = 512
+CHUNK_SIZE = 4096  # Characters per content-store chunk
+SAVE_FILE_PATH = "file_system_state.json"  # Use a .fsb extension for the binary snapshot format
+BLOB_FILE_PATH = "file_system_content.blob"  # Append-only file content, referenced by offset from the state file
+JOURNAL_FILE_PATH = "file_system_journal.jsonl"  # Operations made since the last checkpoint
+INDEX_FILE_PATH = "file_system_index.json"  # Full-text index of file content, written with each checkpoint
+JOURNAL_COMMIT_INTERVAL_MS = 1000  # Group commit: pending operations are written together
+JOURNAL_CHECKPOINT_BYTES = 1 << 20  # Rewrite the state file once the journal grows past this
+# Checkpoint scheduling: nothing is written while the tree is clean; after
+# changes a checkpoint is written at most every AUTOSAVE_MIN_INTERVAL_MS and at
+# least every AUTOSAVE_MAX_INTERVAL_MS, sooner than the max once
+# AUTOSAVE_BURST_OPERATIONS operations (or JOURNAL_CHECKPOINT_BYTES) have piled up
+AUTOSAVE_MIN_INTERVAL_MS = 10000
+AUTOSAVE_MAX_INTERVAL_MS = 300000
+AUTOSAVE_BURST_OPERATIONS = 200
+CHECKPOINT_POLL_MS = 100  # How often the UI checks on a checkpoint being written in the background
+SEARCH_BATCH_SIZE = 200  # Name search matches are handed to the UI this many at a time
+SEARCH_POLL_MS = 50
+SEARCH_DEBOUNCE_MS = 150  # Typing pause before the name search runs
+ICON_ITEM_WIDTH = 120
+ICON_ITEM_HEIGHT = 140
+ICON_CELL_WIDTH = ICON_ITEM_WIDTH + 50  # Each icon has 25 px of padding on every side
+ICON_CELL_HEIGHT = ICON_ITEM_HEIGHT + 50
+ICON_SELECTION_COLOR = "#0078d4"  # Windows-style blue selection
+SELECTION_FRAME_MS = 16  # Rubber-band selection redraws at most once per frame while dragging
+# Trash budget: entries older than TRASH_MAX_AGE_DAYS are purged, and while the
+# trash holds more than TRASH_MAX_BYTES or TRASH_MAX_ITEMS entries are purged
+# "oldest" first or "largest" first, at most TRASH_PURGE_BATCH per autosave tick
+TRASH_MAX_BYTES = 8 << 20
+TRASH_MAX_ITEMS = 1000
+TRASH_MAX_AGE_DAYS = 30
+TRASH_EVICTION_POLICY = "oldest"
+TRASH_PURGE_BATCH = 50
  
 
 # Allocation & Role Definitions
@@ -52,11 +92,194 @@ class UserRole:
     USER = "USER"
     ADMIN = "ADMIN"
 
+class AllocationStrategy:
+    FIRST_FIT = "first_fit"
+    BEST_FIT = "best_fit"
+
+
+# Simulated block device
+class BlockDevice:
+    """Simulated disk that hands out contiguous block runs from a free-space bitmap.
+
+    The bitmap keeps one byte per block (0 = free, 1 = used) so runs can be
+    checked and located with bytearray.find, which scans in C. Alongside it we
+    keep an index of free extents (sorted by length, plus start/end lookups for
+    coalescing) so best-fit doesn't have to walk every free run. Block 0 is
+    reserved, so start_block == 0 means "no blocks allocated".
+
+    Runs can be shared copy-on-write between copies of a file: run_refs counts
+    the owners of each shared run, and free/resize only touch the blocks once
+    the last owner lets go.
+    """
+
+    def __init__(self, total_blocks=MAX_BLOCKS, strategy=AllocationStrategy.FIRST_FIT):
+        if total_blocks < 2:
+            raise ValueError("A block device needs at least 2 blocks.")
+        self.total_blocks = total_blocks
+        self.strategy = strategy
+        self.bitmap = bytearray(total_blocks)
+        self.bitmap[0] = 1  # Reserved
+        self.free_blocks = total_blocks - 1
+        self.first_free_hint = 1  # No free block exists below this one
+
+        # Free extent index: (length, start) sorted, start -> length, end -> start
+        self.extents_by_size = []
+        self.extent_at_start = {}
+        self.extent_at_end = {}
+        self._add_extent(1, total_blocks - 1)
+
+        self.run_refs = {}  # start -> owner count, only for shared runs
+
+    def is_free(self, start, count):
+        """Check whether every block in [start, start + count) is free"""
+        if start < 1 or start + count > self.total_blocks:
+            return False
+        return self.bitmap.find(1, start, start + count) == -1
+
+    def allocate(self, count):
+        """Allocate a contiguous run of blocks, returning its start block or None"""
+        if count <= 0:
+            return 0
+        if count > self.free_blocks:
+            return None
+
+        if self.strategy == AllocationStrategy.BEST_FIT:
+            start = self._find_best_fit(count)
+        else:
+            start = self._find_first_fit(count)
+
+        if start is None:
+            return None
+        self._claim(start, count)
+        return start
+
+    def share(self, start):
+        """Add an owner to a run (copy-on-write copy of a file)"""
+        if start > 0:
+            self.run_refs[start] = self.run_refs.get(start, 1) + 1
+
+    def is_shared(self, start):
+        return start in self.run_refs
+
+    def _drop_ref(self, start):
+        owners = self.run_refs.pop(start) - 1
+        if owners > 1:
+            self.run_refs[start] = owners
+
+    def free(self, start, count):
+        """Return a run of blocks to the free pool, merging it with free neighbours"""
+        if count <= 0 or start < 1:
+            return
+        if start in self.run_refs:
+            # Other copies still own the run
+            self._drop_ref(start)
+            return
+        self.bitmap[start:start + count] = bytes(count)
+        self.free_blocks += count
+        if start < self.first_free_hint:
+            self.first_free_hint = start
+
+        end = start + count
+        left_start = self.extent_at_end.get(start)
+        if left_start is not None:
+            self._remove_extent(left_start, start - left_start)
+            start = left_start
+        right_length = self.extent_at_start.get(end)
+        if right_length is not None:
+            self._remove_extent(end, right_length)
+            end += right_length
+        self._add_extent(start, end - start)
+
+    def reserve(self, start, count):
+        """Mark a specific run as used (used when loading saved state)"""
+        if count <= 0:
+            return True
+        if not self.is_free(start, count):
+            return False
+        self._claim(start, count)
+        return True
+
+    def resize(self, start, old_count, new_count):
+        """Grow or shrink a run, moving it only when it can't grow in place.
+
+        Returns the (possibly new) start block, or None if no run is large enough;
+        in that case the original run is left untouched. A shared run is never
+        changed in place: the writer gets a run of its own (copy-on-write).
+        """
+        if start in self.run_refs:
+            new_start = self.allocate(new_count)
+            if new_start is not None:
+                self._drop_ref(start)
+            return new_start
+
+        if new_count <= old_count:
+            self.free(start + new_count, old_count - new_count)
+            return start if new_count > 0 else 0
+
+        extra = new_count - old_count
+        if self.is_free(start + old_count, extra):
+            self._claim(start + old_count, extra)
+            return start
+
+        # Relocate: release the old run first so it can be part of the new one
+        self.free(start, old_count)
+        new_start = self.allocate(new_count)
+        if new_start is None:
+            self._claim(start, old_count)
+        return new_start
+
+    def _claim(self, start, count):
+        """Mark a free run as used and carve it out of the extent that holds it"""
+        extent_start = self.bitmap.rfind(1, 0, start) + 1
+        extent_length = self.extent_at_start[extent_start]
+        self._remove_extent(extent_start, extent_length)
+        if start > extent_start:
+            self._add_extent(extent_start, start - extent_start)
+        extent_end = extent_start + extent_length
+        if start + count < extent_end:
+            self._add_extent(start + count, extent_end - start - count)
+
+        self.bitmap[start:start + count] = b'\x01' * count
+        self.free_blocks -= count
+        if start == self.first_free_hint:
+            self.first_free_hint = start + count
+
+    def _add_extent(self, start, length):
+        bisect.insort(self.extents_by_size, (length, start))
+        self.extent_at_start[start] = length
+        self.extent_at_end[start + length] = start
+
+    def _remove_extent(self, start, length):
+        index = bisect.bisect_left(self.extents_by_size, (length, start))
+        del self.extents_by_size[index]
+        del self.extent_at_start[start]
+        del self.extent_at_end[start + length]
+
+    def _find_first_fit(self, count):
+        hint = self.bitmap.find(0, self.first_free_hint)
+        if hint == -1:
+            return None
+        self.first_free_hint = hint
+        start = self.bitmap.find(bytes(count), hint)
+        return start if start != -1 else None
+
+    def _find_best_fit(self, count):
+        index = bisect.bisect_left(self.extents_by_size, (count, 0))
+        if index == len(self.extents_by_size):
+            return None
+        return self.extents_by_size[index][1]
+
+    def get_usage_display(self):
+        """Get human-readable disk usage"""
+        used = self.total_blocks - 1 - self.free_blocks
+        return f"{used}/{self.total_blocks - 1} blocks used"
+
 
 user_list = [
     {"username": "admin", "role": UserRole.ADMIN}
 ]
 current_user = {"username": "admin", "role": UserRole.ADMIN}
+users_dirty = False  # Set when users change; cleared by a checkpoint
 
 
 # Clipboard for cut/copy/paste operations
@@ -66,70 +289,727 @@ clipboard = {
     "source_directory": None  # Source directory for cut operations
 }
 
+# Inode table
+class InodeTable:
+    """Maps stable inode numbers to live File/Directory objects for O(1) lookup"""
+
+    def __init__(self):
+        self.nodes = {}
+        self.next_inode = 1
+        self.names = NameIndex(self)
+
+    def register(self, node, inode=None):
+        """Give node an inode number, reusing the requested one when it's free"""
+        if inode is None or inode in self.nodes:
+            inode = self.next_inode
+        self.nodes[inode] = node
+        self.next_inode = max(self.next_inode, inode + 1)
+        self.names.changed(node.name, inode, True)
+        return inode
+
+    def unregister(self, node):
+        if self.nodes.get(node.inode) is node:
+            del self.nodes[node.inode]
+            self.names.changed(node.name, node.inode, False)
+
+    def get(self, inode):
+        return self.nodes.get(inode)
+
+    def contains(self, node):
+        """Check that node is still live (not permanently deleted)"""
+        return node is not None and self.nodes.get(node.inode) is node
+
+
+class NameIndex:
+    """Every live node's case-folded name in sorted order, for prefix lookups without a tree walk.
+
+    Built on first use from the inode table: start_build() captures the
+    names on the UI thread and build() sorts them, on a worker thread for a
+    search. Changes made after the capture are queued and merged into a new
+    sorted list when it's next asked for, so a list handed out is never
+    modified and can be read on another thread. Merging is idempotent, so
+    changes a later capture already saw can be applied again.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.keys = None   # Sorted [(case-folded name, inode)], or None until first used
+        self.pending = []  # (case-folded name, inode, added) since the names keys was built from were captured
+        self.building = False  # Names were captured and changes are being queued
+        self.built = None  # Keys a worker finished building, adopted by ready() on the UI thread
+
+    def changed(self, name, inode, added):
+        if self.keys is not None or self.building:
+            self.pending.append((name.casefold(), inode, added))
+
+    def start_build(self):
+        """Capture every node's name for build(); changes from now on are queued"""
+        self.building = True
+        return [(node.name, inode) for inode, node in self.table.nodes.items()]
+
+    def build(self, names):
+        """Sort names captured by start_build() into keys; safe on any thread. Returns the keys."""
+        keys = sorted((name.casefold(), inode) for name, inode in names)
+        self.built = keys
+        return keys
+
+    def ready(self):
+        """Whether the sorted keys exist, adopting keys built on another thread"""
+        built = self.built
+        if self.keys is None and built is not None:
+            self.keys = built
+            self.building = False
+        self.built = None
+        return self.keys is not None
+
+    def rename(self, node, new_name):
+        self.changed(node.name, node.inode, False)
+        self.changed(new_name, node.inode, True)
+
+    def sorted_keys(self):
+        if not self.ready():
+            self.keys = self.build(self.start_build())
+            self.building = False
+            self.built = None
+        if self.pending:
+            if len(self.pending) * 64 > len(self.keys):
+                live = set(self.keys)
+                for name, inode, added in self.pending:
+                    if added:
+                        live.add((name, inode))
+                    else:
+                        live.discard((name, inode))
+                keys = sorted(live)
+            else:
+                keys = self.keys[:]
+                for name, inode, added in self.pending:
+                    index = bisect.bisect_left(keys, (name, inode))
+                    present = index < len(keys) and keys[index] == (name, inode)
+                    if added and not present:
+                        keys.insert(index, (name, inode))
+                    elif not added and present:
+                        del keys[index]
+            self.keys = keys
+            self.pending = []
+        return self.keys
+
+    @staticmethod
+    def prefix_range(keys, prefix):
+        """Indexes of the keys whose name starts with prefix"""
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + "\U0010ffff",), start)
+        return start, end
+
+
+class TrashOrder:
+    """The trash entries oldest first and largest first, so purge_trash can tell
+    in O(1) whether anything is due and pick its victims without a scan.
+
+    Entries are pushed onto both heaps when they land in the tracked trash
+    directory (Directory.add_*) and again when their size changes there
+    (update_totals, File.update_size_and_allocation). Heap items are dropped
+    lazily once they reach the top after their entry left Trash or was pushed
+    again.
+    """
+
+    def __init__(self):
+        self.directory = None  # The trash directory the heaps describe
+        self.oldest = []       # (trashed_at, seq, entry); never stamped sorts last
+        self.largest = []      # (-size, seq, entry)
+        self.seqs = {}         # entry -> seq of its latest push
+        self.seq = 0
+
+    def track(self, directory):
+        """Follow directory, rebuilding after a load replaced Trash or when stale items pile up"""
+        live = len(directory.files) + len(directory.subdirectories)
+        stale = max(len(self.oldest), len(self.largest)) - live
+        if directory is not self.directory or stale > live + TRASH_PURGE_BATCH:
+            self.directory = directory
+            self.oldest, self.largest, self.seqs = [], [], {}
+            for entry in itertools.chain(directory.files, directory.subdirectories):
+                self.push(entry)
+        return self
+
+    def holds(self, entry):
+        """Whether entry is still in the tracked trash (empty_trash leaves parent links behind)"""
+        entries = self.directory.subdirectories if isinstance(entry, Directory) else self.directory.files
+        return entry in entries
+
+    def push(self, entry):
+        self.seq += 1
+        self.seqs[entry] = self.seq
+        heapq.heappush(self.oldest, (_trash_age_key(entry), self.seq, entry))
+        heapq.heappush(self.largest, (_trash_size_key(entry), self.seq, entry))
+
+    def peek(self, heap):
+        """The entry on top of self.oldest or self.largest, or None"""
+        while heap:
+            seq, entry = heap[0][1:]
+            if self.seqs.get(entry) == seq and self.holds(entry):
+                return entry
+            heapq.heappop(heap)
+            if self.seqs.get(entry) == seq:
+                del self.seqs[entry]
+        return None
+
+    def pop(self, heap):
+        """Take the top entry off both heaps (push it again to put it back)"""
+        entry = self.peek(heap)
+        if entry is not None:
+            heapq.heappop(heap)
+            del self.seqs[entry]
+        return entry
+
+
+# Compact node helpers: timestamps are stored as integer epoch seconds and
+# the small set of repeated strings (allocation, extension, trash location)
+# is interned so every node shares one copy
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+def current_timestamp():
+    """Now, or the time an operation originally ran while the journal replays it"""
+    return journal.replay_time or int(time.time())
+
+def format_timestamp(timestamp):
+    """Format an integer timestamp for display"""
+    return datetime.fromtimestamp(timestamp).strftime(TIMESTAMP_FORMAT)
+
+def parse_timestamp(value):
+    """Accept an integer timestamp or the formatted string used by older saves"""
+    if isinstance(value, str):
+        return int(datetime.strptime(value, TIMESTAMP_FORMAT).timestamp())
+    return int(value)
+
+def file_extension(name):
+    """Lower-case extension of a file name ('' if it has none), interned"""
+    _, dot, extension = name.rpartition(".")
+    return sys.intern(extension.lower()) if dot else ""
+
+def trashed_time(original_location, trashed_at):
+    """Saved trash time of a loaded entry; entries trashed by older versions count from now"""
+    if original_location is None:
+        return None
+    return trashed_at if trashed_at is not None else current_timestamp()
+
+def intern_optional(value):
+    return sys.intern(value) if value is not None else None
+
+def format_size(size_bytes):
+    """Human-readable byte count"""
+    if size_bytes == 0:
+        return "0 bytes"
+    elif size_bytes < 1024:
+        return f"{size_bytes} bytes"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    else:
+        return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+# Content-addressed content store
+class ContentStore:
+    """Deduplicated, reference-counted store for file content.
+
+    Content is split into CHUNK_SIZE-character chunks keyed by a hash of their
+    UTF-8 bytes. Files hold a tuple of chunk keys, so identical files (and
+    identical chunks within files) are stored once however many copies exist.
+
+    Saved chunks live in an append-only blob file and only their offsets are
+    kept in memory; their text is read back with a seek when a file is opened.
+    Chunks written since the last save are held in memory until flush().
+    Compaction writes a new blob file rather than rewriting this one, since
+    the last checkpoint still points into it; the old file is only deleted
+    once a checkpoint naming the new one is on disk.
+    """
+
+    def __init__(self, blob_path=BLOB_FILE_PATH):
+        self.chunks = {}  # key -> [text or None, byte_length, refs, blob offset or None]
+        self.stored_bytes = 0      # bytes of unique chunks
+        self.referenced_bytes = 0  # bytes as seen by files (before dedup)
+        self.retired = []  # Blob files replaced by compaction, deleted after the next checkpoint
+        self.use_blob(blob_path)
+
+    def use_blob(self, blob_path):
+        """Read saved chunks from blob_path (the blob a snapshot was written against)"""
+        self.blob_path = blob_path
+        self.blob_size = os.path.getsize(blob_path) if os.path.exists(blob_path) else 0
+
+    def put(self, text):
+        """Store text and return its chunk keys, with a reference taken on each"""
+        return tuple(self._put_chunk(text[i:i + CHUNK_SIZE]) for i in range(0, len(text), CHUNK_SIZE))
+
+    def _put_chunk(self, text):
+        data = text.encode('utf-8')
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        entry = self.chunks.get(key)
+        if entry is None:
+            entry = self.chunks[key] = [text, len(data), 0, None]
+            self.stored_bytes += len(data)
+        entry[2] += 1
+        self.referenced_bytes += entry[1]
+        return key
+
+    def acquire(self, keys):
+        """Take another reference on each chunk (a copy of a file)"""
+        for key in keys:
+            entry = self.chunks[key]
+            entry[2] += 1
+            self.referenced_bytes += entry[1]
+
+    def release(self, keys):
+        """Drop a reference on each chunk, discarding chunks nothing refers to"""
+        for key in keys:
+            entry = self.chunks[key]
+            entry[2] -= 1
+            self.referenced_bytes -= entry[1]
+            if entry[2] == 0:
+                del self.chunks[key]
+                self.stored_bytes -= entry[1]
+
+    def read(self, keys):
+        return "".join(self._read_chunks(keys))
+
+    def _read_chunks(self, keys):
+        entries = [self.chunks[key] for key in keys]
+        if all(entry[0] is not None for entry in entries):
+            return [entry[0] for entry in entries]
+        return read_blob_chunks(self.blob_path, [(entry[0], entry[1], entry[3]) for entry in entries])
+
+    def size(self, keys):
+        return sum(self.chunks[key][1] for key in keys)
+
+    def chunk_text(self, key):
+        return self._read_chunks((key,))[0]
+
+    def start_flush(self):
+        """Plan writing the chunks not yet on disk, without touching the blob file.
+
+        Only copies the chunk table, so it's cheap enough for the UI thread;
+        the returned BlobFlush does the file I/O in write() on any thread and
+        finish_flush() applies its result. The blob is rewritten without dead
+        chunks once they take up more space than the live ones.
+        """
+        compact = self.blob_size - self.stored_bytes > max(self.stored_bytes, 1 << 20)
+        return BlobFlush(self, compact)
+
+    def finish_flush(self, blob_flush):
+        """Record where a written BlobFlush put its chunks and drop their text from memory"""
+        for key, entry, _, _, _ in blob_flush.entries:
+            offset = blob_flush.offsets.get(key)
+            if offset is not None and self.chunks.get(key) is entry:
+                entry[0] = None
+                entry[3] = offset
+        if blob_flush.blob_path != self.blob_path:
+            # The last checkpoint may still point into the old blob
+            self.retired.append(self.blob_path)
+            self.blob_path = blob_flush.blob_path
+        self.blob_size = blob_flush.blob_size
+
+    def flush(self):
+        """Write the chunks not yet on disk to the blob file, compacting it if due"""
+        self.finish_flush(self.start_flush().write())
+
+    def append_pending(self):
+        """Append chunks not yet on disk to the blob file; saved chunks keep their offsets"""
+        self.finish_flush(BlobFlush(self, compact=False).write())
+
+    def forget_retired(self, paths):
+        """Called once a checkpoint that deleted paths is on disk"""
+        self.retired = [path for path in self.retired if path not in paths]
+
+    def get_dedup_ratio(self):
+        return self.referenced_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    def get_dedup_display(self):
+        """Get human-readable dedup summary"""
+        return (f"{format_size(self.stored_bytes)} stored for {format_size(self.referenced_bytes)} "
+                f"of content ({self.get_dedup_ratio():.2f}x dedup)")
+
+    def to_dict(self):
+        """Blob offset and length of every chunk (call flush() first)"""
+        return {key: [entry[3], entry[1]] for key, entry in self.chunks.items()}
+
+    def load(self, data):
+        """Load saved chunk locations with no references; files take theirs as they load"""
+        for key, value in data.items():
+            if isinstance(value, str):
+                # Older saves kept chunk text inline
+                byte_length = len(value.encode('utf-8'))
+                self.chunks[key] = [value, byte_length, 0, None]
+                self.stored_bytes += byte_length
+            else:
+                self.add_saved_chunk(key, *value)
+
+    def add_saved_chunk(self, key, offset, byte_length):
+        self.chunks[key] = [None, byte_length, 0, offset]
+        self.stored_bytes += byte_length
+
+    def discard_unreferenced(self):
+        for key in [key for key, entry in self.chunks.items() if entry[2] == 0]:
+            self.stored_bytes -= self.chunks.pop(key)[1]
+
+
+def read_blob_chunks(path, chunks):
+    """Texts of (text or None, byte length, blob offset) chunks, reading the missing ones from path"""
+    if all(text is not None for text, _, _ in chunks):
+        return [text for text, _, _ in chunks]
+    texts = []
+    try:
+        with open(path, 'rb') as blob:
+            for text, byte_length, offset in chunks:
+                if text is None:
+                    blob.seek(offset)
+                    data = blob.read(byte_length)
+                    if len(data) != byte_length:
+                        raise OSError(f"chunk at offset {offset} is cut short")
+                    text = data.decode('utf-8')
+                texts.append(text)
+    except (OSError, UnicodeDecodeError) as e:
+        # Never pass missing or corrupt content off as an empty file
+        raise OSError(f"Error reading content from {path}: {e}") from e
+    return texts
+
+
+class BlobFlush:
+    """A detached plan for writing a ContentStore's unsaved chunks (see ContentStore.start_flush()).
+
+    write() appends the unsaved chunks to the blob, or for a compaction copies
+    every live chunk into a new blob file, and fsyncs it; it reads only the
+    copy of the chunk table taken here, so it can run on a worker thread.
+    Afterwards chunks is the table a snapshot records and blob_path the blob
+    it points into.
+    """
+
+    def __init__(self, store, compact, new_path=None):
+        self.path = store.blob_path
+        self.start = store.blob_size
+        self.compact = compact
+        self.new_path = new_path  # Where a compaction writes; next_blob_path() of the blob by default
+        # (key, entry, text or None, byte length, blob offset or None); entry
+        # identity tells finish_flush() whether the chunk was dropped and re-added since
+        self.entries = [(key, entry, entry[0], entry[1], entry[3]) for key, entry in store.chunks.items()]
+        self.offsets = {}  # key -> offset of chunks this flush wrote
+        self.chunks = None
+        self.blob_path = self.path
+        self.blob_size = self.start
+
+    def write(self):
+        if self.compact:
+            try:
+                self._compact()
+                return self
+            except OSError as e:
+                if self.new_path is not None:
+                    raise  # A copy into a given file must not fall back to appending to this blob
+                # The old blob stays in use, so nothing is lost by appending instead
+                print(f"Warning: blob compaction skipped: {e}")
+                self.offsets = {}
+        self._append()
+        return self
+
+    def _append(self):
+        offset = self.start
+        pending = [(key, text, byte_length) for key, _, text, byte_length, saved in self.entries if saved is None]
+        if pending:
+            # Write at the recorded end, over anything a failed earlier flush left behind
+            with open(self.path, 'r+b' if os.path.exists(self.path) else 'wb') as blob:
+                blob.seek(offset)
+                for key, text, byte_length in pending:
+                    blob.write(text.encode('utf-8'))
+                    self.offsets[key] = offset
+                    offset += byte_length
+                blob.truncate()
+                # The checkpoint that follows records these offsets, and the
+                # journal holding the text is dropped once it's written
+                blob.flush()
+                os.fsync(blob.fileno())
+        self.blob_size = offset
+        self.chunks = {key: [self.offsets.get(key, saved), byte_length]
+                       for key, _, _, byte_length, saved in self.entries}
+
+    def _compact(self):
+        """Copy every live chunk into a new blob file.
+
+        Raises OSError, leaving the current blob in use, if any chunk can't be
+        read or the new file can't be written in full.
+        """
+        new_path = self.new_path or next_blob_path(self.path)
+        texts = read_blob_chunks(self.path, [(text, byte_length, saved)
+                                             for _, _, text, byte_length, saved in self.entries])
+        offsets = {}
+        try:
+            with open(new_path, 'wb') as blob:
+                for (key, _, _, _, _), text in zip(self.entries, texts):
+                    offsets[key] = blob.tell()
+                    blob.write(text.encode('utf-8'))
+                blob_size = blob.tell()
+                blob.flush()
+                os.fsync(blob.fileno())
+        except OSError:
+            if os.path.exists(new_path):
+                os.remove(new_path)
+            raise
+        self.offsets = offsets
+        self.blob_path = new_path
+        self.blob_size = blob_size
+        self.chunks = {key: [offsets[key], byte_length] for key, _, _, byte_length, _ in self.entries}
+
+
+def next_blob_path(path):
+    """The blob file compaction writes after path: content.blob -> content.1.blob -> content.2.blob"""
+    root, extension = os.path.splitext(path)
+    stem, dot, generation = root.rpartition(".")
+    if dot and generation.isdigit():
+        return f"{stem}.{int(generation) + 1}{extension}"
+    return f"{root}.1{extension}"
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def trailing_word_start(text):
+    """Index where the word text ends with begins, scanning back from the end only"""
+    start = len(text)
+    while start and (text[start - 1].isalnum() or text[start - 1] == "_"):
+        start -= 1
+    return start
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+class ContentIndex:
+    """Inverted index from lower-cased words to the inodes of files containing them.
+
+    Each file's word counts are kept so a rewrite or an append only touches
+    the words that changed. Count dicts are never modified in place, only
+    replaced, so copy-on-write copies can share them and a checkpoint can
+    take a shallow copy of the index.
+    """
+
+    def __init__(self):
+        self.postings = {}     # word -> set of inodes
+        self.file_words = {}   # inode -> {word: count}
+
+    def set_text(self, file, text):
+        counts = {}
+        for word in tokenize(text):
+            counts[word] = counts.get(word, 0) + 1
+        self._replace(file.inode, counts)
+
+    def append_text(self, file, trailing_word, appended):
+        """Index text appended after a file whose content ended with trailing_word (or '')"""
+        counts = dict(self.file_words.get(file.inode, {}))
+        # The appended text may continue the last word, so that word is re-counted
+        for word in tokenize(trailing_word):
+            if counts.get(word, 0) > 1:
+                counts[word] -= 1
+            else:
+                counts.pop(word, None)
+        for word in tokenize(trailing_word + appended):
+            counts[word] = counts.get(word, 0) + 1
+        self._replace(file.inode, counts)
+
+    def share(self, source, copy):
+        """Index a copy-on-write copy with the words of its source"""
+        self._replace(copy.inode, self.file_words.get(source.inode, {}))
+
+    def remove(self, file):
+        self._replace(file.inode, {})
+
+    def _replace(self, inode, counts):
+        old = self.file_words.get(inode, {})
+        for word in old:
+            if word not in counts:
+                inodes = self.postings[word]
+                inodes.discard(inode)
+                if not inodes:
+                    del self.postings[word]
+        for word in counts:
+            if word not in old:
+                self.postings.setdefault(word, set()).add(inode)
+        if counts:
+            self.file_words[inode] = counts
+        else:
+            self.file_words.pop(inode, None)
+
+    def search(self, query):
+        """Files containing every word of query, without reading any content"""
+        words = set(tokenize(query))
+        if not words:
+            return []
+        matches = sorted((self.postings.get(word, set()) for word in words), key=len)
+        inodes = matches[0].intersection(*matches[1:])
+        return [file for file in map(inode_table.get, sorted(inodes)) if file is not None]
+
+    def snapshot(self):
+        return dict(self.file_words)
+
+    def load(self, file_words):
+        for inode, counts in file_words.items():
+            self._replace(int(inode), counts)
+
+
 # File system structure
 class File:
-    def __init__(self, name, allocation="Contiguous", permissions=1):
+    __slots__ = ("inode", "name", "extension", "start_block", "block_count", "permissions",
+                 "allocation", "chunk_keys", "timestamp", "size_bytes", "parent",
+                 "original_location", "original_parent", "trashed_at")
+
+    def __init__(self, name, allocation="Contiguous", permissions=1, inode=None):
         self.name = name
-        self.start_block = random.randint(1, MAX_BLOCKS - 10)
+        self.inode = inode_table.register(self, inode)
+        self.extension = file_extension(name)
+        self.start_block = 0  # 0 = no blocks allocated on the disk
         self.block_count = 0
         self.permissions = permissions  # 0 = read-only, 1 = read-write
-        self.allocation = allocation
-        self.content = ""
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.allocation = sys.intern(allocation)
+        self.chunk_keys = ()  # Content lives in content_store; the file only holds references
+        self.timestamp = current_timestamp()
         self.size_bytes = 0
+        self.parent = None             # Directory currently holding this file
         self.original_location = None  # Store original location for trash restore
+        self.original_parent = None    # Store original parent directory for trash restore
+        self.trashed_at = None         # When it was moved to trash, for the trash budget
+
+    @property
+    def path(self):
+        return node_path(self)
+
+    @property
+    def content(self):
+        return content_store.read(self.chunk_keys) if self.chunk_keys else ""
+
+    def update_size_and_allocation(self, size_bytes=None):
+        """Automatically update file size and allocation method based on content.
+
+        Pass size_bytes when it is already known to skip re-encoding the content.
+        Returns False if the disk has no free run large enough for the new size;
+        the file then keeps its previous blocks and size.
+        """
+        # Calculate size in bytes (UTF-8 encoded)
+        if size_bytes is None:
+            size_bytes = content_store.size(self.chunk_keys)
+
+        # Calculate blocks needed (assuming 512 bytes per block)
+        blocks_needed = (size_bytes + BLOCK_SIZE - 1) // BLOCK_SIZE
+        old_blocks = self.block_count
+        if not self._resize_blocks(blocks_needed):
+            return False
+        if self.parent is not None:
+            self.parent.update_totals(size_bytes - self.size_bytes, blocks_needed - old_blocks, 0, 0)
+        resized = size_bytes != self.size_bytes
+        self.size_bytes = size_bytes
+        if resized and self.parent is trash_order.directory:
+            trash_order.push(self)  # Re-key it in the largest-first order
+
+        # Auto-select allocation method based on size
+        if blocks_needed <= 5:
+            self.allocation = "Contiguous"  # Empty and small files use contiguous
+        elif blocks_needed <= 20:
+            self.allocation = "Linked"  # Medium files use linked
+        else:
+            self.allocation = "Indexed"  # Large files use indexed
+        return True
 
-    def update_size_and_allocation(self):
-        """Automatically update file size and allocation method based on content"""
-        if self.content:
-            # Calculate size in bytes (assuming 1 character = 1 byte)
-            self.size_bytes = len(self.content.encode('utf-8'))
-            
-            # Calculate blocks needed (assuming 512 bytes per block)
-            bytes_per_block = 512
-            blocks_needed = max(1, (self.size_bytes + bytes_per_block - 1) // bytes_per_block)
-            
-            # Auto-select allocation method based on size
-            if blocks_needed == 1:
-                self.allocation = "Contiguous"
-                self.block_count = 1
-            elif blocks_needed <= 5:
-                self.allocation = "Contiguous"  # Small files use contiguous
-                self.block_count = blocks_needed
-            elif blocks_needed <= 20:
-                self.allocation = "Linked"  # Medium files use linked
-                self.block_count = blocks_needed
-            else:
-                self.allocation = "Indexed"  # Large files use indexed
-                self.block_count = blocks_needed
+    def _resize_blocks(self, blocks_needed):
+        """Grow, shrink or release this file's block run on the disk"""
+        if blocks_needed == self.block_count and not disk.is_shared(self.start_block):
+            return True
+        if self.block_count == 0:
+            start = disk.allocate(blocks_needed)
         else:
-            # Empty file
-            self.size_bytes = 0
-            self.block_count = 0
-            self.allocation = "Contiguous"  # Default for empty files
-    
+            start = disk.resize(self.start_block, self.block_count, blocks_needed)
+        if start is None:
+            return False
+        self.start_block = start
+        self.block_count = blocks_needed
+        return True
+
+    def release(self):
+        """Give this file's blocks, content references and inode back (permanent deletion)"""
+        disk.free(self.start_block, self.block_count)
+        self.start_block = 0
+        self.block_count = 0
+        content_store.release(self.chunk_keys)
+        self.chunk_keys = ()
+        content_index.remove(self)
+        inode_table.unregister(self)
+
     def add_content(self, new_content):
-        """Add content to file and automatically update size/allocation"""
-        self.content += new_content
-        self.update_size_and_allocation()
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    
+        """Append content to the file; only the last chunk and the new text are re-hashed"""
+        keys = self.chunk_keys
+        replaced = ()
+        last_chunk = content_store.chunk_text(keys[-1]) if keys else ""
+        trailing_word = self._trailing_word(last_chunk)
+        if keys and len(last_chunk) < CHUNK_SIZE:
+            # Top up the partial last chunk
+            replaced = keys[-1:]
+            keys = keys[:-1]
+            appended = last_chunk + new_content
+        else:
+            appended = new_content
+        msg = self._replace_chunks(keys, replaced, appended)
+        if not msg.startswith("Error"):
+            content_index.append_text(self, trailing_word, new_content)
+            journal.record("add_content", self, new_content)
+        return msg
+
+    def _trailing_word(self, last_chunk):
+        """The word the content ends with, read back across chunks if it's long"""
+        start = trailing_word_start(last_chunk)
+        word = last_chunk[start:]
+        index = len(self.chunk_keys) - 1
+        while word and start == 0 and index > 0:
+            index -= 1
+            chunk = content_store.chunk_text(self.chunk_keys[index])
+            start = trailing_word_start(chunk)
+            word = chunk[start:] + word
+        return word
+
     def set_content(self, new_content):
         """Set file content and automatically update size/allocation"""
-        self.content = new_content
-        self.update_size_and_allocation()
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        msg = self._replace_chunks((), self.chunk_keys, new_content)
+        if not msg.startswith("Error"):
+            content_index.set_text(self, new_content)
+            journal.record("set_content", self, new_content)
+        return msg
+
+    def _replace_chunks(self, kept_keys, replaced_keys, new_text):
+        """Store new_text after kept_keys, dropping replaced_keys once the disk has room"""
+        new_keys = content_store.put(new_text)
+        size_bytes = (self.size_bytes - content_store.size(replaced_keys)
+                      + content_store.size(new_keys))
+        if not self.update_size_and_allocation(size_bytes):
+            content_store.release(new_keys)
+            return "Error: Not enough free space on disk."
+        content_store.release(replaced_keys)
+        self.chunk_keys = kept_keys + new_keys
+        self.timestamp = current_timestamp()
+        return f"File '{self.name}' updated."
+
+    def clone(self):
+        """Create a copy-on-write copy of this file.
+
+        The copy references the same content chunks and shares the block run
+        with the original; whichever side is written first gets its own blocks.
+        """
+        new_file = File(self.name, self.allocation, self.permissions)
+        new_file.chunk_keys = self.chunk_keys
+        content_store.acquire(self.chunk_keys)
+        new_file.timestamp = self.timestamp
+        new_file.size_bytes = self.size_bytes
+        new_file.start_block = self.start_block
+        new_file.block_count = self.block_count
+        disk.share(self.start_block)
+        content_index.share(self, new_file)
+        return new_file
     
     def get_size_display(self):
         """Get human-readable file size"""
-        if self.size_bytes == 0:
-            return "0 bytes"
-        elif self.size_bytes < 1024:
-            return f"{self.size_bytes} bytes"
-        elif self.size_bytes < 1024 * 1024:
-            return f"{self.size_bytes / 1024:.1f} KB"
-        else:
-            return f"{self.size_bytes / (1024 * 1024):.1f} MB"
+        return format_size(self.size_bytes)
+
+    def mark_dirty(self):
+        if self.parent is not None:
+            self.parent.mark_dirty()
     
     def to_dict(self):
         return {
@@ -138,99 +1018,289 @@ class File:
             "block_count": self.block_count,
             "permissions": self.permissions,
             "allocation": self.allocation,
-            "content": self.content,
+            "chunks": list(self.chunk_keys),  # Keys into the saved content store
             "timestamp": self.timestamp,
             "size_bytes": self.size_bytes,
-            "original_location": self.original_location
+            "inode": self.inode,
+            "original_location": self.original_location,
+            "original_parent_inode": self.original_parent.inode if self.original_parent else None,
+            "trashed_at": self.trashed_at
         }
     
     @classmethod
     def from_dict(cls, data):
-        file = cls(data["name"], data.get("allocation", "Contiguous"), data["permissions"])
-        file.start_block = data["start_block"]
-        file.block_count = data.get("block_count", 0)
-        file.content = data["content"]
-        file.timestamp = data["timestamp"]
+        file = cls(data["name"], data.get("allocation", "Contiguous"), data["permissions"], data.get("inode"))
+        if "chunks" in data:
+            file.chunk_keys = tuple(data["chunks"])
+            content_store.acquire(file.chunk_keys)
+        else:
+            # Older saves kept the content inline
+            file.chunk_keys = content_store.put(data.get("content", ""))
+        file.timestamp = parse_timestamp(data["timestamp"])
         file.size_bytes = data.get("size_bytes", 0)
-        file.original_location = data.get("original_location", None)
-        # Update allocation based on current content
-        file.update_size_and_allocation()
+        file.original_location = intern_optional(data.get("original_location"))
+        file.trashed_at = trashed_time(file.original_location, data.get("trashed_at"))
+        # original_parent is resolved from original_parent_inode during loading
+        file.restore_blocks(data.get("start_block", 0), data.get("block_count", 0))
         return file
 
+    def restore_blocks(self, start_block, block_count):
+        """Claim this file's saved block run while loading a snapshot"""
+        # Copy-on-write copies were saved with the same run and content: share
+        # the run claimed by the first of them again instead of taking more blocks
+        owner = restored_runs.get((start_block, block_count)) if block_count else None
+        if owner is not None and owner.chunk_keys == self.chunk_keys and owner.block_count:
+            self.start_block = owner.start_block
+            self.block_count = owner.block_count
+            self.size_bytes = owner.size_bytes
+            self.allocation = owner.allocation
+            disk.share(self.start_block)
+            return
+        # Older saves used random, possibly overlapping start blocks, so fall
+        # back to a fresh allocation when the run is taken
+        claimed = block_count and disk.reserve(start_block, block_count)
+        if claimed:
+            self.start_block = start_block
+            self.block_count = block_count
+        # Update allocation based on current content
+        if not self.update_size_and_allocation(content_store.size(self.chunk_keys)):
+            print(f"Warning: not enough disk space to load '{self.name}'")
+        elif claimed:
+            restored_runs[(start_block, block_count)] = self
+
 class Directory:
-    def __init__(self, name):
+    __slots__ = ("inode", "name", "files", "subdirectories", "file_index", "directory_index",
+                 "shadowed_entries", "timestamp", "parent",
+                 "original_location", "original_parent", "trashed_at",
+                 "total_bytes", "total_blocks", "total_files", "total_dirs", "dirty")
+
+    def __init__(self, name, inode=None):
         self.name = name
-        self.files = []
-        self.subdirectories = []
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.inode = inode_table.register(self, inode)
+        # files/subdirectories keep display order and are dicts used as ordered
+        # sets (entry -> None) so removing any entry is O(1); the name indexes give
+        # O(1) lookups. Always mutate them through add_*/remove_*/rename_* so both stay in sync.
+        self.files = {}
+        self.subdirectories = {}
+        self.file_index = {}       # name -> File
+        self.directory_index = {}  # name -> Directory
+        self.shadowed_entries = {}  # (is_directory, name) -> ordered set of same-named entries hidden by the index
+        self.timestamp = current_timestamp()
+        self.parent = None             # Directory holding this one (None for root directories)
         self.original_location = None  # Store original location for trash restore
         self.original_parent = None    # Store original parent directory for trash restore
+        self.trashed_at = None         # When it was moved to trash, for the trash budget
+        # Subtree rollups (not counting this directory itself), kept current by
+        # add_*/remove_*/clear_entries and File.update_size_and_allocation
+        self.total_bytes = 0
+        self.total_blocks = 0
+        self.total_files = 0
+        self.total_dirs = 0
+        # Set when anything in this subtree changes since the last checkpoint
+        self.dirty = True
+
+    @property
+    def path(self):
+        return node_path(self)
+
+    def update_totals(self, bytes_delta, blocks_delta, files_delta, dirs_delta):
+        """Apply a change to the rollups of this directory and all its ancestors (O(depth))"""
+        directory, entry = self, None
+        while directory is not None:
+            directory.total_bytes += bytes_delta
+            directory.total_blocks += blocks_delta
+            directory.total_files += files_delta
+            directory.total_dirs += dirs_delta
+            directory.dirty = True
+            if directory is trash_order.directory and entry is not None and bytes_delta:
+                trash_order.push(entry)  # A folder in Trash changed size; re-key it
+            directory, entry = directory.parent, directory
+
+    def mark_dirty(self):
+        """Flag this directory and its ancestors as changed since the last checkpoint"""
+        directory = self
+        while directory is not None and not directory.dirty:
+            directory.dirty = True
+            directory = directory.parent
+
+    # Name index maintenance
+    def get_file(self, name):
+        return self.file_index.get(name)
+
+    def get_subdirectory(self, name):
+        return self.directory_index.get(name)
+
+    def entries(self):
+        """Subdirectories then files, in display order"""
+        return [*self.subdirectories, *self.files]
+
+    def add_file(self, file):
+        self.files[file] = None
+        self._index_entry(file)
+        file.parent = self
+        self.update_totals(file.size_bytes, file.block_count, 1, 0)
+        if self is trash_order.directory:
+            trash_order.push(file)
+
+    def remove_file(self, file):
+        del self.files[file]
+        self._unindex_entry(file)
+        file.parent = None
+        self.update_totals(-file.size_bytes, -file.block_count, -1, 0)
+
+    def add_subdirectory(self, directory):
+        self.subdirectories[directory] = None
+        self._index_entry(directory)
+        directory.parent = self
+        self.update_totals(directory.total_bytes, directory.total_blocks,
+                           directory.total_files, directory.total_dirs + 1)
+        if self is trash_order.directory:
+            trash_order.push(directory)
+
+    def remove_subdirectory(self, directory):
+        del self.subdirectories[directory]
+        self._unindex_entry(directory)
+        directory.parent = None
+        self.update_totals(-directory.total_bytes, -directory.total_blocks,
+                           -directory.total_files, -(directory.total_dirs + 1))
+
+    def _index_entry(self, entry):
+        is_directory = isinstance(entry, Directory)
+        index = self.directory_index if is_directory else self.file_index
+        if entry.name in index:
+            # Only Trash can hold two entries with the same name - keep the extras aside
+            self.shadowed_entries.setdefault((is_directory, entry.name), {})[entry] = None
+        else:
+            index[entry.name] = entry
+
+    def _unindex_entry(self, entry):
+        is_directory = isinstance(entry, Directory)
+        index = self.directory_index if is_directory else self.file_index
+        key = (is_directory, entry.name)
+        hidden = self.shadowed_entries.get(key)
+        if index.get(entry.name) is entry:
+            if hidden:
+                # The oldest hidden entry takes its place
+                promoted = next(iter(hidden))
+                del hidden[promoted]
+                index[entry.name] = promoted
+            else:
+                del index[entry.name]
+        elif hidden:
+            del hidden[entry]
+        if hidden is not None and not hidden:
+            del self.shadowed_entries[key]
+
+    def _rename_entry(self, entry, new_name):
+        self._unindex_entry(entry)
+        inode_table.names.rename(entry, new_name)
+        entry.name = new_name
+        if isinstance(entry, File):
+            entry.extension = file_extension(new_name)
+        self._index_entry(entry)
+
+    def clear_entries(self):
+        self.update_totals(-self.total_bytes, -self.total_blocks, -self.total_files, -self.total_dirs)
+        self.files.clear()
+        self.subdirectories.clear()
+        self.file_index.clear()
+        self.directory_index.clear()
+        self.shadowed_entries.clear()
 
     def create_file(self, filename, allocation, permissions):
         if len(self.files) >= MAX_FILES:
             return "Error: Directory full."
-        if any(f.name == filename for f in self.files):
+        if filename in self.file_index:
             return "Error: File already exists."
-        self.files.append(File(filename, allocation, permissions))
+        self.add_file(File(filename, allocation, permissions))
+        journal.record("create_file", self, filename, allocation, permissions)
         return f"File '{filename}' created."
 
     def delete_file(self, filename):
         if current_user["role"] != UserRole.ADMIN:
             return "Error: Only ADMIN can delete."
-        for file in self.files:
-            if file.name == filename:
-                if file.permissions == 0:
-                    return "Error: Read-Only file."
-                # Store original location for restore functionality
-                file.original_location = self.name
-                trash_dir.files.append(file)
-                self.files.remove(file)
-                return f"File '{filename}' moved to trash."
-        return "Error: File not found."
+        file = self.file_index.get(filename)
+        if not file:
+            return "Error: File not found."
+        if file.permissions == 0:
+            return "Error: Read-Only file."
+        # Store original path and parent for restore functionality
+        file.original_location = self.path
+        file.original_parent = self
+        file.trashed_at = current_timestamp()
+        self.remove_file(file)
+        trash_dir.add_file(file)
+        journal.record("delete_file", self, filename)
+        return f"File '{filename}' moved to trash."
 
     def restore_file(self, filename):
         """Restore a file from trash to its original location"""
         if self.name != "Trash":
             return "Error: Can only restore from Trash."
         
-        for file in self.files:
-            if file.name == filename:
-                if not file.original_location:
-                    return "Error: Original location unknown."
-                
-                # Find the original directory
-                original_dir = find_directory(file.original_location)
-                if not original_dir:
-                    return f"Error: Original directory '{file.original_location}' not found."
-                
-                # Check if file with same name already exists in original location
-                if any(f.name == filename for f in original_dir.files):
-                    return f"Error: File '{filename}' already exists in '{file.original_location}'."
-                
-                # Move file back to original location
-                file.original_location = None  # Clear the trash marker
-                original_dir.files.append(file)
-                self.files.remove(file)
-                return f"File '{filename}' restored to '{original_dir.name}'."
-        return "Error: File not found in trash."
+        file = self.file_index.get(filename)
+        if not file:
+            return "Error: File not found in trash."
+        msg = self._restore_file(file)
+        if not msg.startswith("Error"):
+            journal.record("restore_file", self, filename)
+        return msg
+
+    def _restore_file(self, file):
+        filename = file.name
+        if not file.original_location:
+            return "Error: Original location unknown."
+        
+        # The original directory must still exist
+        original_dir = self._original_directory(file)
+        if original_dir is None:
+            return f"Error: Original directory '{file.original_location}' not found."
+        
+        # Check if file with same name already exists in original location
+        if filename in original_dir.file_index:
+            return f"Error: File '{filename}' already exists in '{original_dir.path}'."
+        
+        # Move file back to original location
+        file.original_location = None  # Clear the trash marker
+        file.original_parent = None
+        file.trashed_at = None
+        self.remove_file(file)
+        original_dir.add_file(file)
+        return f"File '{filename}' restored to '{original_dir.path}'."
+
+    def _original_directory(self, entry):
+        """Where a trashed entry goes back to: its saved parent (by inode), else the folder now at its saved path"""
+        parent = entry.original_parent
+        if parent is not None and inode_table.contains(parent):
+            return parent
+        if entry.original_location.startswith("/"):
+            # The parent was deleted for good; older saves only recorded a name
+            parent = resolve_path(entry.original_location)
+            if isinstance(parent, Directory):
+                return parent
+        return None
 
     def delete_file_permanently(self, filename):
         """Permanently delete a file from trash"""
         if self.name != "Trash":
             return "Error: Can only permanently delete from Trash."
         
-        for file in self.files:
-            if file.name == filename:
-                self.files.remove(file)
-                return f"File '{filename}' permanently deleted."
-        return "Error: File not found in trash."
+        file = self.file_index.get(filename)
+        if not file:
+            return "Error: File not found in trash."
+        # Detach first so the folder rollups see the blocks being removed
+        self.remove_file(file)
+        file.release()
+        journal.record("delete_file_permanently", self, filename)
+        return f"File '{filename}' permanently deleted."
 
     def create_subdirectory(self, dirname):
         if len(self.subdirectories) >= MAX_DIRS:
             return "Error: Directory limit reached."
-        if any(d.name == dirname for d in self.subdirectories):
+        if dirname in self.directory_index:
             return "Error: Directory already exists."
-        self.subdirectories.append(Directory(dirname))
+        self.add_subdirectory(Directory(dirname))
+        journal.record("create_subdirectory", self, dirname)
         return f"Directory '{dirname}' created."
 
     def delete_subdirectory(self, dirname):
@@ -238,94 +1308,203 @@ class Directory:
         if current_user["role"] != UserRole.ADMIN:
             return "Error: Only ADMIN can delete."
         
-        for subdir in self.subdirectories:
-            if subdir.name == dirname:
-                # Store original location and parent for restore functionality
-                subdir.original_location = self.name
-                subdir.original_parent = self
-                trash_dir.subdirectories.append(subdir)
-                self.subdirectories.remove(subdir)
-                return f"Directory '{dirname}' moved to trash."
-        return "Error: Directory not found."
+        subdir = self.directory_index.get(dirname)
+        if not subdir:
+            return "Error: Directory not found."
+        # Store original path and parent for restore functionality
+        subdir.original_location = self.path
+        subdir.original_parent = self
+        subdir.trashed_at = current_timestamp()
+        self.remove_subdirectory(subdir)
+        trash_dir.add_subdirectory(subdir)
+        journal.record("delete_subdirectory", self, dirname)
+        return f"Directory '{dirname}' moved to trash."
 
     def restore_directory(self, dirname):
         """Restore a directory from trash to its original location"""
         if self.name != "Trash":
             return "Error: Can only restore from Trash."
         
-        for directory in self.subdirectories:
-            if directory.name == dirname:
-                if not directory.original_parent:
-                    return "Error: Original location unknown."
-                
-                # Check if directory with same name already exists in original location
-                if any(d.name == dirname for d in directory.original_parent.subdirectories):
-                    return f"Error: Directory '{dirname}' already exists in original location."
-                
-                # Move directory back to original location
-                directory.original_parent.subdirectories.append(directory)
-                directory.original_location = None
-                directory.original_parent = None
-                self.subdirectories.remove(directory)
-                return f"Directory '{dirname}' restored to original location."
-        return "Error: Directory not found in trash."
+        directory = self.directory_index.get(dirname)
+        if not directory:
+            return "Error: Directory not found in trash."
+        msg = self._restore_directory(directory)
+        if not msg.startswith("Error"):
+            journal.record("restore_directory", self, dirname)
+        return msg
+
+    def _restore_directory(self, directory):
+        dirname = directory.name
+        if not directory.original_location:
+            return "Error: Original location unknown."
+        if directory.original_location == "Root":
+            # A root directory goes back to the top level
+            if any(root.name == dirname for root in root_directories):
+                return f"Error: Directory '{dirname}' already exists in original location."
+            self.remove_subdirectory(directory)
+            root_directories.append(directory)
+            original_path = "/"
+        else:
+            original_dir = self._original_directory(directory)
+            if original_dir is None:
+                return f"Error: Original directory '{directory.original_location}' not found."
+            
+            # Check if directory with same name already exists in original location
+            if dirname in original_dir.directory_index:
+                return f"Error: Directory '{dirname}' already exists in original location."
+            
+            # Move directory back to original location
+            self.remove_subdirectory(directory)
+            original_dir.add_subdirectory(directory)
+            original_path = original_dir.path
+        directory.original_location = None
+        directory.original_parent = None
+        directory.trashed_at = None
+        return f"Directory '{dirname}' restored to '{original_path}'."
+
+    def restore_entry(self, inode):
+        """Restore one trash entry by inode (names in Trash can repeat)"""
+        entry = inode_table.get(inode)
+        if self.name != "Trash" or entry is None or entry.parent is not self:
+            return "Error: Entry not found in trash."
+        if isinstance(entry, File):
+            msg = self._restore_file(entry)
+        else:
+            msg = self._restore_directory(entry)
+        if not msg.startswith("Error"):
+            journal.record("restore_entry", self, inode)
+        return msg
 
     def delete_directory_permanently(self, dirname):
         """Permanently delete a directory from trash"""
         if self.name != "Trash":
             return "Error: Can only permanently delete from Trash."
         
-        for directory in self.subdirectories:
-            if directory.name == dirname:
-                self.subdirectories.remove(directory)
-                return f"Directory '{dirname}' permanently deleted."
-        return "Error: Directory not found in trash."
+        directory = self.directory_index.get(dirname)
+        if not directory:
+            return "Error: Directory not found in trash."
+        # Detach first so the folder rollups see the blocks being removed
+        self.remove_subdirectory(directory)
+        directory.release()
+        journal.record("delete_directory_permanently", self, dirname)
+        return f"Directory '{dirname}' permanently deleted."
+
+    def purge_entry(self, inode):
+        """Permanently delete one trash entry by inode (names in Trash can repeat)"""
+        entry = inode_table.get(inode)
+        if self.name != "Trash" or entry is None or entry.parent is not self:
+            return "Error: Entry not found in trash."
+        if isinstance(entry, File):
+            self.remove_file(entry)
+        else:
+            self.remove_subdirectory(entry)
+        entry.release()
+        journal.record("purge_entry", self, inode)
+        return f"'{entry.name}' permanently deleted."
 
     def rename_file(self, old_name, new_name):
-        for file in self.files:
-            if file.name == old_name:
-                if any(f.name == new_name for f in self.files):
-                    return "Error: File with new name already exists."
-                file.name = new_name
-                return f"File renamed from '{old_name}' to '{new_name}'."
-        return "Error: File not found."
+        file = self.file_index.get(old_name)
+        if not file:
+            return "Error: File not found."
+        if new_name in self.file_index:
+            return "Error: File with new name already exists."
+        self._rename_entry(file, new_name)
+        journal.record("rename_file", self, old_name, new_name)
+        return f"File renamed from '{old_name}' to '{new_name}'."
 
     def rename_subdirectory(self, old_name, new_name):
-        for subdir in self.subdirectories:
-            if subdir.name == old_name:
-                if any(d.name == new_name for d in self.subdirectories):
-                    return "Error: Directory with new name already exists."
-                subdir.name = new_name
-                return f"Directory renamed from '{old_name}' to '{new_name}'."
-        return "Error: Directory not found."
+        subdir = self.directory_index.get(old_name)
+        if not subdir:
+            return "Error: Directory not found."
+        if new_name in self.directory_index:
+            return "Error: Directory with new name already exists."
+        self._rename_entry(subdir, new_name)
+        journal.record("rename_subdirectory", self, old_name, new_name)
+        return f"Directory renamed from '{old_name}' to '{new_name}'."
 
     def empty_trash(self):
         """Empty trash - delete all files and directories permanently"""
         if self.name == "Trash":
-            self.files.clear()
-            self.subdirectories.clear()
+            for entry in [*self.files, *self.subdirectories]:
+                entry.release()
+            self.clear_entries()
+            journal.record("empty_trash", self)
             return "Trash is now empty."
         return "Error: Not Trash directory."
+
+    # Subtree walks below use an explicit stack so tree depth is never limited
+    # by Python's recursion limit
+    def release(self):
+        """Give the blocks and inodes of this whole subtree back (permanent deletion)"""
+        for node, _ in iter_tree([self]):
+            if isinstance(node, File):
+                node.release()
+            else:
+                inode_table.unregister(node)
+
+    def clone(self):
+        """Copy this subtree; files are copy-on-write, so this is O(node count)"""
+        new_root = None
+        stack = [(self, None)]
+        while stack:
+            source, parent_copy = stack.pop()
+            copy = Directory(source.name)
+            copy.timestamp = source.timestamp
+            for file in source.files:
+                copy.add_file(file.clone())
+            if parent_copy is None:
+                new_root = copy
+            else:
+                parent_copy.add_subdirectory(copy)
+            stack.extend((subdir, copy) for subdir in reversed(source.subdirectories))
+        return new_root
     
-    def to_dict(self):
+    def metadata_dict(self):
+        """This directory's own fields, without its children"""
         return {
             "name": self.name,
-            "files": [file.to_dict() for file in self.files],
-            "subdirectories": [subdir.to_dict() for subdir in self.subdirectories],
             "timestamp": self.timestamp,
+            "inode": self.inode,
             "original_location": self.original_location,
-            "original_parent": None  # Can't serialize parent reference
+            "original_parent_inode": self.original_parent.inode if self.original_parent else None,
+            "trashed_at": self.trashed_at
         }
     
+    def to_dict(self):
+        """Nested dict of the whole subtree (the original JSON layout)"""
+        result = self.metadata_dict()
+        stack = [(self, result)]
+        while stack:
+            directory, data = stack.pop()
+            data["files"] = [file.to_dict() for file in directory.files]
+            data["subdirectories"] = []
+            for subdir in directory.subdirectories:
+                subdir_data = subdir.metadata_dict()
+                data["subdirectories"].append(subdir_data)
+                stack.append((subdir, subdir_data))
+        return result
+    
     @classmethod
     def from_dict(cls, data):
-        directory = cls(data["name"])
-        directory.files = [File.from_dict(file_data) for file_data in data["files"]]
-        directory.subdirectories = [Directory.from_dict(subdir_data) for subdir_data in data["subdirectories"]]
-        directory.timestamp = data["timestamp"]
-        directory.original_location = data.get("original_location", None)
-        # original_parent will be rebuilt during loading
-        return directory
+        """Build a directory from metadata_dict() or to_dict() output"""
+        root = None
+        stack = [(data, None)]
+        while stack:
+            dir_data, parent = stack.pop()
+            directory = cls(dir_data["name"], dir_data.get("inode"))
+            directory.timestamp = parse_timestamp(dir_data["timestamp"])
+            directory.original_location = intern_optional(dir_data.get("original_location"))
+            directory.trashed_at = trashed_time(directory.original_location, dir_data.get("trashed_at"))
+            # original_parent is resolved from original_parent_inode during loading
+            for file_data in dir_data.get("files", []):
+                directory.add_file(File.from_dict(file_data))
+            if parent is None:
+                root = directory
+            else:
+                parent.add_subdirectory(directory)
+            # Reversed so subdirectories are added back in their saved order
+            stack.extend((subdir_data, directory) for subdir_data in reversed(dir_data.get("subdirectories", [])))
+        return root
 
 # Clipboard operations
 def clear_clipboard():
@@ -348,11 +1527,11 @@ def can_paste_here(target_directory):
     # Check for name conflicts
     for item in clipboard["items"]:
         # Check if file with same name exists
-        if hasattr(item, 'content'):  # It's a file
-            if any(f.name == item.name for f in target_directory.files):
+        if isinstance(item, File):
+            if item.name in target_directory.file_index:
                 return False
         else:  # It's a directory
-            if any(d.name == item.name for d in target_directory.subdirectories):
+            if item.name in target_directory.directory_index:
                 return False
             # Prevent circular reference (moving directory into itself or its subdirectory)
             if clipboard["operation"] == "cut" and is_subdirectory_of(target_directory, item):
@@ -361,14 +1540,12 @@ def can_paste_here(target_directory):
     return True
 
 def is_subdirectory_of(potential_child, potential_parent):
-    """Check if potential_child is a subdirectory of potential_parent"""
-    if potential_child == potential_parent:
-        return True
-    
-    for subdir in potential_parent.subdirectories:
-        if is_subdirectory_of(potential_child, subdir):
+    """Check if potential_child is potential_parent or lies beneath it (walks up the parent chain)"""
+    node = potential_child
+    while node is not None:
+        if node is potential_parent:
             return True
-    
+        node = node.parent
     return False
 
 def paste_items(target_directory):
@@ -377,27 +1554,28 @@ def paste_items(target_directory):
         return "Error: Cannot paste here due to conflicts or circular reference."
     
     success_count = 0
+    journal.record("paste", target_directory, operation=clipboard["operation"],
+                   source=clipboard["source_directory"].inode if clipboard["source_directory"] else None,
+                   items=[item.inode for item in clipboard["items"]])
     
     for item in clipboard["items"]:
-        if hasattr(item, 'content'):  # It's a file
+        if isinstance(item, File):
             if clipboard["operation"] == "cut":
                 # Move file
-                clipboard["source_directory"].files.remove(item)
-                target_directory.files.append(item)
+                clipboard["source_directory"].remove_file(item)
+                target_directory.add_file(item)
             else:  # copy
-                # Create a deep copy of the file
-                new_file = copy.deepcopy(item)
-                target_directory.files.append(new_file)
+                # Copy-on-write: shares content and blocks until either side is written
+                target_directory.add_file(item.clone())
             success_count += 1
         else:  # It's a directory
             if clipboard["operation"] == "cut":
                 # Move directory
-                clipboard["source_directory"].subdirectories.remove(item)
-                target_directory.subdirectories.append(item)
+                clipboard["source_directory"].remove_subdirectory(item)
+                target_directory.add_subdirectory(item)
             else:  # copy
-                # Create a deep copy of the directory
-                new_dir = copy.deepcopy(item)
-                target_directory.subdirectories.append(new_dir)
+                # Copy the whole subtree copy-on-write
+                target_directory.add_subdirectory(item.clone())
             success_count += 1
     
     # Clear clipboard after any paste operation (cut or copy) - allows only one-time paste
@@ -405,7 +1583,113 @@ def paste_items(target_directory):
     
     return f"Successfully pasted {success_count} item(s)."
 
+# Operation journal
+class Journal:
+    """Append-only log of file system operations made since the last checkpoint.
+
+    Each record names a method (or a replay function) and the inode of the
+    node it was called on, so replaying the log against the checkpoint
+    repeats the same calls. Records are buffered and written together by
+    commit() (group commit); seq numbers let a checkpoint mark which records
+    it already contains.
+    """
+
+    def __init__(self, path=JOURNAL_FILE_PATH):
+        self.path = path
+        self.pending = []
+        self.seq = 0
+        self.suspended = 0  # > 0 while replaying, so replayed calls aren't logged again
+        self.replay_time = None  # Timestamp of the record being replayed
+        self.size = self.cut_torn_tail()
+        self.checkpoint_seq = 0  # Last record captured by a checkpoint
+        self.checkpoint_time = time.monotonic()
+
+    def cut_torn_tail(self):
+        """Truncate a record torn by a crash mid-append, so the next commit starts on a fresh line.
+
+        Returns the journal's size afterwards.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end != size:
+                print("Warning: cutting off an incomplete journal record")
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        return end
+
+    def record(self, op, node=None, *args, **fields):
+        if node is not None:
+            node.mark_dirty()  # Also while replaying: the replayed changes aren't checkpointed yet
+        if self.suspended:
+            return
+        self.seq += 1
+        entry = {"seq": self.seq, "op": op, "time": current_timestamp()}
+        if node is not None:
+            entry["node"] = node.inode
+        if args:
+            entry["args"] = list(args)
+        entry.update(fields)
+        self.pending.append(entry)
+
+    def commit(self):
+        """Write all pending records with a single append and fsync"""
+        if not self.pending:
+            return
+        lines = "".join(json.dumps(entry) + "\n" for entry in self.pending)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.size += len(lines)
+        self.pending.clear()
+
+    def read(self, after_seq=0):
+        """Yield committed records newer than after_seq, stopping at a torn final line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print("Warning: ignoring incomplete journal record")
+                    return
+                if entry["seq"] > after_seq:
+                    yield entry
+
+    def discard_through(self, seq):
+        """Drop committed records up to seq once a checkpoint has captured them, keeping later ones"""
+        kept = "".join(json.dumps(entry) + "\n" for entry in self.read(seq))
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(kept)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.size = len(kept)
+        self.checkpoint_seq = seq
+        self.checkpoint_time = time.monotonic()
+
+
+disk = BlockDevice(MAX_BLOCKS)
+inode_table = InodeTable()
+content_store = ContentStore()
+content_index = ContentIndex()
+journal = Journal()
 trash_dir = Directory("Trash")
+trash_order = TrashOrder()
 root_directories = [
     Directory("Documents"),
     Directory("Media"),
@@ -414,24 +1698,616 @@ root_directories = [
     trash_dir
 ]
 
-def find_directory(name):
-    for root in root_directories:
-        found = _find_directory_recursive(root, name)
-        if found:
-            return found
+def node_path(node):
+    """Build the absolute path of a node, e.g. '/Documents/notes/todo.txt'"""
+    names = []
+    while node is not None:
+        names.append(node.name)
+        node = node.parent
+    return "/" + "/".join(reversed(names))
+
+def resolve_path(path):
+    """Resolve a full path like '/Documents/notes/todo.txt' to its File or Directory"""
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return None
+    node = next((root for root in root_directories if root.name == parts[0]), None)
+    for part in parts[1:]:
+        if not isinstance(node, Directory):
+            return None
+        node = node.get_subdirectory(part) or node.get_file(part)
+    return node
+
+def iter_tree(roots):
+    """Yield (node, parent inode or 0) for every node under roots, in pre-order.
+
+    Uses an explicit stack, so depth isn't limited by the recursion limit.
+    Within a directory its files come first, then its subdirectories, each in
+    display order.
+    """
+    stack = [(root, 0) for root in reversed(roots)]
+    while stack:
+        node, parent_inode = stack.pop()
+        yield node, parent_inode
+        if isinstance(node, Directory):
+            stack.extend((subdir, node.inode) for subdir in reversed(node.subdirectories))
+            stack.extend((file, node.inode) for file in reversed(node.files))
+
+def find_directory(name, roots=None):
+    """Find the first directory called name (older saves only recorded names)"""
+    for node, _ in iter_tree(root_directories if roots is None else roots):
+        if node.name == name and isinstance(node, Directory):
+            return node
     return None
 
-def _find_directory_recursive(current, name):
-    if current.name == name:
-        return current
-    for subdir in current.subdirectories:
-        found = _find_directory_recursive(subdir, name)
-        if found:
-            return found
-    return None
+def compile_name_query(query):
+    """Turn a search query into (match function on case-folded names, literal name prefix).
 
-def save_file_system():
-    """Save the file system state AND user list to a JSON file"""
+    "re:<pattern>" is a regular expression searched anywhere in the name, a
+    query with * ? or [ is a glob matched against the whole name, and
+    anything else matches names containing it. The prefix is the literal
+    start every match must have ("" if there is none); it lets the sorted
+    name index skip straight to the candidates. Only globs with a literal
+    start have one: substring and regular expression queries check every
+    name in the index (still without walking the tree, and on the worker).
+    """
+    if query.startswith("re:"):
+        return re.compile(query[3:], re.IGNORECASE).search, ""
+    query = query.casefold()
+    if any(char in query for char in "*?["):
+        prefix = re.split(r"[*?\[]", query, 1)[0]
+        return re.compile(fnmatch.translate(query)).match, prefix
+    return (lambda name: query in name), ""
+
+def query_narrows(old_query, new_query):
+    """True if every name matching new_query also matches old_query (a plain query that was extended)"""
+    def plain(query):
+        return not query.startswith("re:") and not any(char in query for char in "*?[")
+    return plain(old_query) and plain(new_query) and old_query.casefold() in new_query.casefold()
+
+class NameSearch:
+    """A recursive name search below one directory, run on a worker thread.
+
+    The sorted name index is taken on the calling (UI) thread if it's built;
+    the first search only captures the names there and sorts them on the
+    worker. The worker reads the keys and the parent links of the nodes it
+    matches, and hands matches over in batches of (node, casefolded name)
+    through a queue. cancel() stops it at the next candidate.
+    """
+
+    def __init__(self, start, query):
+        self.start = start
+        self.query = query
+        self.match, self.prefix = compile_name_query(query)  # Raises re.error for a bad pattern
+        index = inode_table.names
+        if index.ready():
+            self.keys, self.names = index.sorted_keys(), None
+        else:
+            self.keys, self.names = None, index.start_build()
+        self.table = inode_table
+        self.batches = queue.Queue()
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.match_count = 0
+        self.thread = threading.Thread(target=self._run, name="name-search", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        keys = self.keys
+        if keys is None:
+            keys = self.table.names.build(self.names)
+            self.names = None
+        start, end = NameIndex.prefix_range(keys, self.prefix) if self.prefix else (0, len(keys))
+        batch = []
+        for index in range(start, end):
+            if self.cancelled.is_set():
+                return
+            name, inode = keys[index]
+            if not self.match(name):
+                continue
+            node = self.table.get(inode)
+            if node is None or node is self.start or not is_subdirectory_of(node, self.start):
+                continue
+            batch.append((node, name))
+            if len(batch) >= SEARCH_BATCH_SIZE:
+                self.batches.put(batch)
+                batch = []
+        if batch:
+            self.batches.put(batch)
+        self.finished = True
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def poll(self):
+        """(node, casefolded name) for the matches found since the last poll"""
+        matches = []
+        while True:
+            try:
+                matches.extend(self.batches.get_nowait())
+            except queue.Empty:
+                break
+        self.match_count += len(matches)
+        return matches
+
+    @property
+    def done(self):
+        """All matches were found and handed over (or the search was cancelled)"""
+        return (self.finished or self.cancelled.is_set()) and self.batches.empty()
+
+def rename_root_directory(root, new_name):
+    if any(r.name == new_name for r in root_directories):
+        return f"Error: Directory '{new_name}' already exists."
+    inode_table.names.rename(root, new_name)
+    root.name = new_name
+    journal.record("rename_root_directory", root, new_name)
+    return f"Directory renamed to '{new_name}'."
+
+def move_root_to_trash(root):
+    root.original_location = "Root"
+    root.original_parent = None  # Special case for root directories
+    root.trashed_at = current_timestamp()
+    root_directories.remove(root)
+    trash_dir.add_subdirectory(root)
+    journal.record("move_root_to_trash", root)
+    return f"Directory '{root.name}' moved to trash."
+
+def _trash_entry_size(entry):
+    return entry.size_bytes if isinstance(entry, File) else entry.total_bytes
+
+def _trash_age_key(entry):
+    # Entries created or pasted straight into Trash were never stamped and never expire
+    return entry.trashed_at if entry.trashed_at is not None else float("inf")
+
+def _trash_size_key(entry):
+    return -_trash_entry_size(entry)
+
+def purge_trash(batch=TRASH_PURGE_BATCH):
+    """Permanently delete up to batch trash entries that are expired or over the trash budget.
+
+    Runs in small batches from the autosave timer so a large trash is worked
+    down without blocking the UI. The totals come from the trash rollups and
+    the candidates from trash_order, so a tick with nothing to do is O(1).
+    Returns (entries purged, bytes of content reclaimed, blocks reclaimed).
+    """
+    order = trash_order.track(trash_dir)
+    cutoff = current_timestamp() - TRASH_MAX_AGE_DAYS * 86400
+    bytes_over = trash_dir.total_bytes - TRASH_MAX_BYTES
+    items_over = len(trash_dir.files) + len(trash_dir.subdirectories) - TRASH_MAX_ITEMS
+
+    victims = []
+    while len(victims) < batch:
+        entry = order.peek(order.oldest)
+        if entry is None:
+            break
+        expired = _trash_age_key(entry) <= cutoff
+        over_budget = TRASH_EVICTION_POLICY == "oldest" and (bytes_over > 0 or items_over > 0)
+        if not (expired or over_budget):
+            break
+        victims.append(order.pop(order.oldest))
+        bytes_over -= _trash_entry_size(entry)
+        items_over -= 1
+    if TRASH_EVICTION_POLICY == "largest":
+        while len(victims) < batch and (bytes_over > 0 or items_over > 0):
+            entry = order.pop(order.largest)
+            if entry is None:
+                break
+            victims.append(entry)
+            bytes_over -= _trash_entry_size(entry)
+            items_over -= 1
+    if not victims:
+        return 0, 0, 0
+
+    stored_before, free_before = content_store.stored_bytes, disk.free_blocks
+    for entry in victims:
+        trash_dir.purge_entry(entry.inode)
+        if order.holds(entry):  # Not purged; keep it a candidate
+            order.push(entry)
+    return len(victims), stored_before - content_store.stored_bytes, disk.free_blocks - free_before
+
+def record_user_change():
+    """Log the current user and user list after either changes"""
+    global users_dirty
+    users_dirty = True
+    journal.record("set_users", current_user=dict(current_user), user_list=[dict(user) for user in user_list])
+
+def _replay_paste(target, entry):
+    source = inode_table.get(entry["source"])
+    items = [inode_table.get(inode) for inode in entry["items"]]
+    if None in items or (entry["operation"] == "cut" and source is None):
+        return "Error: Paste source no longer exists."
+    copy_to_clipboard(items, entry["operation"], source)
+    return paste_items(target)
+
+def _replay_set_users(node, entry):
+    global users_dirty
+    users_dirty = True
+    current_user.update(entry["current_user"])
+    user_list[:] = entry["user_list"]
+    return "Users updated."
+
+# Journal ops that aren't methods of the node they were recorded against
+JOURNAL_FUNCTIONS = {
+    "paste": _replay_paste,
+    "set_users": _replay_set_users,
+    "rename_root_directory": lambda node, entry: rename_root_directory(node, *entry["args"]),
+    "move_root_to_trash": lambda node, entry: move_root_to_trash(node),
+}
+JOURNAL_METHODS = {
+    "create_file", "create_subdirectory", "delete_file", "delete_subdirectory",
+    "restore_file", "restore_directory", "delete_file_permanently",
+    "delete_directory_permanently", "rename_file", "rename_subdirectory",
+    "empty_trash", "set_content", "add_content", "purge_entry", "restore_entry",
+}
+
+def replay_journal(after_seq=0):
+    """Re-apply journaled operations newer than the checkpoint; returns how many ran"""
+    count = 0
+    journal.size = journal.cut_torn_tail()
+    journal.suspended += 1
+    try:
+        for entry in journal.read(after_seq):
+            journal.seq = entry["seq"]
+            journal.replay_time = entry.get("time")
+            op = entry["op"]
+            node = inode_table.get(entry.get("node"))
+            if op in JOURNAL_FUNCTIONS:
+                msg = JOURNAL_FUNCTIONS[op](node, entry)
+            elif op in JOURNAL_METHODS and node is not None:
+                msg = getattr(node, op)(*entry.get("args", []))
+            else:
+                msg = f"Error: Can't replay '{op}'."
+            if msg.startswith("Error"):
+                print(f"Warning: journal record {entry['seq']} ({op}) failed on replay: {msg}")
+            count += 1
+    finally:
+        journal.suspended -= 1
+        journal.replay_time = None
+    return count
+
+def has_unsaved_changes():
+    """Whether anything changed since the last checkpoint (only the roots' dirty flags are checked)"""
+    return users_dirty or any(root.dirty for root in root_directories)
+
+def clear_dirty(roots):
+    """Clear dirty flags after a checkpoint, visiting only the subtrees that changed"""
+    stack = [root for root in roots if root.dirty]
+    while stack:
+        directory = stack.pop()
+        directory.dirty = False
+        stack.extend(subdir for subdir in directory.subdirectories if subdir.dirty)
+
+def checkpoint_due():
+    """Checkpoint a changed tree no sooner than the min interval, sooner than the max after a burst"""
+    if not has_unsaved_changes():
+        return False
+    elapsed_ms = (time.monotonic() - journal.checkpoint_time) * 1000
+    if elapsed_ms >= AUTOSAVE_MAX_INTERVAL_MS:
+        return True
+    if elapsed_ms < AUTOSAVE_MIN_INTERVAL_MS:
+        return False
+    return (journal.seq - journal.checkpoint_seq >= AUTOSAVE_BURST_OPERATIONS
+            or journal.size >= JOURNAL_CHECKPOINT_BYTES)
+
+def persist_changes():
+    """Commit pending journal records; start a background checkpoint when one is due"""
+    journal.commit()
+    if checkpoint_due() and checkpoint_writer.start():
+        return "Changes saved to journal; checkpoint started."
+    return "Changes saved to journal."
+
+def snapshot_format(path):
+    """Snapshots ending in .fsb use the binary format, anything else JSON"""
+    return "binary" if path.lower().endswith(".fsb") else "json"
+
+# Both snapshot formats are written and read one node at a time: nodes are
+# walked with iter_tree() and each record names its parent's inode, so memory
+# use doesn't depend on tree depth and no nested copy of the tree is built.
+def snapshot_records(roots):
+    """Yield a record tuple per node, in iter_tree() order.
+
+    Directories give (False, inode, parent inode, name, timestamp, original
+    location, original parent inode or 0, trashed at or None); files add
+    permissions, allocation, start block, block count, size in bytes and chunk
+    keys. Records hold only immutable values, so a list of them can be written
+    out on another thread while the tree keeps changing.
+    """
+    for node, parent_inode in iter_tree(roots):
+        original_parent = node.original_parent
+        if type(node) is File:
+            yield (True, node.inode, parent_inode, node.name, node.timestamp, node.original_location,
+                   original_parent.inode if original_parent else 0, node.trashed_at, node.permissions,
+                   node.allocation, node.start_block, node.block_count, node.size_bytes, node.chunk_keys)
+        else:
+            yield (False, node.inode, parent_inode, node.name, node.timestamp, node.original_location,
+                   original_parent.inode if original_parent else 0, node.trashed_at)
+
+def write_snapshot(path, header, chunks, records, snapshot_format):
+    """Write a header, chunk table (ContentStore.to_dict()) and snapshot_records() to path, then fsync"""
+    if snapshot_format == "binary":
+        _write_binary_snapshot(path, header, chunks, records)
+    else:
+        _write_json_snapshot(path, header, chunks, records)
+
+# Saved (start block, block count) -> the file that claimed that run, while a
+# snapshot loads; sharing between copy-on-write copies isn't saved, so copies
+# find each other by their identical runs
+restored_runs = {}
+
+def read_snapshot(path):
+    """Build the tree saved at path onto the current disk, inode table and content store.
+
+    Returns (header, root directories); the header holds the users, next_inode
+    and journal_seq.
+    """
+    try:
+        if snapshot_format(path) == "binary":
+            return _read_binary_snapshot(path)
+        return _read_json_snapshot(path)
+    finally:
+        restored_runs.clear()
+
+class _TreeBuilder:
+    """Attaches nodes read from a snapshot stream to their parents"""
+
+    def __init__(self):
+        self.roots = []
+        self.nodes = {}    # saved inode -> node
+        self.trashed = []  # (node, saved original parent inode)
+
+    def add(self, node, saved_inode, parent_inode, original_parent_inode):
+        self.nodes[saved_inode] = node
+        if node.original_location is not None:
+            self.trashed.append((node, original_parent_inode))
+        if not parent_inode:
+            self.roots.append(node)
+        elif isinstance(node, File):
+            self.nodes[parent_inode].add_file(node)
+        else:
+            self.nodes[parent_inode].add_subdirectory(node)
+
+    def finish(self):
+        for node, original_parent_inode in self.trashed:
+            node.original_parent = self.nodes.get(original_parent_inode)
+        return self.roots
+
+# JSON snapshot: a header line, one line per content chunk, then one line per
+# node. Saves from before the streaming format are a single nested document.
+JSON_SNAPSHOT_FORMAT = "fs-jsonl-1"
+
+def _write_json_snapshot(path, header, chunks, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(dict(header, format=JSON_SNAPSHOT_FORMAT)) + "\n")
+        for key, (offset, byte_length) in chunks.items():
+            f.write(json.dumps({"chunk": key, "offset": offset, "length": byte_length}) + "\n")
+        for record in records:
+            data = {
+                "kind": "file" if record[0] else "directory",
+                "parent": record[2],
+                "name": record[3],
+                "timestamp": record[4],
+                "inode": record[1],
+                "original_location": record[5],
+                "original_parent_inode": record[6] or None,
+                "trashed_at": record[7]
+            }
+            if record[0]:
+                (data["permissions"], data["allocation"], data["start_block"],
+                 data["block_count"], data["size_bytes"], keys) = record[8:]
+                data["chunks"] = list(keys)
+            f.write(json.dumps(data) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _read_json_snapshot(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != JSON_SNAPSHOT_FORMAT:
+            f.seek(0)
+            return _read_nested_json_snapshot(json.load(f))
+
+        builder = _TreeBuilder()
+        for line in f:
+            record = json.loads(line)
+            if "chunk" in record:
+                content_store.add_saved_chunk(record["chunk"], record["offset"], record["length"])
+            elif record["kind"] == "file":
+                builder.add(File.from_dict(record), record["inode"], record["parent"],
+                            record.get("original_parent_inode"))
+            else:
+                builder.add(Directory.from_dict(record), record["inode"], record["parent"],
+                            record.get("original_parent_inode"))
+    return header, builder.finish()
+
+def _read_nested_json_snapshot(data):
+    content_store.load(data.get("content_store", {}))
+    dir_data_list = data["root_directories"]
+    roots = [Directory.from_dict(dir_data) for dir_data in dir_data_list]
+    
+    # Rebuild parent references for items in trash
+    for directory, dir_data in zip(roots, dir_data_list):
+        if directory.name == "Trash":
+            saved_entries = dir_data.get("files", []) + dir_data.get("subdirectories", [])
+            for trashed, entry_data in zip([*directory.files, *directory.subdirectories], saved_entries):
+                if not trashed.original_location or trashed.original_location == "Root":
+                    continue
+                parent = inode_table.get(entry_data.get("original_parent_inode"))
+                if not isinstance(parent, Directory):
+                    # Older saves only recorded the parent's name
+                    parent = find_directory(trashed.original_location, roots)
+                trashed.original_parent = parent
+            break
+    return data, roots
+
+# Binary snapshot (.fsb) layout, all integers little-endian:
+#   magic, u32-length-prefixed JSON header (users, next_inode, journal_seq),
+#   chunk table: u32 count, then (16-byte key, u64 blob offset, u32 length) per chunk,
+#   node records: u32 length + record per node in pre-order, up to the string table,
+#   string table: u32 count, then u32 length + UTF-8 bytes per string,
+#   footer: u64 offset of the string table.
+# A record is NODE_RECORD, followed for files by FILE_RECORD and one u32 chunk
+# index per chunk, then for trash entries by TRASH_RECORD. Records are length
+# prefixed, so fields added at the end are optional for the reader. Names are stored as (stem, suffix) string indexes so that
+# extensions are shared through the string table, which goes last so records
+# can be streamed out as the tree is walked.
+SNAPSHOT_MAGIC = b"FSB2"
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+CHUNK_RECORD = struct.Struct("<16sQI")
+# kind, inode, parent inode (0 = root), stem, suffix, timestamp, original location (-1 = none), original parent inode
+NODE_RECORD = struct.Struct("<BIIIIqiI")
+# permissions, allocation, start block, block count, size in bytes, chunk count
+FILE_RECORD = struct.Struct("<BIIIQI")
+# time the entry was moved to trash
+TRASH_RECORD = struct.Struct("<q")
+NODE_DIRECTORY, NODE_FILE = 0, 1
+
+def _write_binary_snapshot(path, header, chunks, records):
+    strings = {}
+    def string_index(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    with open(path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        header_bytes = json.dumps(header).encode('utf-8')
+        f.write(U32.pack(len(header_bytes)) + header_bytes)
+
+        chunk_index = {}
+        f.write(U32.pack(len(chunks)))
+        for key, (offset, byte_length) in chunks.items():
+            chunk_index[key] = len(chunk_index)
+            f.write(CHUNK_RECORD.pack(bytes.fromhex(key), offset, byte_length))
+
+        for node in records:
+            is_file, inode, parent_inode, name, timestamp, original_location, original_parent, trashed_at = node[:8]
+            stem, dot, extension = name.rpartition(".")
+            if not dot:
+                stem, extension = name, ""
+            else:
+                extension = dot + extension
+            original_location = string_index(original_location) if original_location is not None else -1
+            record = NODE_RECORD.pack(NODE_FILE if is_file else NODE_DIRECTORY, inode, parent_inode,
+                                      string_index(stem), string_index(extension), timestamp,
+                                      original_location, original_parent)
+            if is_file:
+                permissions, allocation, start_block, block_count, size_bytes, keys = node[8:]
+                record += FILE_RECORD.pack(permissions, string_index(allocation), start_block,
+                                           block_count, size_bytes, len(keys))
+                if keys:
+                    record += struct.pack(f"<{len(keys)}I", *(chunk_index[key] for key in keys))
+            if trashed_at is not None:
+                record += TRASH_RECORD.pack(trashed_at)
+            f.write(U32.pack(len(record)) + record)
+
+        strings_offset = f.tell()
+        f.write(U32.pack(len(strings)))
+        for value in strings:
+            encoded = value.encode('utf-8')
+            f.write(U32.pack(len(encoded)) + encoded)
+        f.write(U64.pack(strings_offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _read_binary_snapshot(path):
+    with open(path, 'rb') as f:
+        if f.read(4) != SNAPSHOT_MAGIC:
+            raise ValueError(f"'{path}' is not a binary file system snapshot")
+
+        def read_u32():
+            return U32.unpack(f.read(4))[0]
+
+        # The string table sits at the end; read it first
+        f.seek(-U64.size, os.SEEK_END)
+        strings_offset = U64.unpack(f.read(U64.size))[0]
+        f.seek(strings_offset)
+        strings = []
+        for _ in range(read_u32()):
+            strings.append(sys.intern(f.read(read_u32()).decode('utf-8')))
+
+        f.seek(len(SNAPSHOT_MAGIC))
+        header = json.loads(f.read(read_u32()))
+
+        chunk_keys = []
+        for _ in range(read_u32()):
+            raw_key, blob_offset, byte_length = CHUNK_RECORD.unpack(f.read(CHUNK_RECORD.size))
+            key = raw_key.hex()
+            chunk_keys.append(key)
+            content_store.add_saved_chunk(key, blob_offset, byte_length)
+
+        builder = _TreeBuilder()
+        while f.tell() < strings_offset:
+            record = f.read(read_u32())
+            (kind, inode, parent_inode, stem, suffix, timestamp,
+             original_location, original_parent) = NODE_RECORD.unpack_from(record)
+            name = strings[stem] + strings[suffix]
+            end = NODE_RECORD.size
+            if kind == NODE_FILE:
+                (permissions, allocation, start_block, block_count,
+                 _, chunk_count) = FILE_RECORD.unpack_from(record, end)
+                end += FILE_RECORD.size
+                node = File(name, strings[allocation], permissions, inode)
+                if chunk_count:
+                    indexes = struct.unpack_from(f"<{chunk_count}I", record, end)
+                    end += 4 * chunk_count
+                    node.chunk_keys = tuple(chunk_keys[index] for index in indexes)
+                    content_store.acquire(node.chunk_keys)
+                node.restore_blocks(start_block, block_count)
+            else:
+                node = Directory(name, inode)
+            node.timestamp = timestamp
+            if original_location >= 0:
+                node.original_location = strings[original_location]
+                trashed_at = TRASH_RECORD.unpack_from(record, end)[0] if len(record) > end else None
+                node.trashed_at = trashed_time(node.original_location, trashed_at)
+            builder.add(node, inode, parent_inode, original_parent)
+    return header, builder.finish()
+
+def convert_snapshot(source_path, destination_path):
+    """Convert a snapshot between the JSON and binary formats (picked by file extension).
+
+    The converted snapshot gets a blob file of its own (destination_path +
+    ".blob") holding a copy of its content; the source snapshot, its blob and
+    the live state are only read.
+    """
+    global disk, inode_table, content_store, content_index, journal
+    saved_state = (disk, inode_table, content_store, content_index, journal)
+    disk, inode_table, content_store = BlockDevice(MAX_BLOCKS), InodeTable(), ContentStore()
+    content_index, journal = ContentIndex(), Journal(os.devnull)
+    try:
+        blob_path = destination_path + ".blob"
+        header, roots = read_snapshot(source_path)
+        content_store.use_blob(header.get("blob", BLOB_FILE_PATH))
+        if any(os.path.abspath(blob_path) == os.path.abspath(path) for path in (content_store.blob_path, BLOB_FILE_PATH)):
+            return f"Error converting snapshot: '{blob_path}' is a blob file in use."
+        content_store.discard_unreferenced()
+        blob_flush = BlobFlush(content_store, compact=True, new_path=blob_path).write()
+        header = {key: header[key] for key in ("current_user", "user_list", "next_inode", "journal_seq") if key in header}
+        header["blob"] = blob_flush.blob_path
+        write_snapshot(destination_path, header, blob_flush.chunks, snapshot_records(roots),
+                       snapshot_format(destination_path))
+        return f"Converted '{source_path}' to '{destination_path}'."
+    except Exception as e:
+        return f"Error converting snapshot: {str(e)}"
+    finally:
+        disk, inode_table, content_store, content_index, journal = saved_state
+
+def take_snapshot():
+    """Capture the state a checkpoint needs as detached values.
+
+    Runs on the UI thread and does no file I/O: it copies every node into a
+    record and plans the blob write. Writing the blob and the records out is
+    left to write_checkpoint(), which may run on any thread. Journal records
+    the snapshot covers don't have to be committed first; a replay skips them.
+    """
+    global users_dirty
+    # Content goes to the blob file; the snapshot only records where it is
+    blob_flush = content_store.start_flush()
     # Convert user_list to a serializable format
     serializable_user_list = []
     for user in user_list:
@@ -440,29 +2316,200 @@ def save_file_system():
             "role": user["role"]  # UserRole enum values are strings, so they're already serializable
         })
     
-    data = {
-        "current_user": current_user,
+    header = {
+        "current_user": dict(current_user),
         "user_list": serializable_user_list,  # Add user list to saved data
-        "root_directories": [directory.to_dict() for directory in root_directories]
+        "next_inode": inode_table.next_inode,  # Replayed creates must get the same inodes
+        "journal_seq": journal.seq,  # Journal records up to here are part of this state
+        "users_dirty": users_dirty  # Not written out: restored if the checkpoint fails
     }
-    
+    records = list(snapshot_records(root_directories))
+    clear_dirty(root_directories)
+    users_dirty = False
+    return header, blob_flush, records, content_index.snapshot(), list(content_store.retired)
+
+def write_checkpoint(snapshot, path, index_path):
+    """Write a take_snapshot() result to path (and its content index to index_path); touches no shared state.
+
+    New content goes to the blob first, so the state file only records
+    offsets that are on disk. Blob files retired by earlier compactions are
+    deleted once the new state file is in place, since it no longer refers
+    to them. Call content_store.finish_flush() with the snapshot's BlobFlush
+    afterwards, on the thread that owns the content store.
+    """
+    header, blob_flush, records, index, retired = snapshot
+    blob_flush.write()
+    header = {key: value for key, value in header.items() if key != "users_dirty"}
+    header["blob"] = blob_flush.blob_path  # Chunk offsets point into this file
+    temp_path = path + ".tmp"
+    write_snapshot(temp_path, header, blob_flush.chunks, records, snapshot_format(path))
+    os.replace(temp_path, path)
+    for blob_path in retired:
+        try:
+            os.remove(blob_path)
+        except FileNotFoundError:
+            pass
+    # The index names the checkpoint it belongs to, so a crash between the two
+    # replaces is noticed on load
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"journal_seq": header["journal_seq"], "files": index}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, index_path)
+
+def load_content_index(journal_seq):
+    """Load the content index saved with the checkpoint, or rebuild it by reading every file"""
+    try:
+        with open(INDEX_FILE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("journal_seq") == journal_seq:
+            content_index.load(data["files"])
+            return
+    except (OSError, ValueError):
+        pass
+    print("Content index missing or out of date, rebuilding it")
+    for node, _ in iter_tree(root_directories):
+        if isinstance(node, File) and node.chunk_keys:
+            content_index.set_text(node, node.content)
+
+def restore_dirty(header):
+    """Keep the changes a failed checkpoint was to save due for the next one; they're still in the journal"""
+    global users_dirty
+    for root in root_directories:
+        root.dirty = True
+    users_dirty = users_dirty or header["users_dirty"]
+
+def save_file_system():
+    """Checkpoint: save the file system state AND user list to SAVE_FILE_PATH and clear the journal"""
     try:
-        with open(SAVE_FILE_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
+        checkpoint_writer.wait()  # Never write two checkpoints at once
+        journal.commit()
+        snapshot = take_snapshot()
+        try:
+            write_checkpoint(snapshot, SAVE_FILE_PATH, INDEX_FILE_PATH)
+        except Exception:
+            restore_dirty(snapshot[0])
+            raise
+        content_store.finish_flush(snapshot[1])
+        journal.discard_through(snapshot[0]["journal_seq"])
+        content_store.forget_retired(snapshot[4])
         return "File system state saved successfully."
     except Exception as e:
         return f"Error saving file system: {str(e)}"
 
+class CheckpointWriter:
+    """Writes checkpoints on a worker thread so the UI isn't blocked while they're written.
+
+    start() takes the snapshot on the calling (UI) thread and hands it to a
+    worker, which writes the blob and the state file and fsyncs them; poll()
+    is called from the UI thread until the worker is done and then finishes
+    the checkpoint there, recording the new blob offsets. Only one checkpoint
+    runs at a time.
+    """
+
+    def __init__(self):
+        self.thread = None
+        self.snapshot = None
+        self.error = None
+        self.snapshot_seconds = 0.0  # Time the UI thread spent taking the last snapshot
+        self.write_seconds = 0.0     # Time the worker spent writing it
+        self.max_write_seconds = 0.0
+        self.total_write_seconds = 0.0
+        self.count = 0
+        self.last_saved = None
+
+    @property
+    def busy(self):
+        return self.thread is not None
+
+    def start(self):
+        """Start a background checkpoint; returns False if one is already running"""
+        if self.busy:
+            return False
+        start_time = time.perf_counter()
+        snapshot = take_snapshot()
+        self.snapshot_seconds = time.perf_counter() - start_time
+        self.snapshot = snapshot
+        self.error = None
+        self.thread = threading.Thread(target=self._write, args=(snapshot, SAVE_FILE_PATH, INDEX_FILE_PATH),
+                                       name="checkpoint", daemon=True)
+        self.thread.start()
+        return True
+
+    def _write(self, snapshot, path, index_path):
+        start_time = time.perf_counter()
+        try:
+            write_checkpoint(snapshot, path, index_path)
+        except Exception as e:
+            self.error = e
+        self.write_seconds = time.perf_counter() - start_time
+
+    def poll(self):
+        """Finish a checkpoint whose worker is done; returns its message, or None if none finished"""
+        if self.thread is None or self.thread.is_alive():
+            return None
+        self.thread = None
+        header, blob_flush, _, _, retired = self.snapshot
+        self.snapshot = None
+        if self.error is not None:
+            restore_dirty(header)
+            return f"Error saving file system: {str(self.error)}"
+        content_store.finish_flush(blob_flush)
+        # Records made while the worker ran stay in the journal
+        journal.discard_through(header["journal_seq"])
+        content_store.forget_retired(retired)
+        self.count += 1
+        self.total_write_seconds += self.write_seconds
+        self.max_write_seconds = max(self.max_write_seconds, self.write_seconds)
+        self.last_saved = current_timestamp()
+        return "File system state saved successfully."
+
+    def wait(self):
+        """Block until a running checkpoint is written (used on close)"""
+        if self.thread is not None:
+            self.thread.join()
+        return self.poll()
+
+    def get_metrics_display(self):
+        if not self.count:
+            return "No checkpoints written yet"
+        return (f"last: snapshot {self.snapshot_seconds * 1000:.0f} ms + write {self.write_seconds * 1000:.0f} ms, "
+                f"average write {self.total_write_seconds / self.count * 1000:.0f} ms, "
+                f"max {self.max_write_seconds * 1000:.0f} ms over {self.count} checkpoint(s)")
+
+checkpoint_writer = CheckpointWriter()
+
 def load_file_system():
-    """Load the file system state AND user list from a JSON file"""
-    global root_directories, trash_dir, current_user, user_list
+    """Load the file system state AND user list from SAVE_FILE_PATH, then replay the journal.
+
+    The model code works on the module globals, so the state is built there;
+    if reading or replaying fails, the state from before the load is put back
+    rather than leaving the old tree on a half-built disk and inode table.
+    """
+    global root_directories, trash_dir, current_user, user_list, disk, inode_table, content_store, content_index
+    global users_dirty
     
     if not os.path.exists(SAVE_FILE_PATH):
+        # Changes made before the first checkpoint are only in the journal
+        if replay_journal():
+            return "File system state restored from journal."
         return "No saved state found. Starting with default file system."
     
+    saved_state = (disk, inode_table, content_store, content_index, root_directories, trash_dir,
+                   current_user, dict(current_user), list(user_list), users_dirty,
+                   journal.seq, journal.checkpoint_seq)
     try:
-        with open(SAVE_FILE_PATH, 'r') as f:
-            data = json.load(f)
+        # Load directories onto a fresh disk and inode table so saved block runs
+        # and inode numbers can be reclaimed
+        disk = BlockDevice(MAX_BLOCKS)
+        inode_table = InodeTable()
+        content_store = ContentStore()
+        content_index = ContentIndex()
+        data, root_directories = read_snapshot(SAVE_FILE_PATH)
+        content_store.use_blob(data.get("blob", BLOB_FILE_PATH))
+        content_store.discard_unreferenced()
+        clear_dirty(root_directories)
         
         # Load current user
         if "current_user" in data:
@@ -480,21 +2527,26 @@ def load_file_system():
             # If no user_list in saved data, keep the default admin user
             print("No user list found in saved data, keeping default admin user")
         
-        # Load directories
-        root_directories = [Directory.from_dict(dir_data) for dir_data in data["root_directories"]]
-        
-        # Find the trash directory and rebuild parent references
+        # Find the trash directory
         for directory in root_directories:
             if directory.name == "Trash":
                 trash_dir = directory
-                # Rebuild parent references for items in trash
-                for trashed_dir in trash_dir.subdirectories:
-                    if trashed_dir.original_location:
-                        trashed_dir.original_parent = find_directory(trashed_dir.original_location)
                 break
         
+        # Replay operations made after the checkpoint
+        inode_table.next_inode = max(inode_table.next_inode, data.get("next_inode", 1))
+        journal.seq = journal.checkpoint_seq = data.get("journal_seq", 0)
+        load_content_index(journal.seq)
+        replay_journal(journal.seq)
+        
         return "File system state loaded successfully."
     except Exception as e:
+        (disk, inode_table, content_store, content_index, root_directories, trash_dir,
+         current_user, saved_user, saved_users, users_dirty,
+         journal.seq, journal.checkpoint_seq) = saved_state
+        current_user.clear()
+        current_user.update(saved_user)
+        user_list[:] = saved_users
         return f"Error loading file system: {str(e)}"
 
 def open_file_with_os_application(file_obj):
@@ -516,7 +2568,7 @@ def open_file_with_os_application(file_obj):
         # Create a temporary file with the appropriate extension
         with tempfile.NamedTemporaryFile(mode='w', suffix=extension, delete=False, encoding='utf-8') as temp_file:
             # Write the content to the temporary file
-            content = file_obj.content if file_obj.content else f"# {file_obj.name}\n\nThis file was created in the File System Explorer.\nFile Size: {file_obj.get_size_display()}\nAllocation: {file_obj.allocation}\nLast Modified: {file_obj.timestamp}\n\n"
+            content = file_obj.content if file_obj.content else f"# {file_obj.name}\n\nThis file was created in the File System Explorer.\nFile Size: {file_obj.get_size_display()}\nAllocation: {file_obj.allocation}\nLast Modified: {format_timestamp(file_obj.timestamp)}\n\n"
             temp_file.write(content)
             temp_file_path = temp_file.name
         
@@ -559,6 +2611,282 @@ def open_file_with_os_application(file_obj):
             messagebox.showerror("Error", f"Could not open file with any available method:\n{str(e2)}")
             return False
 
+class IconSlot:
+    """The canvas items that draw one visible row of the icon view"""
+    __slots__ = ("tag", "background", "image", "glyph", "label", "row", "node", "position", "highlighted", "has_image")
+
+    def __init__(self, canvas, number):
+        self.tag = f"icon-slot-{number}"
+        tags = ("icon", self.tag)
+        self.background = canvas.create_rectangle(0, 0, ICON_ITEM_WIDTH, ICON_ITEM_HEIGHT, fill=ICON_SELECTION_COLOR,
+                                                  outline=ICON_SELECTION_COLOR, state="hidden", tags=tags)
+        self.image = canvas.create_image(ICON_ITEM_WIDTH // 2, 12, anchor="n", state="hidden", tags=tags)
+        self.glyph = canvas.create_text(ICON_ITEM_WIDTH // 2, 12, anchor="n", font=("Arial", 56), fill="white",
+                                        state="hidden", tags=tags)
+        self.label = canvas.create_text(ICON_ITEM_WIDTH // 2, 100, anchor="n", font=("Arial", 11), fill="white",
+                                        width=ICON_ITEM_WIDTH - 10, justify="center", state="hidden", tags=tags)
+        self.row = None  # Row index and node the slot currently shows
+        self.node = None
+        self.position = (0, 0)
+        self.highlighted = False
+        self.has_image = False
+
+class IconGridRenderer:
+    """Draws rows of nodes as a grid of icons on one canvas, with no widget per item.
+
+    Only the rows in view are drawn, by a pool of IconSlots sized to the
+    viewport: row i is drawn by slot i % len(slots), so scrolling leaves the
+    slots that stay in view alone. Hit testing is plain grid arithmetic.
+    icon_for(node) returns (image or None, fallback glyph) and label_for(node)
+    the text under the icon.
+    """
+
+    def __init__(self, canvas, icon_for, label_for):
+        self.canvas = canvas
+        self.icon_for = icon_for
+        self.label_for = label_for
+        self.rows = []
+        self.slots = []
+        self.columns = 1
+        self.highlighted = set()  # Highlighted row indexes, drawn whenever the row is in view
+
+    def set_rows(self, rows, keep_items=False):
+        """Show rows, dropping highlights. Unless keep_items is set every slot is redrawn,
+        otherwise a slot still showing a node that stays in view is left alone."""
+        self.rows = rows
+        self.highlighted = set()
+        if not keep_items:
+            for slot in self.slots:
+                slot.node = None
+                self._release(slot)
+        self.layout()
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        self.layout()
+
+    def total_height(self):
+        return -(-len(self.rows) // self.columns) * ICON_CELL_HEIGHT
+
+    def layout(self):
+        """Fit the columns to the canvas width, size the scroll region and draw the rows in view"""
+        canvas_width = self.canvas.winfo_width()
+        if canvas_width <= 1:
+            return
+        self.columns = max(1, canvas_width // ICON_CELL_WIDTH)
+        self.canvas.configure(scrollregion=(0, 0, canvas_width, self.total_height()))
+        self.render()
+
+    def render(self):
+        """Bind slots to the rows in the viewport, growing the pool to fit it"""
+        canvas_height = self.canvas.winfo_height()
+        if canvas_height <= 1:
+            return
+        columns = self.columns
+        view_top = max(0, self.canvas.canvasy(0))
+        first_row = int(view_top // ICON_CELL_HEIGHT)
+        last_row = int((view_top + canvas_height) // ICON_CELL_HEIGHT)
+        first = first_row * columns
+        end = min(len(self.rows), (last_row + 1) * columns)
+
+        needed = (last_row - first_row + 1) * columns
+        if len(self.slots) < needed:
+            # A larger pool changes which slot draws each row, so start the binding over
+            for slot in self.slots:
+                self._release(slot)
+            while len(self.slots) < needed:
+                self.slots.append(IconSlot(self.canvas, len(self.slots)))
+
+        pool_size = len(self.slots)
+        in_view = set()
+        for index in range(first, end):
+            self._bind(self.slots[index % pool_size], index)
+            in_view.add(index % pool_size)
+        for number, slot in enumerate(self.slots):
+            if number not in in_view:
+                self._release(slot)
+
+    def _bind(self, slot, index):
+        """Point a slot at row index, reconfiguring only what differs from what it shows"""
+        canvas = self.canvas
+        node = self.rows[index]
+        shown = slot.row is not None
+        if slot.node is not node:
+            image, glyph = self.icon_for(node)
+            canvas.itemconfigure(slot.image, image=image or "", state="normal" if image else "hidden")
+            canvas.itemconfigure(slot.glyph, text="" if image else glyph, state="hidden" if image else "normal")
+            canvas.itemconfigure(slot.label, text=self.label_for(node), state="normal")
+            slot.node = node
+            slot.has_image = bool(image)
+        elif not shown:
+            canvas.itemconfigure(slot.image if slot.has_image else slot.glyph, state="normal")
+            canvas.itemconfigure(slot.label, state="normal")
+        row, column = divmod(index, self.columns)
+        position = (column * ICON_CELL_WIDTH + 25, row * ICON_CELL_HEIGHT + 25)
+        if slot.position != position:
+            canvas.move(slot.tag, position[0] - slot.position[0], position[1] - slot.position[1])
+            slot.position = position
+        slot.row = index
+        highlighted = index in self.highlighted
+        if slot.highlighted != highlighted:
+            canvas.itemconfigure(slot.background, state="normal" if highlighted else "hidden")
+            slot.highlighted = highlighted
+
+    def _release(self, slot):
+        """Hide a slot that has no visible row to show"""
+        if slot.row is not None:
+            self.canvas.itemconfigure(slot.tag, state="hidden")
+            slot.row = None
+            slot.highlighted = False
+
+    def visible_slot(self, index):
+        """The slot currently drawing row index, or None if the row is scrolled out"""
+        if not self.slots:
+            return None
+        slot = self.slots[index % len(self.slots)]
+        return slot if slot.row == index else None
+
+    def row_at(self, x, y):
+        """Row index of the icon at canvas coordinates (x, y), or None for empty space"""
+        if x < 0 or y < 0:
+            return None
+        column, x_offset = divmod(int(x), ICON_CELL_WIDTH)
+        row, y_offset = divmod(int(y), ICON_CELL_HEIGHT)
+        if column >= self.columns or not (25 <= x_offset < 25 + ICON_ITEM_WIDTH and 25 <= y_offset < 25 + ICON_ITEM_HEIGHT):
+            return None
+        index = row * self.columns + column
+        return index if index < len(self.rows) else None
+
+    def set_highlight(self, index, highlight):
+        if highlight:
+            self.highlighted.add(index)
+        else:
+            self.highlighted.discard(index)
+        slot = self.visible_slot(index)
+        if slot is not None and slot.highlighted != highlight:
+            self.canvas.itemconfigure(slot.background, state="normal" if highlight else "hidden")
+            slot.highlighted = highlight
+
+    def clear_highlights(self):
+        for index in list(self.highlighted):
+            self.set_highlight(index, False)
+
+    def highlight_exactly(self, indexes):
+        """Make indexes the highlighted rows, touching only rows whose state changes"""
+        indexes = set(indexes)
+        for index in self.highlighted - indexes:
+            self.set_highlight(index, False)
+        for index in indexes - self.highlighted:
+            self.set_highlight(index, True)
+
+    def rows_in_rect(self, x1, y1, x2, y2):
+        """Row indexes whose icon intersects the canvas rectangle (x1, y1)-(x2, y2), from the grid layout"""
+        first_column = max(0, int((x1 - 25 - ICON_ITEM_WIDTH) // ICON_CELL_WIDTH) + 1)
+        last_column = min(self.columns - 1, -int((25 - x2) // ICON_CELL_WIDTH) - 1)
+        first_row = max(0, int((y1 - 25 - ICON_ITEM_HEIGHT) // ICON_CELL_HEIGHT) + 1)
+        last_row = min(-(-len(self.rows) // self.columns) - 1, -int((25 - y2) // ICON_CELL_HEIGHT) - 1)
+        count = len(self.rows)
+        return [index
+                for row in range(first_row, last_row + 1)
+                for index in range(row * self.columns + first_column, min(row * self.columns + last_column + 1, count))]
+
+    def scroll_to(self, index):
+        """Scroll so row index is in view"""
+        total_height = self.total_height()
+        if total_height <= 0:
+            return
+        top = index // self.columns * ICON_CELL_HEIGHT
+        view_top = self.canvas.canvasy(0)
+        view_bottom = view_top + self.canvas.winfo_height()
+        if top < view_top or top + ICON_CELL_HEIGHT > view_bottom:
+            self.canvas.yview_moveto(top / total_height)
+
+class SelectionModel:
+    """Which rows of the icon view are selected, kept as a set of node inodes.
+
+    row_of (inode -> row index) and kinds (inode -> "directory" or "file")
+    are filled in once per row, also as rows are appended, so selecting,
+    range selection and classifying a selection never rescan the rows.
+    """
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, rows):
+        """Track a new list of rows (shared with the renderer, which may append to it), selecting nothing"""
+        self.rows = rows
+        self.row_of = {}
+        self.kinds = {}
+        self.selected = set()
+        self.anchor = None  # Row that Shift+click ranges start from
+
+    def _index(self):
+        rows = self.rows
+        if len(self.row_of) < len(rows):
+            for index in range(len(self.row_of), len(rows)):
+                node = rows[index]
+                self.row_of[node.inode] = index
+                self.kinds[node.inode] = "directory" if isinstance(node, Directory) else "file"
+        return self.row_of
+
+    def row(self, node):
+        """Row index showing node, or None"""
+        index = self._index().get(node.inode)
+        return index if index is not None and self.rows[index] is node else None
+
+    def __len__(self):
+        return len(self.selected)
+
+    def __contains__(self, index):
+        return index < len(self.rows) and self.rows[index].inode in self.selected
+
+    def select_only(self, index):
+        self.selected = {self.rows[index].inode}
+        self.anchor = index
+
+    def toggle(self, index):
+        self.selected ^= {self.rows[index].inode}
+        self.anchor = index
+
+    def extend_to(self, index):
+        """Select the rows from the anchor through index (Shift+click)"""
+        anchor = self.anchor if self.anchor is not None else index
+        low, high = min(anchor, index), max(anchor, index)
+        self.selected = {node.inode for node in self.rows[low:high + 1]}
+
+    def select_rows(self, indexes):
+        rows = self.rows
+        self.selected = {rows[index].inode for index in indexes}
+        self.anchor = min(indexes) if indexes else None
+
+    def select_all(self):
+        self.selected = {node.inode for node in self.rows}
+        self.anchor = 0 if self.rows else None
+
+    def clear(self):
+        self.selected = set()
+        self.anchor = None
+
+    def indexes(self):
+        """Selected row indexes, in display order"""
+        row_of = self._index()
+        return sorted(row_of[inode] for inode in self.selected)
+
+    def nodes(self, kind=None):
+        """Selected nodes in display order, optionally only "directory" or "file" ones"""
+        rows = self.rows
+        if kind is None:
+            return [rows[index] for index in self.indexes()]
+        kinds = self.kinds
+        return [rows[index] for index in self.indexes() if kinds[rows[index].inode] == kind]
+
+    def names(self, kind=None):
+        return [node.name for node in self.nodes(kind)]
+
+    def kind(self, index):
+        self._index()
+        return self.kinds[self.rows[index].inode]
+
 class FileSystemApp:
     def __init__(self, master):
         self.master = master
@@ -569,6 +2897,7 @@ class FileSystemApp:
         self.current_directory = None
         self.selected_item = None
         self.selected_item_type = None  # 'file' or 'directory'
+        self.selected_inode = None  # Set when the selection comes from the directory tree
 
         # Navigation history
         self.navigation_history = []
@@ -704,8 +3033,6 @@ class FileSystemApp:
                         canvas_bg = "#f0f0f0" if "light" in self.current_theme.lower() or self.current_theme in ["default", "clam", "alt"] else "#2e2e2e"
                     
                     self.icon_canvas.configure(bg=canvas_bg)
-                    if hasattr(self, 'icon_grid_frame'):
-                        self.icon_grid_frame.configure(bg=canvas_bg)
                 except:
                     pass
             
@@ -798,6 +3125,14 @@ class FileSystemApp:
                 # Clear selection after deletion
                 self.clear_selection()
 
+        def safe_keyboard_select_all(event):
+            # Entries and text widgets keep their own select-all
+            focused_widget = self.master.focus_get()
+            if isinstance(focused_widget, (tk.Text, tk.Entry, ttk.Entry)):
+                return
+            self.select_all_items()
+            return "break"
+
         def safe_keyboard_toggle_panel(event):
             self.toggle_left_panel()
 
@@ -812,6 +3147,7 @@ class FileSystemApp:
         self.master.bind_all("<Control-c>", safe_keyboard_copy)
         self.master.bind_all("<Control-v>", safe_keyboard_paste)
         self.master.bind_all("<Delete>", safe_keyboard_delete)
+        self.master.bind_all("<Control-a>", safe_keyboard_select_all)
         self.master.bind_all("<F9>", safe_keyboard_toggle_panel)  # F9 to toggle left panel
         self.master.bind_all("<Control-m>", safe_keyboard_custom_minimize)  # Ctrl+M for custom minimize
 
@@ -831,7 +3167,7 @@ class FileSystemApp:
             
             # Navigate to new directory
             self.current_directory = directory
-            self.current_path_label.config(text=f"Current: {self.current_directory.name}")
+            self.update_current_path_label()
             
             print(f"Navigated to '{directory.name}'. Can go back: {self.history_index > 0}")
             
@@ -854,7 +3190,7 @@ class FileSystemApp:
             
             # Set the directory without adding to history (this is a back navigation)
             self.current_directory = previous_directory
-            self.current_path_label.config(text=f"Current: {self.current_directory.name}")
+            self.update_current_path_label()
             
             # Update button states and refresh content
             self.update_navigation_buttons()
@@ -875,7 +3211,7 @@ class FileSystemApp:
             
             # Set the directory without adding to history (this is a forward navigation)
             self.current_directory = next_directory
-            self.current_path_label.config(text=f"Current: {self.current_directory.name}")
+            self.update_current_path_label()
             
             # Update button states and refresh content
             self.update_navigation_buttons()
@@ -945,12 +3281,24 @@ class FileSystemApp:
         self.search_label = ttk.Label(self.search_frame, text="Search: ")
         self.search_label.pack(side=tk.LEFT, padx=5)
 
-        self.search_entry = ttk.Entry(self.search_frame)
+        # Name search runs recursively from the current directory; plain text matches
+        # anywhere in a name, * ? [ ] are globs and "re:" starts a regular expression
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.on_search_typed())
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<Return>", lambda e: self.search())
+        self.search_after_id = None  # Debounced search waiting for typing to pause
 
         self.search_button = ttk.Button(self.search_frame, text="Search", command=self.search)
         self.search_button.pack(side=tk.LEFT, padx=5)
 
+        # Search file contents (whole tree) instead of names in the current directory
+        self.search_contents_var = tk.BooleanVar(value=False)
+        self.search_contents_check = ttk.Checkbutton(self.search_frame, text="Contents",
+                                                     variable=self.search_contents_var)
+        self.search_contents_check.pack(side=tk.LEFT, padx=5)
+
         # User management frame (top right)
         self.user_frame = ttk.Frame(top_frame)
         self.user_frame.pack(side=tk.RIGHT)
@@ -988,6 +3336,14 @@ class FileSystemApp:
         self.directory_tree.bind("<<TreeviewSelect>>", self.on_directory_select)
         self.directory_tree.bind("<Button-3>", self.on_directory_right_click)
         self.directory_tree.bind("<Button-1>", self.dismiss_context_menus)
+        self.directory_tree.bind("<<TreeviewOpen>>", self.on_directory_tree_open)
+
+        # The sidebar shows the whole hierarchy but only fills in a directory's
+        # children once it is expanded. Items are keyed by inode number.
+        self.tree_nodes = {}  # Item id -> Directory it shows
+        self.tree_names = {}  # Item id -> name it was last drawn with
+        self.tree_loaded = {"": None}  # Item ids whose children are filled in ("" is the top level)
+        self.tree_placeholders = set()  # Unexpanded item ids given a dummy child so they show an expand arrow
 
         # Right panel - Content view (STATIC - fills remaining space)
         right_frame = ttk.Frame(main_content_frame)
@@ -1000,6 +3356,10 @@ class FileSystemApp:
         self.current_path_label = ttk.Label(header_frame, text="Select a directory", font=("TkDefaultFont", 10, "bold"))
         self.current_path_label.pack(side=tk.LEFT)
 
+        # Save status label (checkpoints are written in the background)
+        self.save_status_label = ttk.Label(header_frame, text="", font=("TkDefaultFont", 9))
+        self.save_status_label.pack(side=tk.RIGHT, padx=10)
+
         # Selection status label
         self.selection_status_label = ttk.Label(header_frame, text="", font=("TkDefaultFont", 9))
         self.selection_status_label.pack(side=tk.RIGHT, padx=10)
@@ -1012,7 +3372,7 @@ class FileSystemApp:
         self.icon_canvas_frame = ttk.Frame(self.content_frame)
         self.icon_canvas = tk.Canvas(self.icon_canvas_frame, highlightthickness=0)
         self.icon_scrollbar = ttk.Scrollbar(self.icon_canvas_frame, orient="vertical", command=self.icon_canvas.yview)
-        self.icon_canvas.configure(yscrollcommand=self.icon_scrollbar.set)
+        self.icon_canvas.configure(yscrollcommand=self.on_icon_view_scroll)
 
         # Apply theme-appropriate background to canvas
         if TTKBOOTSTRAP_AVAILABLE:
@@ -1026,17 +3386,13 @@ class FileSystemApp:
         self.icon_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.icon_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Create a frame inside canvas for the grid
-        self.icon_grid_frame = tk.Frame(self.icon_canvas, bg=canvas_bg)
-        self.icon_canvas.create_window((0, 0), window=self.icon_grid_frame, anchor="nw")
-
         # Bind canvas resize
         self.icon_canvas.bind('<Configure>', self.on_canvas_configure)
-        self.icon_grid_frame.bind('<Configure>', self.on_frame_configure)
 
-        # Bind right-click to canvas for empty space context menu
-        self.icon_canvas.bind("<Button-3>", self.on_empty_space_right_click)
-        self.icon_grid_frame.bind("<Button-3>", self.on_empty_space_right_click)
+        # Right-click on an icon or on empty space; the canvas works out which
+        self.icon_canvas.bind("<Button-3>", self.on_canvas_right_click)
+        self.icon_canvas.bind("<Double-Button-1>", self.on_canvas_double_click)
+        self.icon_canvas.bind("<Motion>", self.on_canvas_motion)
 
         # Bind mouse wheel for scrolling
         self.icon_canvas.bind("<MouseWheel>", self.on_mousewheel)
@@ -1046,9 +3402,12 @@ class FileSystemApp:
         # Show icon view
         self.icon_canvas_frame.pack(fill=tk.BOTH, expand=True)
 
-        # Variables for icon view
-        self.icon_items = []
-        self.selected_icon_item = None
+        # Variables for icon view. Icons are drawn as canvas items, and only for the rows in view
+        self.icon_view = IconGridRenderer(self.icon_canvas, self.icon_for_node, self.label_for_node)
+        self.selection = SelectionModel()
+        self.name_search = None  # NameSearch streaming into the icon view, if any
+        self.search_results = {}  # Node -> (name, casefolded name) for icon_view.rows while it shows search results
+        self.search_scope = None  # (start directory, query, complete) of the results shown
 
         # Variables for drag selection
         self.selection_start_x = 0
@@ -1056,16 +3415,15 @@ class FileSystemApp:
         self.selection_end_x = 0
         self.selection_end_y = 0
         self.is_selecting = False
-        self.selected_items = []  # List of selected item names
-        self.temp_intersecting_items = []  # Items currently intersecting with invisible selection area
+        self.selection_after_id = None  # Pending coalesced rubber-band update
+        self.selection_status_text = None  # Status last shown while rubber-band selecting
+        self.selected_items = []  # Names of the selected items, in display order (derived from self.selection)
+        self.temp_intersecting_items = []  # Rows currently intersecting with invisible selection area
 
         # Bind mouse events for drag selection
         self.icon_canvas.bind("<Button-1>", self.on_canvas_click)
         self.icon_canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.icon_canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
-        self.icon_grid_frame.bind("<Button-1>", self.on_canvas_click)
-        self.icon_grid_frame.bind("<B1-Motion>", self.on_canvas_drag)
-        self.icon_grid_frame.bind("<ButtonRelease-1>", self.on_canvas_release)
 
         # Bind click events to main window and frames to dismiss context menus
         self.master.bind("<Button-1>", self.dismiss_context_menus)
@@ -1325,81 +3683,23 @@ class FileSystemApp:
         else:
             return self.folder_icon_large if large else self.folder_icon
 
-    def create_icon_item(self, name, icon, is_directory=False):
-        """Create an icon item for the grid view with transparent background and precise highlighting"""
-        # Get current canvas background color for transparency
-        canvas_bg = self.icon_canvas.cget('bg')
-        
-        # Create main frame with transparent background
-        frame = tk.Frame(self.icon_grid_frame, bg=canvas_bg, cursor="hand2", 
-                        width=120, height=140, relief="flat", bd=0)
-        frame.pack_propagate(False)  # Don't shrink to fit content
-        
-        # Icon label with transparent background
-        if icon:
-            icon_label = tk.Label(frame, image=icon, bg=canvas_bg, bd=0, relief="flat")
-        else:
-            icon_label = tk.Label(frame, text="📁" if is_directory else "📄", 
-                                font=("Arial", 56), bg=canvas_bg, fg="white", bd=0, relief="flat")
-        icon_label.pack(pady=(12, 8))
-        
-        # Name label with transparent background and limited height
-        name_label = tk.Label(frame, text=name, bg=canvas_bg, fg="white", 
-                            font=("Arial", 11), wraplength=110, justify="center", 
-                            bd=0, relief="flat")
-        name_label.pack(pady=(0, 12), fill=tk.X)
-        
-        # Store original background colors for highlighting
-        frame.original_bg = canvas_bg
-        icon_label.original_bg = canvas_bg
-        name_label.original_bg = canvas_bg
-        
-        # Bind events to both frame and labels - prevent propagation to canvas
-        def on_double_click(e):
-            self.on_icon_double_click(name)
-            return "break"
-            
-        def on_right_click(e):
-            self.on_icon_right_click(e, name)
-            return "break"
-            
-        def on_single_click(e):
-            self.on_icon_single_click(name)
-            return "break"
-        
-        for widget in [frame, icon_label, name_label]:
-            widget.bind("<Double-Button-1>", on_double_click)
-            widget.bind("<Button-3>", on_right_click)
-            widget.bind("<Button-1>", on_single_click)
-        
-        return frame
+    def show_icon_rows(self, rows, keep_items=False):
+        """Show rows (nodes) in the icon view with nothing selected"""
+        self.icon_view.set_rows(rows, keep_items=keep_items)
+        self.selection.reset(self.icon_view.rows)
 
-    def highlight_item(self, item_frame, highlight):
-        """Highlight or unhighlight an item frame with precise selection area"""
-        if highlight:
-            # Modern selection effect - subtle highlight that fits content
-            selection_color = "#0078d4"  # Windows-style blue selection
-            
-            # Apply highlighting only to the content areas
-            for child in item_frame.winfo_children():
-                if isinstance(child, tk.Label):
-                    # Create a subtle background highlight for text
-                    child.config(bg=selection_color, fg="white")
-            
-            # Add a subtle border to the frame
-            item_frame.config(bg=selection_color, relief="solid", bd=1)
-            
-        else:
-            # Restore original transparent appearance
-            canvas_bg = self.icon_canvas.cget('bg')
-            
-            # Restore all child widgets to transparent background
-            for child in item_frame.winfo_children():
-                if isinstance(child, tk.Label):
-                    child.config(bg=canvas_bg, fg="white")
-            
-            # Restore frame to transparent
-            item_frame.config(bg=canvas_bg, relief="flat", bd=0)
+    def icon_for_node(self, node):
+        """(large image or None, fallback glyph) for a node in the icon view"""
+        if isinstance(node, Directory):
+            return self.get_folder_icon(node.name, large=True), "📁"
+        return self.get_file_icon(node.name, node.permissions, large=True), "📄"
+
+    def label_for_node(self, node):
+        """Text under a node's icon: its name, or for search results its path (shortened from the left)"""
+        if self.search_scope is None:
+            return node.name
+        path = node.path
+        return path if len(path) <= 60 else "…" + path[-59:]
 
     def apply_dark_theme(self):
         """Apply dark theme styling"""
@@ -1443,11 +3743,14 @@ class FileSystemApp:
     def show_file_details_dialog(self, file):
         """Show file details in a dialog as fallback when OS application fails"""
         content = file.content or "[Empty file]"
+        blocks_info = f"{file.block_count} starting at block {file.start_block}" if file.block_count else "none"
         file_info = f"""File: {file.name}
 Size: {file.get_size_display()}
 Allocation: {file.allocation}
+Blocks: {blocks_info} ({disk.get_usage_display()})
+Content Store: {content_store.get_dedup_display()}
 Permissions: {'Read-Only' if file.permissions == 0 else 'Read-Write'}
-Last Modified: {file.timestamp}
+Last Modified: {format_timestamp(file.timestamp)}
 
 --- Content Preview ---
 {content[:500]}{'...' if len(content) > 500 else ''}"""
@@ -1520,6 +3823,7 @@ Last Modified: {file.timestamp}
                     if user["username"] == username:
                         current_user["username"] = user["username"]
                         current_user["role"] = user["role"]
+                        record_user_change()
                         break
                     
                 self.update_role_display()
@@ -1642,6 +3946,7 @@ Last Modified: {file.timestamp}
             # Switch to new user
             current_user["username"] = username
             current_user["role"] = new_role
+            record_user_change()
             self.user_var.set(f"{username} ({'ADMIN' if new_role == UserRole.ADMIN else 'USER'})")
             self.update_role_display()
 
@@ -1775,21 +4080,21 @@ Last Modified: {file.timestamp}
         if not self.selected_item or not self.current_directory:
             return
         
-        for file in self.current_directory.files:
-            if file.name == self.selected_item:
-                print(f"Opening file: {file.name} with OS default application")
-                self.open_file_with_application(file)
-                return
+        file = self.current_directory.get_file(self.selected_item)
+        if file:
+            print(f"Opening file: {file.name} with OS default application")
+            self.open_file_with_application(file)
+            return
         messagebox.showerror("Error", "File not found.")
 
     def read_selected_file(self):
         if not self.selected_item or not self.current_directory:
             return
         
-        for file in self.current_directory.files:
-            if file.name == self.selected_item:
-                self.show_file_details_dialog(file)
-                return
+        file = self.current_directory.get_file(self.selected_item)
+        if file:
+            self.show_file_details_dialog(file)
+            return
         messagebox.showerror("Error", "File not found.")
 
     def on_icon_double_click(self, item_name):
@@ -1798,17 +4103,17 @@ Last Modified: {file.timestamp}
         self.clear_selection()
 
         # Check if it's a directory by looking for it in subdirectories
-        for subdir in self.current_directory.subdirectories:
-            if subdir.name == item_name:
-                # Navigate to subdirectory
-                self.navigate_to_directory(subdir)
-                return
+        subdir = self.current_directory.get_subdirectory(item_name)
+        if subdir:
+            # Navigate to subdirectory
+            self.navigate_to_directory(subdir)
+            return
 
         # If not a directory, it's a file - open with OS default application
-        for file in self.current_directory.files:
-            if file.name == item_name:
-                self.open_file_with_application(file)
-                return
+        file = self.current_directory.get_file(item_name)
+        if file:
+            self.open_file_with_application(file)
+            return
 
         # If neither found, show error
         print(f"Item '{item_name}' not found in current directory")
@@ -1947,41 +4252,43 @@ Last Modified: {file.timestamp}
 
     def on_canvas_configure(self, event):
         """Handle canvas resize"""
-        self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all"))
         # Update grid layout when canvas size changes
-        self.master.after_idle(self.update_icon_grid)
+        self.master.after_idle(self.icon_view.layout)
 
-    def on_frame_configure(self, event):
-        """Handle frame resize"""
-        self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all"))
-
-    def update_icon_grid(self):
-        """Update the icon grid layout to fit canvas width"""
-        if not hasattr(self, 'icon_items') or not self.icon_items:
-            return
-            
-        canvas_width = self.icon_canvas.winfo_width()
-        if canvas_width <= 1:
-            return
-            
-        # Calculate how many icons can fit horizontally (increased spacing for larger icons)
-        icon_width = 140  # Increased from 120 to 140 for larger icons
-        cols = max(1, canvas_width // icon_width)
-        
-        # Rearrange icons in grid with more spacing
-        for i, item in enumerate(self.icon_items):
-            row = i // cols
-            col = i % cols
-            item.grid(row=row, column=col, padx=25, pady=25, sticky="n")  # Increased padding from 20 to 25
+    def on_icon_view_scroll(self, first, last):
+        """yscrollcommand of the icon canvas: move the scrollbar and draw the rows now in view"""
+        self.icon_scrollbar.set(first, last)
+        self.icon_view.render()
 
     def on_canvas_click(self, event):
-        """Handle mouse click on canvas - start invisible drag selection"""
-        # Clear previous selections
-        self.clear_selection()
-        
+        """Handle mouse click on canvas - select the icon under the pointer, or start invisible drag selection"""
         # Get canvas coordinates
         canvas_x = self.icon_canvas.canvasx(event.x)
         canvas_y = self.icon_canvas.canvasy(event.y)
+
+        index = self.icon_view.row_at(canvas_x, canvas_y)
+        if index is not None:
+            self.is_selecting = False
+            if self.search_scope is not None:
+                # Results come from many folders, so the name-based selection
+                # fields stay clear until a result is shown in its own folder
+                self.clear_selection()
+                self.selection.select_only(index)
+                self.icon_view.highlight_exactly(self.selection.indexes())
+            elif event.state & 0x0001:  # Shift: select the range from the last clicked item
+                self.selection.extend_to(index)
+                self.apply_selection()
+            elif event.state & 0x0004:  # Control: add or remove this item
+                self.selection.toggle(index)
+                self.apply_selection()
+            else:
+                self.selection.select_only(index)
+                self.apply_selection()
+            self.dismiss_context_menus()
+            return
+
+        # Clear previous selections
+        self.clear_selection()
         
         self.selection_start_x = canvas_x
         self.selection_start_y = canvas_y
@@ -1989,10 +4296,46 @@ Last Modified: {file.timestamp}
         self.selection_end_y = canvas_y
         self.is_selecting = True
         self.temp_intersecting_items = []  # Initialize temporary intersecting items
+        self.selection_status_text = None
         
         # Dismiss context menus
         self.dismiss_context_menus()
 
+    def on_canvas_double_click(self, event):
+        """Open the icon under the pointer: enter a directory, open a file (reveal it for search results)"""
+        index = self.icon_view.row_at(self.icon_canvas.canvasx(event.x), self.icon_canvas.canvasy(event.y))
+        if index is None:
+            return
+        node = self.icon_view.rows[index]
+        if self.search_scope is not None:
+            self.reveal_node(node)
+        else:
+            self.on_icon_double_click(node.name)
+
+    def on_canvas_right_click(self, event):
+        """Context menu for the icon under the pointer, or for the folder on empty space"""
+        index = self.icon_view.row_at(self.icon_canvas.canvasx(event.x), self.icon_canvas.canvasy(event.y))
+        if index is None:
+            self.on_empty_space_right_click(event)
+            return
+        node = self.icon_view.rows[index]
+        if self.search_scope is not None:
+            # The menu acts on the current folder, so show the result in its own first
+            if not self.select_search_result(node):
+                return
+        elif index not in self.selection:
+            # Right-clicking outside the selection selects just that item; inside it keeps the selection
+            self.selection.select_only(index)
+            self.apply_selection()
+        self.on_icon_right_click(event, node)
+
+    def on_canvas_motion(self, event):
+        """Show a hand cursor over icons"""
+        index = self.icon_view.row_at(self.icon_canvas.canvasx(event.x), self.icon_canvas.canvasy(event.y))
+        cursor = "hand2" if index is not None else ""
+        if self.icon_canvas.cget("cursor") != cursor:
+            self.icon_canvas.configure(cursor=cursor)
+
     def on_canvas_drag(self, event):
         """Handle mouse drag on canvas - update invisible selection area"""
         if not self.is_selecting:
@@ -2005,8 +4348,15 @@ Last Modified: {file.timestamp}
         self.selection_end_x = canvas_x
         self.selection_end_y = canvas_y
         
-        # Update invisible selection area (this will apply fade effects to icons)
-        self.update_selection_rectangle()
+        # Update invisible selection area (this will apply fade effects to icons),
+        # coalescing the motion events that arrive within one frame
+        if self.selection_after_id is None:
+            self.selection_after_id = self.master.after(SELECTION_FRAME_MS, self.flush_selection_update)
+
+    def flush_selection_update(self):
+        self.selection_after_id = None
+        if self.is_selecting:
+            self.update_selection_rectangle()
 
     def on_canvas_release(self, event):
         """Handle mouse release on canvas - finalize selection"""
@@ -2021,6 +4371,12 @@ Last Modified: {file.timestamp}
         
         self.selection_end_x = canvas_x
         self.selection_end_y = canvas_y
+
+        # Apply the last motion if its frame hasn't come yet
+        if self.selection_after_id is not None:
+            self.master.after_cancel(self.selection_after_id)
+            self.selection_after_id = None
+            self.update_selection_rectangle()
         
         # Finalize selection (no rectangle cleanup needed since we don't draw one)
         self.finalize_selection()
@@ -2043,85 +4399,65 @@ Last Modified: {file.timestamp}
 
     def apply_realtime_selection_fade(self, x1, y1, x2, y2):
         """Apply fade effect to items currently intersecting with selection rectangle"""
-        # First, reset all items to normal state
-        for item_frame in self.icon_items:
-            self.highlight_item(item_frame, False)
-        
-        # Then apply prominent highlight to intersecting items
-        currently_intersecting = []
-        
-        for i, item_frame in enumerate(self.icon_items):
-            # Get item position on canvas
-            item_x = item_frame.winfo_x()
-            item_y = item_frame.winfo_y()
-            item_width = item_frame.winfo_width()
-            item_height = item_frame.winfo_height()
-            
-            # Check if item intersects with selection rectangle
-            if (item_x < x2 and item_x + item_width > x1 and 
-                item_y < y2 and item_y + item_height > y1):
-                
-                # Apply prominent highlight effect immediately
-                self.highlight_item(item_frame, True)
-                
-                # Get item name for tracking
-                if i < len(self.current_directory.subdirectories):
-                    item_name = self.current_directory.subdirectories[i].name
-                else:
-                    file_index = i - len(self.current_directory.subdirectories)
-                    if file_index < len(self.current_directory.files):
-                        item_name = self.current_directory.files[file_index].name
-                    else:
-                        continue
-                
-                currently_intersecting.append(item_name)
+        # Rows under the rectangle come from the grid layout; only rows whose
+        # highlight changes since the last motion are redrawn
+        intersecting = self.icon_view.rows_in_rect(x1, y1, x2, y2)
+        self.icon_view.highlight_exactly(intersecting)
         
-        # Store temporarily intersecting items
-        self.temp_intersecting_items = currently_intersecting
+        # Store temporarily intersecting rows
+        self.temp_intersecting_items = intersecting
         
         # Update selection status in real-time
-        if currently_intersecting:
-            count = len(currently_intersecting)
-            if count == 1:
-                self.selection_status_label.config(text="1 item selected")
-            else:
-                self.selection_status_label.config(text=f"{count} items selected")
+        count = len(intersecting)
+        if count == 1:
+            status = "1 item selected"
+        elif count > 1:
+            status = f"{count} items selected"
         else:
-            self.selection_status_label.config(text="")
+            status = ""
+        if status != self.selection_status_text:
+            self.selection_status_label.config(text=status)
+            self.selection_status_text = status
 
     def finalize_selection(self):
         """Finalize the selection using items that were already highlighted during drag"""
-        # Use the items that were being highlighted during the drag
-        self.selected_items = self.temp_intersecting_items.copy() if hasattr(self, 'temp_intersecting_items') else []
+        # Use the rows that were being highlighted during the drag
+        self.selection.select_rows(self.temp_intersecting_items)
+        self.apply_selection()
+        
+        # Clear temporary intersecting items
+        self.temp_intersecting_items = []
+
+    def apply_selection(self):
+        """Show the selection model: highlights, the derived name fields and the status label"""
+        indexes = self.selection.indexes()
+        self.icon_view.highlight_exactly(indexes)
+        rows = self.icon_view.rows
+        self.selected_items = [rows[index].name for index in indexes]
+        self.selected_inode = None  # The icon view holds the selection now, not the sidebar
         
         # Update selected_item for compatibility with single-selection code
-        if len(self.selected_items) == 1:
+        if len(indexes) == 1:
             self.selected_item = self.selected_items[0]
-            # Determine if it's a file or directory
-            self.selected_item_type = "directory" if any(subdir.name == self.selected_item for subdir in self.current_directory.subdirectories) else "file"
-        elif len(self.selected_items) > 1:
-            self.selected_item = None  # Multiple selection
-            self.selected_item_type = None
+            self.selected_item_type = self.selection.kind(indexes[0])
         else:
-            self.selected_item = None
+            self.selected_item = None  # Multiple selection or none
             self.selected_item_type = None
         
         # Update selection status
         self.update_selection_status()
-        
-        # Clear temporary intersecting items
-        self.temp_intersecting_items = []
 
     def clear_selection(self):
         """Clear all selections and remove highlighting"""
         # Clear visual highlights
-        for item_frame in self.icon_items:
-            self.highlight_item(item_frame, False)
+        self.selection.clear()
+        self.icon_view.clear_highlights()
         
         # Clear selection state
         self.selected_items = []
         self.selected_item = None
         self.selected_item_type = None
+        self.selected_inode = None
         self.is_selecting = False
         self.temp_intersecting_items = []  # Clear temporary intersecting items
         
@@ -2138,51 +4474,34 @@ Last Modified: {file.timestamp}
             self.selection_status_label.config(text=f"{len(self.selected_items)} items selected")
 
     def on_icon_single_click(self, item_name):
-        """Handle single-click on icon items to select them with prominent highlight"""
-        # Clear previous selections first
-        self.clear_selection()
-        
-        # Set the single selection
-        self.selected_item = item_name
-        self.selected_items = [item_name]
-        
-        # Determine if it's a file or directory
-        self.selected_item_type = "directory" if any(subdir.name == item_name for subdir in self.current_directory.subdirectories) else "file"
-        
-        # Find and highlight the selected item with prominent Windows-style selection
-        for i, item_frame in enumerate(self.icon_items):
-            # Get item name for this frame
-            if i < len(self.current_directory.subdirectories):
-                frame_item_name = self.current_directory.subdirectories[i].name
-            else:
-                file_index = i - len(self.current_directory.subdirectories)
-                if file_index < len(self.current_directory.files):
-                    frame_item_name = self.current_directory.files[file_index].name
-                else:
-                    continue
-            
-            # Highlight if this is the selected item
-            if frame_item_name == item_name:
-                self.highlight_item(item_frame, True)
-                break
-        
-        # Update selection status
-        self.update_selection_status()
+        """Select the item called item_name in the current directory with prominent highlight"""
+        node = self.current_directory.get_subdirectory(item_name) or self.current_directory.get_file(item_name)
+        index = self.selection.row(node) if node else None
+        if index is None:
+            self.clear_selection()
+        else:
+            self.selection.select_only(index)
+            self.apply_selection()
+            self.icon_view.scroll_to(index)
         
         # Dismiss context menus
         self.dismiss_context_menus()
 
+    def select_all_items(self):
+        """Select every item in the icon view (Ctrl+A)"""
+        if self.search_scope is not None:
+            return
+        self.selection.select_all()
+        self.apply_selection()
+
     def on_directory_select(self, event):
         selection = self.directory_tree.selection()
         if not selection:
             return
         
-        item = selection[0]
-        # Get the directory name from the tree item (no more [DIR] suffix)
-        dir_name = self.directory_tree.item(item, "text")
-        
-        directory = find_directory(dir_name)
-        if directory:
+        # Tree items are keyed by inode number
+        directory = self.tree_nodes.get(selection[0])
+        if directory and inode_table.contains(directory):
             self.navigate_to_directory(directory)
 
     def on_directory_right_click(self, event):
@@ -2190,56 +4509,63 @@ Last Modified: {file.timestamp}
         self.dismiss_context_menus()
         
         item = self.directory_tree.identify_row(event.y)
-        if item:
+        if item in self.tree_nodes:
             self.directory_tree.selection_set(item)
             self.selected_item = self.directory_tree.item(item, "text")
             self.selected_item_type = "directory"
+            self.selected_inode = int(item)
+            # Selecting the item navigates and clears the selection fields, so
+            # the menu's commands are bound to the clicked directory itself
+            directory = self.tree_nodes[item]
             
             # Create a fresh context menu each time
             self.dir_context_menu = tk.Menu(self.master, tearoff=0)
-            self.dir_context_menu.add_command(label="Open", command=self.open_directory)
+            self.dir_context_menu.add_command(label="Open", command=lambda: self.navigate_to_directory(directory))
             
             # Only allow renaming for non-root directories and not Trash
             protected_dirs = ["Documents", "Media", "Projects", "System", "Trash"]
-            if self.selected_item not in protected_dirs:
-                self.dir_context_menu.add_command(label="Rename", command=self.rename_directory)
+            if directory.name not in protected_dirs:
+                self.dir_context_menu.add_command(label="Rename", command=lambda: self.rename_directory(directory))
             
             self.dir_context_menu.add_separator()
             
             # Cut/Copy operations (not for root directories or Trash)
-            if self.selected_item not in protected_dirs:
-                self.dir_context_menu.add_command(label="Cut (Ctrl+X)", command=self.cut_selected)
-                self.dir_context_menu.add_command(label="Copy (Ctrl+C)", command=self.copy_selected)
+            if directory.name not in protected_dirs:
+                if directory.parent is not None:  # A root directory has no folder to be cut from
+                    self.dir_context_menu.add_command(
+                        label="Cut (Ctrl+X)", command=lambda: copy_to_clipboard([directory], "cut", directory.parent))
+                self.dir_context_menu.add_command(
+                    label="Copy (Ctrl+C)", command=lambda: copy_to_clipboard([directory], "copy", directory.parent))
                 self.dir_context_menu.add_separator()
             
-            self.dir_context_menu.add_command(label="Create File", command=self.create_file_in_selected)
-            self.dir_context_menu.add_command(label="Create Directory", command=self.create_directory_in_selected)
+            self.dir_context_menu.add_command(label="Create File", command=lambda: self._create_file_dialog(directory))
+            self.dir_context_menu.add_command(label="Create Directory", command=lambda: self._create_directory_dialog(directory))
             self.dir_context_menu.add_separator()
             
             # Add paste option
-            self.dir_context_menu.add_command(label="Paste (Ctrl+V)", command=self.paste_to_selected)
-            paste_state = tk.NORMAL if can_paste_here(find_directory(self.selected_item)) else tk.DISABLED
+            self.dir_context_menu.add_command(label="Paste (Ctrl+V)", command=lambda: self.paste_to_directory(directory))
+            paste_state = tk.NORMAL if can_paste_here(directory) else tk.DISABLED
             self.dir_context_menu.entryconfig("Paste (Ctrl+V)", state=paste_state)
             self.dir_context_menu.add_separator()
             
             # Only allow deletion for subdirectories (not root directories or Trash)
-            if self.selected_item not in protected_dirs:
-                self.dir_context_menu.add_command(label="Delete", command=self.delete_selected_directory)
+            if directory.name not in protected_dirs and directory.parent is not trash_dir:
+                self.dir_context_menu.add_command(label="Delete", command=lambda: self.delete_selected_directory(directory))
             
             # Add "Empty Trash" option only if this is the Trash directory
-            if self.selected_item == "Trash":
+            if directory is trash_dir:
                 self.dir_context_menu.add_command(label="Empty Trash", command=self.empty_trash)
             
             self.dir_context_menu.post(event.x_root, event.y_root)
 
-    def on_icon_right_click(self, event, item_name):
+    def on_icon_right_click(self, event, node):
         """Updated right-click handler with proper mixed selection support"""
+        item_name = node.name
         # Dismiss any existing context menus first
         self.dismiss_context_menus()
 
         # Debug: Print current selection state
         print(f"Right-click on: {item_name}")
-        print(f"Current selected_items: {self.selected_items}")
         print(f"Selection count: {len(self.selected_items)}")
         
         # Debug: Check what menus exist
@@ -2250,20 +4576,14 @@ Last Modified: {file.timestamp}
         has_multiple_selection = len(self.selected_items) > 1
         print(f"Has multiple selection: {has_multiple_selection}")
         
-        # If clicking on an item that's already part of the selection, don't change selection
-        if item_name in self.selected_items:
-            # Keep the existing selection
-            print(f"Item {item_name} is part of existing selection - preserving multi-selection")
-            pass
-        else:
-            # Single click on new item - update selection
-            print(f"Item {item_name} not in selection - setting as single selection")
-            self.selected_item = item_name
-            self.selected_items = [item_name]
+        # The canvas handler already made item_name part of the selection
 
         # Check if it's a directory or file
-        is_directory = any(subdir.name == item_name for subdir in self.current_directory.subdirectories)
+        is_directory = isinstance(node, Directory)
+        if len(self.selected_items) == 1:
+            self.selected_item = item_name
         self.selected_item_type = "directory" if is_directory else "file"
+        self.selected_inode = None
 
         # Handle trash directory with mixed selection support
         if self.current_directory and self.current_directory.name == "Trash":
@@ -2318,7 +4638,7 @@ Last Modified: {file.timestamp}
 
             # Add paste option
             self.dynamic_dir_context_menu.add_command(label="Paste (Ctrl+V)", command=self.paste_to_selected)
-            paste_state = tk.NORMAL if can_paste_here(find_directory(item_name)) else tk.DISABLED
+            paste_state = tk.NORMAL if can_paste_here(node) else tk.DISABLED
             self.dynamic_dir_context_menu.entryconfig("Paste (Ctrl+V)", state=paste_state)
             self.dynamic_dir_context_menu.add_separator()
 
@@ -2342,110 +4662,306 @@ Last Modified: {file.timestamp}
             self.file_context_menu.post(event.x_root, event.y_root)
 
     def refresh_directory_tree(self):
-        """Refresh the directory tree and ensure it's visible"""
-        self.directory_tree.delete(*self.directory_tree.get_children())
-        # Only show root directories - no subdirectories
-        for root_dir in root_directories:
-            self.insert_directory_tree("", root_dir)
-        
-        # Ensure the tree is expanded and visible
-        for item in self.directory_tree.get_children():
-            self.directory_tree.item(item, open=True)
+        """Bring the directory tree in line with the model, touching only items that changed.
+
+        Only the directories whose children are shown are compared; the rest
+        are filled in when they're expanded. Items are inserted, moved and
+        deleted individually, so the tree is never rebuilt.
+        """
+        leftovers = []
+        for iid, directory in list(self.tree_loaded.items()):
+            if iid not in self.tree_loaded:
+                continue  # Forgotten along with a stale item below
+            if directory is None:
+                self.sync_tree_children(iid, root_directories, leftovers)
+            elif inode_table.contains(directory) and self.tree_nodes.get(iid) is directory:
+                self.sync_tree_children(iid, directory.subdirectories, leftovers)
+
+        # Children that went away and weren't moved under another shown directory
+        for parent_iid, iid in leftovers:
+            if iid in self.tree_nodes and self.directory_tree.parent(iid) == parent_iid:
+                self.delete_directory_tree_item(iid)
         
         # Reapply custom styling to ensure it persists
         self.apply_custom_treeview_styling()
-        
-        print(f"Directory tree refreshed with {len(root_directories)} directories")
+
+    def sync_tree_children(self, parent_iid, directories, leftovers):
+        """Make parent_iid's children show directories, in order; children no longer
+        wanted are added to leftovers as (parent_iid, iid) for the caller to delete"""
+        tree = self.directory_tree
+        current = tree.get_children(parent_iid)
+        current_set = set(current)
+        expected = []
+        changed = False
+        for directory in directories:
+            iid = str(directory.inode)
+            expected.append(iid)
+            shown = self.tree_nodes.get(iid)
+            if shown is not directory:
+                if shown is not None:
+                    self.delete_directory_tree_item(iid)  # The inode now belongs to another directory
+                self.insert_directory_tree(parent_iid, directory)
+                changed = True
+                continue
+            if iid not in current_set:
+                tree.move(iid, parent_iid, "end")  # Moved here from another shown directory
+                changed = True
+            if self.tree_names[iid] != directory.name:
+                self.tree_names[iid] = directory.name
+                tree.item(iid, text=directory.name)
+            if iid not in self.tree_loaded:
+                self.update_tree_placeholder(iid, directory)
+
+        children = tree.get_children(parent_iid) if changed else current
+        if list(children[:len(expected)]) != expected:
+            for index, iid in enumerate(expected):
+                tree.move(iid, parent_iid, index)
+        expected_set = set(expected)
+        leftovers.extend((parent_iid, iid) for iid in current if iid not in expected_set)
 
     def insert_directory_tree(self, parent, directory):
-        """Insert directory into the tree view"""
+        """Insert directory into the tree view, collapsed"""
         # Choose appropriate icon (small icons for directory tree)
         icon = self.get_folder_icon(directory.name, large=False)
         
         # Just use directory name without [DIR] suffix
-        dir_text = directory.name
-        
+        iid = str(directory.inode)
         if icon:
-            node = self.directory_tree.insert(parent, "end", text=dir_text, image=icon, open=True)
+            self.directory_tree.insert(parent, "end", iid=iid, text=directory.name, image=icon)
         else:
-            node = self.directory_tree.insert(parent, "end", text=dir_text, open=True)
-        
-        print(f"Added directory '{dir_text}' to tree")
+            self.directory_tree.insert(parent, "end", iid=iid, text=directory.name)
+        self.tree_nodes[iid] = directory
+        self.tree_names[iid] = directory.name
+        self.update_tree_placeholder(iid, directory)
+
+    def update_tree_placeholder(self, iid, directory):
+        """Give an unexpanded item a dummy child exactly when its directory has subdirectories"""
+        if directory.subdirectories and iid not in self.tree_placeholders:
+            self.directory_tree.insert(iid, "end", iid=f"placeholder-{iid}")
+            self.tree_placeholders.add(iid)
+        elif not directory.subdirectories and iid in self.tree_placeholders:
+            self.directory_tree.delete(f"placeholder-{iid}")
+            self.tree_placeholders.discard(iid)
+
+    def delete_directory_tree_item(self, iid):
+        """Delete an item and forget it and everything below it"""
+        self.forget_directory_tree_item(iid)
+        self.directory_tree.delete(iid)
+
+    def forget_directory_tree_item(self, iid):
+        if iid in self.tree_loaded:
+            for child in self.directory_tree.get_children(iid):
+                self.forget_directory_tree_item(child)
+        self.tree_nodes.pop(iid, None)
+        self.tree_names.pop(iid, None)
+        self.tree_loaded.pop(iid, None)
+        self.tree_placeholders.discard(iid)
+
+    def on_directory_tree_open(self, event):
+        """Fill in a directory's children the first time it is expanded"""
+        iid = self.directory_tree.focus()
+        directory = self.tree_nodes.get(iid)
+        if directory is None or iid in self.tree_loaded:
+            return
+        if iid in self.tree_placeholders:
+            self.directory_tree.delete(f"placeholder-{iid}")
+            self.tree_placeholders.discard(iid)
+        self.tree_loaded[iid] = directory
+        for subdir in directory.subdirectories:
+            self.insert_directory_tree(iid, subdir)
+
+    def update_current_path_label(self):
+        """Show the current path with its folder size (O(1) from the directory rollups)"""
+        directory = self.current_directory
+        self.current_path_label.config(
+            text=f"Current: {directory.path}  ({directory.total_files} files, "
+                 f"{directory.total_dirs} folders, {format_size(directory.total_bytes)})")
 
     def refresh_content(self):
+        # The icon view is about to show a directory again
+        self.cancel_name_search()
+        self.search_results = {}
+        self.search_scope = None
+
         # Clear selections
         self.clear_selection()
         
-        # Clear icon grid
-        if hasattr(self, 'icon_items'):
-            for item in self.icon_items:
-                item.destroy()
-            self.icon_items = []
-        
         if not self.current_directory:
+            self.show_icon_rows([])
             return
         
+        # Folder totals may have changed
+        self.update_current_path_label()
+        
         # Populate icon view
         self.populate_icon_view()
 
     def populate_icon_view(self):
         """Populate the icon view with directories and files in a grid"""
-        # Get current canvas background for consistency
-        canvas_bg = self.icon_canvas.cget('bg')
-        
-        # Update the grid frame background to match canvas
-        self.icon_grid_frame.config(bg=canvas_bg)
-        
-        # Add subdirectories
-        for subdir in self.current_directory.subdirectories:
-            icon = self.get_folder_icon(subdir.name, large=True)
-            item = self.create_icon_item(subdir.name, icon, is_directory=True)
-            self.icon_items.append(item)
-        
-        # Add files
-        for file in self.current_directory.files:
-            file_icon = self.get_file_icon(file.name, file.permissions, large=True)
-            item = self.create_icon_item(file.name, file_icon, is_directory=False)
-            self.icon_items.append(item)
-        
-        # Update grid layout
-        self.master.after_idle(self.update_icon_grid)
-        self.master.after_idle(lambda: self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all")))
+        # Subdirectories first, then files; only the rows in view are drawn
+        self.show_icon_rows(self.current_directory.entries())
+
+    def on_search_typed(self):
+        """Search as the user types, once typing pauses for SEARCH_DEBOUNCE_MS"""
+        self.cancel_name_search()
+        if self.search_after_id is not None:
+            self.master.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        if not self.search_contents_var.get():  # Content search opens a window, so it waits for Enter
+            self.search_after_id = self.master.after(SEARCH_DEBOUNCE_MS, self.search)
 
     def search(self):
-        query = self.search_entry.get().lower()
+        if self.search_after_id is not None:
+            self.master.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        query = self.search_var.get()
         if not query:
             self.refresh_content()
             return
-        
-        # Clear selections
-        self.clear_selection()
-        
-        # Clear existing content
-        if hasattr(self, 'icon_items'):
-            for item in self.icon_items:
-                item.destroy()
-            self.icon_items = []
-        
+        if self.search_contents_var.get():
+            self.search_contents(query)
+            return
         if not self.current_directory:
             return
-        
-        # Search in current directory
-        for subdir in self.current_directory.subdirectories:
-            if query in subdir.name.lower():
-                icon = self.get_folder_icon(subdir.name, large=True)
-                item = self.create_icon_item(subdir.name, icon, is_directory=True)
-                self.icon_items.append(item)
-        
-        for file in self.current_directory.files:
-            if query in file.name.lower():
-                file_icon = self.get_file_icon(file.name, file.permissions, large=True)
-                item = self.create_icon_item(file.name, file_icon, is_directory=False)
-                self.icon_items.append(item)
-        
-        # Update grid layout
-        self.master.after_idle(self.update_icon_grid)
-        self.master.after_idle(lambda: self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all")))
+
+        # Only one name search streams into the icon view at a time
+        self.cancel_name_search()
+        try:
+            match = compile_name_query(query)[0]
+        except re.error as e:
+            messagebox.showerror("Search", f"Invalid regular expression: {e}")
+            return
+        start = self.current_directory
+        self.clear_selection()
+
+        if self.search_scope is not None and self.search_scope[0] is start:
+            # Keep the results already shown that still match and drop the rest;
+            # pooled items still showing a kept node are left as they are
+            old_query, complete = self.search_scope[1], self.search_scope[2]
+            kept = {}
+            for node in self.icon_view.rows:
+                name, folded = self.search_results.get(node, (None, None))
+                if name != node.name:  # Renamed since it was found
+                    name, folded = node.name, node.name.casefold()
+                if inode_table.contains(node) and match(folded) and is_subdirectory_of(node, start):
+                    kept[node] = (name, folded)
+            rows = list(kept)
+            self.search_results = kept
+            if complete and query_narrows(old_query, query):
+                # Everything that can match was already found under the shorter query
+                self.search_scope = (start, query, True)
+                self.show_icon_rows(rows, keep_items=True)
+                self.show_search_status()
+                return
+        else:
+            rows = []
+            self.search_results = {}
+
+        keep_items = self.search_scope is not None
+        self.search_scope = (start, query, False)
+        self.show_icon_rows(rows, keep_items=keep_items)
+        self.name_search = NameSearch(start, query)
+        self.selection_status_label.config(text=f"Searching {start.path}...")
+        self.poll_name_search(self.name_search)
+
+    def poll_name_search(self, name_search):
+        """Add the matches a running name search has found since the last poll"""
+        if name_search is not self.name_search:
+            return  # Cancelled or replaced by a newer search
+        # Skip those still shown; the worker's casefolded name is kept for refining later
+        found = {node: (node.name, folded) for node, folded in name_search.poll() if node not in self.search_results}
+        if found:
+            self.search_results.update(found)
+            self.icon_view.append_rows(list(found))
+
+        if name_search.done:
+            self.name_search = None
+            self.search_scope = (name_search.start, name_search.query, not name_search.cancelled.is_set())
+            self.show_search_status()
+        else:
+            self.selection_status_label.config(text=f"Searching... {len(self.search_results)} match(es)")
+            self.master.after(SEARCH_POLL_MS, lambda: self.poll_name_search(name_search))
+
+    def show_search_status(self):
+        start, query = self.search_scope[0], self.search_scope[1]
+        self.selection_status_label.config(text=f"{len(self.search_results)} match(es) for '{query}' in {start.path}")
+
+    def cancel_name_search(self):
+        """Stop the running name search, if any; matches already shown stay until the next refresh"""
+        if self.name_search is not None:
+            self.name_search.cancel()
+            self.name_search = None
+
+    def reveal_node(self, node):
+        """Open a search result: a directory is entered, a file is selected in its directory"""
+        if not inode_table.contains(node):
+            messagebox.showerror("Error", f"'{node.name}' no longer exists.")
+            return
+        if isinstance(node, Directory):
+            self.navigate_to_directory(node)
+        else:
+            self.select_search_result(node)
+
+    def select_search_result(self, node):
+        """Leave the search results for node's own directory and select node there; False if it's gone"""
+        if not inode_table.contains(node) or node.parent is None:
+            messagebox.showerror("Error", f"'{node.name}' no longer exists.")
+            return False
+        if node.parent is self.current_directory:
+            self.refresh_content()  # Navigating wouldn't redraw an unchanged directory
+        else:
+            self.navigate_to_directory(node.parent)
+        index = self.selection.row(node)
+        if index is None:
+            self.clear_selection()
+            return False
+        self.selection.select_only(index)
+        self.apply_selection()
+        self.icon_view.scroll_to(index)
+        return True
+
+    def search_contents(self, query):
+        """Show every file whose content has all the words of query, using the content index"""
+        start_time = time.perf_counter()
+        files = content_index.search(query)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        results_window = tk.Toplevel(self.master)
+        results_window.title(f"Content Search - {query}")
+        results_window.geometry("600x400")
+        results_window.configure(bg=self.colors.get('bg', '#f0f0f0'))
+
+        summary = f"{len(files)} file(s) containing '{query}' ({elapsed_ms:.1f} ms). Double-click to open the folder."
+        tk.Label(results_window, text=summary, bg=self.colors.get('bg', '#f0f0f0'),
+                 font=self.get_safe_font('default')).pack(anchor=tk.W, padx=10, pady=(10, 0))
+
+        list_frame = tk.Frame(results_window, bg=self.colors.get('bg', '#f0f0f0'))
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        results_list = tk.Listbox(list_frame, yscrollcommand=scrollbar.set,
+                                  font=self.get_safe_font('mono'))
+        results_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=results_list.yview)
+        for file in files:
+            results_list.insert(tk.END, file.path)
+
+        def open_result(event=None):
+            selection = results_list.curselection()
+            if not selection:
+                return
+            file = files[selection[0]]
+            if file.parent is not None and inode_table.contains(file):
+                self.navigate_to_directory(file.parent)
+                self.on_icon_single_click(file.name)
+
+        results_list.bind("<Double-Button-1>", open_result)
+        tk.Button(results_window, text="Close", command=results_window.destroy,
+                  font=self.get_safe_font('default')).pack(pady=10)
+
+    def get_selected_entries(self):
+        """The selected File/Directory objects, in display order"""
+        return self.selection.nodes()
 
     # Cut/Copy/Paste operations
     def cut_selected(self):
@@ -2453,20 +4969,7 @@ Last Modified: {file.timestamp}
         if not self.selected_items or not self.current_directory:
             return
         
-        items = []
-        for item_name in self.selected_items:
-            # Check if it's a file
-            for file in self.current_directory.files:
-                if file.name == item_name:
-                    items.append(file)
-                    break
-            else:
-                # Check if it's a directory
-                for subdir in self.current_directory.subdirectories:
-                    if subdir.name == item_name:
-                        items.append(subdir)
-                        break
-        
+        items = self.get_selected_entries()
         if items:
             copy_to_clipboard(items, "cut", self.current_directory)
 
@@ -2475,20 +4978,7 @@ Last Modified: {file.timestamp}
         if not self.selected_items or not self.current_directory:
             return
         
-        items = []
-        for item_name in self.selected_items:
-            # Check if it's a file
-            for file in self.current_directory.files:
-                if file.name == item_name:
-                    items.append(file)
-                    break
-            else:
-                # Check if it's a directory
-                for subdir in self.current_directory.subdirectories:
-                    if subdir.name == item_name:
-                        items.append(subdir)
-                        break
-        
+        items = self.get_selected_entries()
         if items:
             copy_to_clipboard(items, "copy", self.current_directory)
 
@@ -2500,37 +4990,43 @@ Last Modified: {file.timestamp}
         msg = paste_items(self.current_directory)
         if msg.startswith("Error"):
             messagebox.showerror("Paste Error", msg)
-        else:
-            # Silent success - just refresh the view
-            self.refresh_all()
+        self.refresh_all()
 
     def paste_to_selected(self):
         """Paste items to selected directory"""
         if not self.selected_item or self.selected_item_type != "directory":
             return
         
-        target_dir = find_directory(self.selected_item)
-        if not target_dir:
-            return
-        
+        target_dir = self.get_selected_directory()
+        if target_dir:
+            self.paste_to_directory(target_dir)
+
+    def paste_to_directory(self, target_dir):
+        """Paste items into target_dir"""
         msg = paste_items(target_dir)
         if msg.startswith("Error"):
             messagebox.showerror("Paste Error", msg)
-        else:
-            # Silent success - just refresh the view
-            self.refresh_all()
+        self.refresh_all()
+
+    def get_selected_directory(self):
+        """Resolve the selected directory by inode (tree) or within the current directory (icons)"""
+        if self.selected_inode is not None:
+            return inode_table.get(self.selected_inode)
+        if self.current_directory and self.selected_item:
+            return self.current_directory.get_subdirectory(self.selected_item)
+        return None
 
     # Context menu actions
     def open_directory(self):
         if self.selected_item and self.selected_item_type == "directory":
-            directory = find_directory(self.selected_item)
+            directory = self.get_selected_directory()
             if directory:
                 self.navigate_to_directory(directory)
 
     def create_file_in_selected(self):
         if not self.selected_item:
             return
-        directory = find_directory(self.selected_item)
+        directory = self.get_selected_directory()
         if directory:
             self._create_file_dialog(directory)
 
@@ -2562,7 +5058,7 @@ Last Modified: {file.timestamp}
     def create_directory_in_selected(self):
         if not self.selected_item:
             return
-        directory = find_directory(self.selected_item)
+        directory = self.get_selected_directory()
         if directory:
             self._create_directory_dialog(directory)
 
@@ -2581,8 +5077,15 @@ Last Modified: {file.timestamp}
             messagebox.showerror("Error", msg)
         self.refresh_all()
 
-    def rename_directory(self):
-        """Improved directory rename with better handling for subdirectories"""
+    def rename_directory(self, directory=None):
+        """Improved directory rename with better handling for subdirectories.
+
+        directory is the node a sidebar menu was opened on; without it the
+        selected item is looked up among the roots and the current directory.
+        """
+        if directory is not None:
+            self.rename_directory_node(directory)
+            return
         if not self.selected_item:
             return
 
@@ -2602,18 +5105,17 @@ Last Modified: {file.timestamp}
         # Handle root directory renaming
         for root in root_directories:
             if root.name == self.selected_item:
-                # Check if new name already exists
-                if any(r.name == new_name for r in root_directories):
-                    messagebox.showerror("Error", f"Directory '{new_name}' already exists.")
+                msg = rename_root_directory(root, new_name)
+                if msg.startswith("Error"):
+                    messagebox.showerror("Error", msg)
                     return
-                root.name = new_name
                 self.refresh_all()
                 return
 
         # Handle subdirectory renaming in current directory
         if self.current_directory:
             # Check if new name already exists in current directory
-            if any(d.name == new_name for d in self.current_directory.subdirectories):
+            if self.current_directory.get_subdirectory(new_name):
                 messagebox.showerror("Error", f"Directory '{new_name}' already exists.")
                 return
 
@@ -2621,12 +5123,35 @@ Last Modified: {file.timestamp}
             if msg.startswith("Error"):
                 messagebox.showerror("Error", msg)
             else:
-                self.refresh_content()
+                self.refresh_all()
                 return
     
         # If we get here, directory wasn't found
         messagebox.showerror("Error", f"Directory '{self.selected_item}' not found.")
 
+    def rename_directory_node(self, directory):
+        """Rename directory, wherever it is in the tree"""
+        if not inode_table.contains(directory):
+            messagebox.showerror("Error", f"Directory '{directory.name}' not found.")
+            return
+        old_name = directory.name
+        new_name = simpledialog.askstring("Rename Directory", 
+                                         f"Enter new name for '{old_name}':",
+                                         initialvalue=old_name)
+        if not new_name or new_name == old_name:
+            return
+        parent = directory.parent
+        if parent is None:
+            msg = rename_root_directory(directory, new_name)
+        elif parent.get_subdirectory(old_name) is not directory:
+            msg = f"Error: Directory '{old_name}' can't be renamed here."  # A same-named Trash entry shadows it
+        else:
+            msg = parent.rename_subdirectory(old_name, new_name)
+        if msg.startswith("Error"):
+            messagebox.showerror("Error", msg)
+            return
+        self.refresh_all()
+
     def rename_file(self):
         """Improved file rename with pre-populated name and automatic extension handling"""
         if not self.selected_item or not self.current_directory:
@@ -2664,7 +5189,7 @@ Last Modified: {file.timestamp}
             return
         
         # Check if file with new name already exists
-        if any(f.name == new_full_name for f in self.current_directory.files):
+        if self.current_directory.get_file(new_full_name):
             messagebox.showerror("Error", f"File '{new_full_name}' already exists.")
             return
         
@@ -2674,22 +5199,27 @@ Last Modified: {file.timestamp}
         else:
             self.refresh_content()
 
-    def delete_selected_directory(self):
-        """Delete selected directory(ies) to trash - SIMPLIFIED CONFIRMATION"""
-        if not self.selected_item:
+    def delete_selected_directory(self, directory=None):
+        """Delete selected directory(ies) to trash - SIMPLIFIED CONFIRMATION
+
+        directory is the node a sidebar menu was opened on; it's deleted
+        instead of the icon selection.
+        """
+        if directory is None and not self.selected_item:
             return
 
         if current_user["role"] != UserRole.ADMIN:
             messagebox.showerror("Error", "Only ADMIN can delete directories.")
             return
 
+        if directory is not None:
+            self.delete_directory_node(directory)
+            return
+
         # Handle multiple selection for directories in current directory
         if len(self.selected_items) > 1:
             # Get ALL directory names that exist in current directory
-            dir_names = []
-            for item_name in self.selected_items:
-                if any(d.name == item_name for d in self.current_directory.subdirectories):
-                    dir_names.append(item_name)
+            dir_names = self.selection.names("directory")
 
             if not dir_names:
                 return
@@ -2700,27 +5230,15 @@ Last Modified: {file.timestamp}
             if not result:
                 return
 
-            # Delete each selected directory - CREATE A COPY TO AVOID MODIFICATION DURING ITERATION
-            dirs_to_delete = dir_names.copy()
             success_count = 0
             error_messages = []
 
-            for dirname in dirs_to_delete:
-                try:
-                    # Find directory and move to trash
-                    for subdir in self.current_directory.subdirectories:
-                        if subdir.name == dirname:
-                            # Store original location and parent for restore functionality
-                            subdir.original_location = self.current_directory.name
-                            subdir.original_parent = self.current_directory
-                            trash_dir.subdirectories.append(subdir)
-                            self.current_directory.subdirectories.remove(subdir)
-                            success_count += 1
-                            break
-                    else:
-                        error_messages.append(f"Directory '{dirname}' not found")
-                except Exception as e:
-                    error_messages.append(f"Error deleting '{dirname}': {str(e)}")
+            for dirname in dir_names:
+                msg = self.current_directory.delete_subdirectory(dirname)
+                if msg.startswith("Error"):
+                    error_messages.append(f"{dirname}: {msg}")
+                else:
+                    success_count += 1
 
             # Show results - SIMPLIFIED
             if error_messages:
@@ -2737,14 +5255,11 @@ Last Modified: {file.timestamp}
             return
 
         # Handle root directory deletion - move to trash
-        for i, root in enumerate(root_directories):
+        for root in root_directories:
             if root.name == self.selected_item:
                 if root.name not in ["Trash", "Documents", "Media", "Projects", "System"]:  # Prevent deleting protected directories
                     # Move to trash
-                    root.original_location = "Root"
-                    root.original_parent = None  # Special case for root directories
-                    trash_dir.subdirectories.append(root)
-                    root_directories.remove(root)
+                    move_root_to_trash(root)
                     self.refresh_all()
                     return
                 else:
@@ -2752,20 +5267,35 @@ Last Modified: {file.timestamp}
                     return
 
         # Handle subdirectory deletion from current directory - move to trash
-        if self.current_directory:
-            for subdir in self.current_directory.subdirectories:
-                if subdir.name == self.selected_item:
-                    # Store original location and parent for restore functionality
-                    subdir.original_location = self.current_directory.name
-                    subdir.original_parent = self.current_directory
-                    trash_dir.subdirectories.append(subdir)
-                    self.current_directory.subdirectories.remove(subdir)
-                    self.refresh_all()
-                    return
+        if self.current_directory and self.current_directory.get_subdirectory(self.selected_item):
+            msg = self.current_directory.delete_subdirectory(self.selected_item)
+            if msg.startswith("Error"):
+                messagebox.showerror("Error", msg)
+            self.refresh_all()
+            return
 
         # If we reach here, directory wasn't found
         messagebox.showerror("Error", f"Directory '{self.selected_item}' not found.")
 
+    def delete_directory_node(self, directory):
+        """Move directory to trash, wherever it is in the tree"""
+        if not inode_table.contains(directory):
+            messagebox.showerror("Error", f"Directory '{directory.name}' not found.")
+            return
+        result = messagebox.askyesno("Confirm Delete", f"Are you sure you want to move '{directory.name}' to trash?")
+        if not result:
+            return
+        parent = directory.parent
+        if parent is None:
+            msg = move_root_to_trash(directory)
+        elif parent.get_subdirectory(directory.name) is not directory:
+            msg = f"Error: Directory '{directory.name}' can't be deleted here."  # A same-named Trash entry shadows it
+        else:
+            msg = parent.delete_subdirectory(directory.name)
+        if msg.startswith("Error"):
+            messagebox.showerror("Error", msg)
+        self.refresh_all()
+
     def delete_selected_file(self):
         """Delete selected file(s) to trash - SIMPLIFIED CONFIRMATION"""
         if not self.current_directory:
@@ -2774,10 +5304,7 @@ Last Modified: {file.timestamp}
         # Handle multiple selection
         if len(self.selected_items) > 1:
             # Get ALL file names that exist in current directory
-            file_names = []
-            for item_name in self.selected_items:
-                if any(f.name == item_name for f in self.current_directory.files):
-                    file_names.append(item_name)
+            file_names = self.selection.names("file")
 
             if not file_names:
                 return
@@ -2788,12 +5315,10 @@ Last Modified: {file.timestamp}
             if not result:
                 return
 
-            # Delete each selected file - CREATE A COPY TO AVOID MODIFICATION DURING ITERATION
-            files_to_delete = file_names.copy()
             success_count = 0
             error_messages = []
 
-            for filename in files_to_delete:
+            for filename in file_names:
                 # Use the existing delete_file method
                 msg = self.current_directory.delete_file(filename)
                 if msg.startswith("Error"):
@@ -2823,6 +5348,11 @@ Last Modified: {file.timestamp}
             messagebox.showerror("Error", msg)
         self.refresh_content()
 
+    def selected_node(self, kind):
+        """The one selected file or directory, or None when the selection isn't a single one of kind"""
+        nodes = self.selection.nodes(kind)
+        return nodes[0] if len(nodes) == 1 and len(self.selection) == 1 else None
+
     def restore_selected_file(self):
         """Restore selected file(s) from trash - SIMPLIFIED CONFIRMATION"""
         if not self.current_directory:
@@ -2835,56 +5365,29 @@ Last Modified: {file.timestamp}
         # Handle multiple selection - GET ALL SELECTED FILES
         if len(self.selected_items) > 1:
             # Get ALL file names that exist in current directory
-            file_names = []
-            for item_name in self.selected_items:
-                # Check if this item is actually a file in the current directory
-                if any(f.name == item_name for f in self.current_directory.files):
-                    file_names.append(item_name)
+            files = self.selection.nodes("file")
 
-            if not file_names:
+            if not files:
                 messagebox.showerror("Error", "No files selected for restoration.")
                 return
 
             # SIMPLIFIED confirmation - NO FILE LIST
             result = messagebox.askyesno("Confirm Restore", 
-                                       f"Are you sure you want to restore {len(file_names)} file(s)?")
+                                       f"Are you sure you want to restore {len(files)} file(s)?")
             if not result:
                 return
 
-            # Restore each selected file - CREATE A COPY OF THE LIST TO AVOID MODIFICATION DURING ITERATION
-            files_to_restore = file_names.copy()
             success_count = 0
             error_messages = []
 
-            for filename in files_to_restore:
-                try:
-                    # Find the file object
-                    file_to_restore = None
-                    for f in self.current_directory.files:
-                        if f.name == filename:
-                            file_to_restore = f
-                            break
-                        
-                    if file_to_restore and file_to_restore.original_location:
-                        # Find the original directory
-                        original_dir = find_directory(file_to_restore.original_location)
-                        if original_dir:
-                            # Check if file with same name already exists in original location
-                            if not any(f.name == filename for f in original_dir.files):
-                                # Move file back to original location
-                                file_to_restore.original_location = None  # Clear the trash marker
-                                original_dir.files.append(file_to_restore)
-                                self.current_directory.files.remove(file_to_restore)
-                                success_count += 1
-                                print(f"Successfully restored file: {filename}")
-                            else:
-                                error_messages.append(f"File '{filename}' already exists in original location")
-                        else:
-                            error_messages.append(f"Original location for '{filename}' not found")
-                    else:
-                        error_messages.append(f"File '{filename}' has no original location information")
-                except Exception as e:
-                    error_messages.append(f"Error restoring '{filename}': {str(e)}")
+            # Trash can hold several entries with one name, so act by inode
+            for file in files:
+                msg = self.current_directory.restore_entry(file.inode)
+                if msg.startswith("Error"):
+                    error_messages.append(f"{file.name}: {msg}")
+                else:
+                    success_count += 1
+                    print(f"Successfully restored file: {file.name}")
 
             # Show results - SIMPLIFIED
             if error_messages:
@@ -2906,7 +5409,11 @@ Last Modified: {file.timestamp}
             return
 
         # Restore single file using the existing method
-        msg = self.current_directory.restore_file(self.selected_item)
+        file = self.selected_node("file")
+        if file:
+            msg = self.current_directory.restore_entry(file.inode)
+        else:
+            msg = self.current_directory.restore_file(self.selected_item)
         if msg.startswith("Error"):
             messagebox.showerror("Error", msg)
         else:
@@ -2926,52 +5433,29 @@ Last Modified: {file.timestamp}
         # Handle multiple selection - GET ALL SELECTED DIRECTORIES
         if len(self.selected_items) > 1:
             # Get ALL directory names that exist in current directory
-            dir_names = []
-            for item_name in self.selected_items:
-                # Check if this item is actually a directory in the current directory
-                if any(d.name == item_name for d in self.current_directory.subdirectories):
-                    dir_names.append(item_name)
+            directories = self.selection.nodes("directory")
 
-            if not dir_names:
+            if not directories:
                 messagebox.showerror("Error", "No directories selected for restoration.")
                 return
 
             # SIMPLIFIED confirmation - NO DIRECTORY LIST
             result = messagebox.askyesno("Confirm Restore", 
-                                       f"Are you sure you want to restore {len(dir_names)} directory(ies)?")
+                                       f"Are you sure you want to restore {len(directories)} directory(ies)?")
             if not result:
                 return
 
-            # Restore each selected directory - CREATE A COPY OF THE LIST TO AVOID MODIFICATION DURING ITERATION
-            dirs_to_restore = dir_names.copy()
             success_count = 0
             error_messages = []
 
-            for dirname in dirs_to_restore:
-                try:
-                    # Find the directory object
-                    dir_to_restore = None
-                    for d in self.current_directory.subdirectories:
-                        if d.name == dirname:
-                            dir_to_restore = d
-                            break
-                        
-                    if dir_to_restore and dir_to_restore.original_parent:
-                        # Check if directory with same name already exists in original location
-                        if not any(d.name == dirname for d in dir_to_restore.original_parent.subdirectories):
-                            # Move directory back to original location
-                            dir_to_restore.original_parent.subdirectories.append(dir_to_restore)
-                            dir_to_restore.original_location = None
-                            dir_to_restore.original_parent = None
-                            self.current_directory.subdirectories.remove(dir_to_restore)
-                            success_count += 1
-                            print(f"Successfully restored directory: {dirname}")
-                        else:
-                            error_messages.append(f"Directory '{dirname}' already exists in original location")
-                    else:
-                        error_messages.append(f"Directory '{dirname}' has no original location information")
-                except Exception as e:
-                    error_messages.append(f"Error restoring '{dirname}': {str(e)}")
+            # Trash can hold several entries with one name, so act by inode
+            for directory in directories:
+                msg = self.current_directory.restore_entry(directory.inode)
+                if msg.startswith("Error"):
+                    error_messages.append(f"{directory.name}: {msg}")
+                else:
+                    success_count += 1
+                    print(f"Successfully restored directory: {directory.name}")
 
             # Show results - SIMPLIFIED
             if error_messages:
@@ -2990,7 +5474,11 @@ Last Modified: {file.timestamp}
             return
 
         # Restore single directory using the existing method
-        msg = self.current_directory.restore_directory(self.selected_item)
+        directory = self.selected_node("directory")
+        if directory:
+            msg = self.current_directory.restore_entry(directory.inode)
+        else:
+            msg = self.current_directory.restore_directory(self.selected_item)
         if msg.startswith("Error"):
             messagebox.showerror("Error", msg)
         else:
@@ -3010,45 +5498,29 @@ Last Modified: {file.timestamp}
         # Handle multiple selection - GET ALL SELECTED FILES
         if len(self.selected_items) > 1:
             # Get ALL file names that exist in current directory
-            file_names = []
-            for item_name in self.selected_items:
-                # Check if this item is actually a file in the current directory
-                if any(f.name == item_name for f in self.current_directory.files):
-                    file_names.append(item_name)
+            files = self.selection.nodes("file")
 
-            if not file_names:
+            if not files:
                 messagebox.showerror("Error", "No files selected for deletion.")
                 return
 
             # SIMPLIFIED confirmation - NO FILE LIST
             result = messagebox.askyesno("Confirm Permanent Delete", 
-                                       f"Are you sure you want to permanently delete {len(file_names)} file(s)?\n\nThis action cannot be undone!")
+                                       f"Are you sure you want to permanently delete {len(files)} file(s)?\n\nThis action cannot be undone!")
             if not result:
                 return
 
-            # Delete each selected file - CREATE A COPY OF THE LIST TO AVOID MODIFICATION DURING ITERATION
-            files_to_delete = file_names.copy()
             success_count = 0
             error_messages = []
 
-            for filename in files_to_delete:
-                try:
-                    # Find the file object
-                    file_to_delete = None
-                    for f in self.current_directory.files:
-                        if f.name == filename:
-                            file_to_delete = f
-                            break
-                        
-                    if file_to_delete:
-                        # Remove from the files list
-                        self.current_directory.files.remove(file_to_delete)
-                        success_count += 1
-                        print(f"Successfully deleted file: {filename}")
-                    else:
-                        error_messages.append(f"File '{filename}' not found")
-                except Exception as e:
-                    error_messages.append(f"Error deleting '{filename}': {str(e)}")
+            # Trash can hold several entries with one name, so act by inode
+            for file in files:
+                msg = self.current_directory.purge_entry(file.inode)
+                if msg.startswith("Error"):
+                    error_messages.append(f"{file.name}: {msg}")
+                else:
+                    success_count += 1
+                    print(f"Successfully deleted file: {file.name}")
 
             # Show results - SIMPLIFIED
             if error_messages:
@@ -3074,19 +5546,13 @@ Last Modified: {file.timestamp}
             return
 
         # Delete single file
-        try:
-            file_to_delete = None
-            for f in self.current_directory.files:
-                if f.name == self.selected_item:
-                    file_to_delete = f
-                    break
-                
-            if file_to_delete:
-                self.current_directory.files.remove(file_to_delete)
-            else:
-                messagebox.showerror("Error", f"File '{self.selected_item}' not found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error deleting file: {str(e)}")
+        file = self.selected_node("file")
+        if file:
+            msg = self.current_directory.purge_entry(file.inode)
+        else:
+            msg = self.current_directory.delete_file_permanently(self.selected_item)
+        if msg.startswith("Error"):
+            messagebox.showerror("Error", msg)
 
         self.refresh_content()
 
@@ -3103,10 +5569,8 @@ Last Modified: {file.timestamp}
             return
 
         # Separate files and directories from the selection
-        file_names = [name for name in self.selected_items 
-                     if any(f.name == name for f in self.current_directory.files)]
-        dir_names = [name for name in self.selected_items 
-                    if any(d.name == name for d in self.current_directory.subdirectories)]
+        file_names = self.selection.names("file")
+        dir_names = self.selection.names("directory")
 
         total_items = len(file_names) + len(dir_names)
         
@@ -3139,50 +5603,21 @@ Last Modified: {file.timestamp}
 
         # Delete files first (move to trash)
         for filename in file_names:
-            try:
-                file_to_delete = None
-                for f in self.current_directory.files:
-                    if f.name == filename:
-                        file_to_delete = f
-                        break
-                    
-                if file_to_delete:
-                    if file_to_delete.permissions == 0:
-                        error_messages.append(f"Cannot delete read-only file '{filename}'")
-                        continue
-                    
-                    # Store original location for restore functionality
-                    file_to_delete.original_location = self.current_directory.name
-                    trash_dir.files.append(file_to_delete)
-                    self.current_directory.files.remove(file_to_delete)
-                    success_count += 1
-                    print(f"Successfully moved file to trash: {filename}")
-                else:
-                    error_messages.append(f"File '{filename}' not found")
-            except Exception as e:
-                error_messages.append(f"Error deleting file '{filename}': {str(e)}")
+            msg = self.current_directory.delete_file(filename)
+            if msg.startswith("Error"):
+                error_messages.append(f"{filename}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully moved file to trash: {filename}")
 
         # Delete directories (move to trash)
         for dirname in dir_names:
-            try:
-                dir_to_delete = None
-                for d in self.current_directory.subdirectories:
-                    if d.name == dirname:
-                        dir_to_delete = d
-                        break
-                    
-                if dir_to_delete:
-                    # Store original location and parent for restore functionality
-                    dir_to_delete.original_location = self.current_directory.name
-                    dir_to_delete.original_parent = self.current_directory
-                    trash_dir.subdirectories.append(dir_to_delete)
-                    self.current_directory.subdirectories.remove(dir_to_delete)
-                    success_count += 1
-                    print(f"Successfully moved directory to trash: {dirname}")
-                else:
-                    error_messages.append(f"Directory '{dirname}' not found")
-            except Exception as e:
-                error_messages.append(f"Error deleting directory '{dirname}': {str(e)}")
+            msg = self.current_directory.delete_subdirectory(dirname)
+            if msg.startswith("Error"):
+                error_messages.append(f"{dirname}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully moved directory to trash: {dirname}")
 
         # Show results only if there were errors
         if error_messages:
@@ -3207,12 +5642,10 @@ Last Modified: {file.timestamp}
             return
 
         # Separate files and directories from the selection
-        file_names = [name for name in self.selected_items 
-                     if any(f.name == name for f in self.current_directory.files)]
-        dir_names = [name for name in self.selected_items 
-                    if any(d.name == name for d in self.current_directory.subdirectories)]
+        files = self.selection.nodes("file")
+        directories = self.selection.nodes("directory")
 
-        total_items = len(file_names) + len(dir_names)
+        total_items = len(files) + len(directories)
         
         if total_items == 0:
             messagebox.showerror("Error", "No valid items selected for restoration.")
@@ -3220,10 +5653,10 @@ Last Modified: {file.timestamp}
 
         # Confirmation dialog
         item_breakdown = []
-        if file_names:
-            item_breakdown.append(f"{len(file_names)} file(s)")
-        if dir_names:
-            item_breakdown.append(f"{len(dir_names)} directory(ies)")
+        if files:
+            item_breakdown.append(f"{len(files)} file(s)")
+        if directories:
+            item_breakdown.append(f"{len(directories)} directory(ies)")
         
         items_text = " and ".join(item_breakdown)
         
@@ -3235,56 +5668,23 @@ Last Modified: {file.timestamp}
         success_count = 0
         error_messages = []
 
-        # Restore files first
-        for filename in file_names:
-            try:
-                file_to_restore = None
-                for f in self.current_directory.files:
-                    if f.name == filename:
-                        file_to_restore = f
-                        break
-                    
-                if file_to_restore and file_to_restore.original_location:
-                    original_dir = find_directory(file_to_restore.original_location)
-                    if original_dir:
-                        if not any(f.name == filename for f in original_dir.files):
-                            file_to_restore.original_location = None
-                            original_dir.files.append(file_to_restore)
-                            self.current_directory.files.remove(file_to_restore)
-                            success_count += 1
-                            print(f"Successfully restored file: {filename}")
-                        else:
-                            error_messages.append(f"File '{filename}' already exists in original location")
-                    else:
-                        error_messages.append(f"Original location for file '{filename}' not found")
-                else:
-                    error_messages.append(f"File '{filename}' has no original location information")
-            except Exception as e:
-                error_messages.append(f"Error restoring file '{filename}': {str(e)}")
+        # Restore files first; Trash can hold several entries with one name, so act by inode
+        for file in files:
+            msg = self.current_directory.restore_entry(file.inode)
+            if msg.startswith("Error"):
+                error_messages.append(f"{file.name}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully restored file: {file.name}")
 
         # Restore directories
-        for dirname in dir_names:
-            try:
-                dir_to_restore = None
-                for d in self.current_directory.subdirectories:
-                    if d.name == dirname:
-                        dir_to_restore = d
-                        break
-                    
-                if dir_to_restore and dir_to_restore.original_parent:
-                    if not any(d.name == dirname for d in dir_to_restore.original_parent.subdirectories):
-                        dir_to_restore.original_parent.subdirectories.append(dir_to_restore)
-                        dir_to_restore.original_location = None
-                        dir_to_restore.original_parent = None
-                        self.current_directory.subdirectories.remove(dir_to_restore)
-                        success_count += 1
-                        print(f"Successfully restored directory: {dirname}")
-                    else:
-                        error_messages.append(f"Directory '{dirname}' already exists in original location")
-                else:
-                    error_messages.append(f"Directory '{dirname}' has no original location information")
-            except Exception as e:
-                error_messages.append(f"Error restoring directory '{dirname}': {str(e)}")
+        for directory in directories:
+            msg = self.current_directory.restore_entry(directory.inode)
+            if msg.startswith("Error"):
+                error_messages.append(f"{directory.name}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully restored directory: {directory.name}")
 
         # Show results
         if error_messages:
@@ -3314,12 +5714,10 @@ Last Modified: {file.timestamp}
             return
 
         # Separate files and directories from the selection
-        file_names = [name for name in self.selected_items 
-                     if any(f.name == name for f in self.current_directory.files)]
-        dir_names = [name for name in self.selected_items 
-                    if any(d.name == name for d in self.current_directory.subdirectories)]
+        files = self.selection.nodes("file")
+        directories = self.selection.nodes("directory")
 
-        total_items = len(file_names) + len(dir_names)
+        total_items = len(files) + len(directories)
         
         if total_items == 0:
             messagebox.showerror("Error", "No valid items selected for deletion.")
@@ -3327,10 +5725,10 @@ Last Modified: {file.timestamp}
 
         # Confirmation dialog for mixed selection
         item_breakdown = []
-        if file_names:
-            item_breakdown.append(f"{len(file_names)} file(s)")
-        if dir_names:
-            item_breakdown.append(f"{len(dir_names)} directory(ies)")
+        if files:
+            item_breakdown.append(f"{len(files)} file(s)")
+        if directories:
+            item_breakdown.append(f"{len(directories)} directory(ies)")
         
         items_text = " and ".join(item_breakdown)
         
@@ -3342,41 +5740,23 @@ Last Modified: {file.timestamp}
         success_count = 0
         error_messages = []
 
-        # Delete files first
-        for filename in file_names:
-            try:
-                file_to_delete = None
-                for f in self.current_directory.files:
-                    if f.name == filename:
-                        file_to_delete = f
-                        break
-                    
-                if file_to_delete:
-                    self.current_directory.files.remove(file_to_delete)
-                    success_count += 1
-                    print(f"Successfully deleted file: {filename}")
-                else:
-                    error_messages.append(f"File '{filename}' not found")
-            except Exception as e:
-                error_messages.append(f"Error deleting file '{filename}': {str(e)}")
+        # Delete files first; Trash can hold several entries with one name, so act by inode
+        for file in files:
+            msg = self.current_directory.purge_entry(file.inode)
+            if msg.startswith("Error"):
+                error_messages.append(f"{file.name}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully deleted file: {file.name}")
 
         # Delete directories
-        for dirname in dir_names:
-            try:
-                dir_to_delete = None
-                for d in self.current_directory.subdirectories:
-                    if d.name == dirname:
-                        dir_to_delete = d
-                        break
-                    
-                if dir_to_delete:
-                    self.current_directory.subdirectories.remove(dir_to_delete)
-                    success_count += 1
-                    print(f"Successfully deleted directory: {dirname}")
-                else:
-                    error_messages.append(f"Directory '{dirname}' not found")
-            except Exception as e:
-                error_messages.append(f"Error deleting directory '{dirname}': {str(e)}")
+        for directory in directories:
+            msg = self.current_directory.purge_entry(directory.inode)
+            if msg.startswith("Error"):
+                error_messages.append(f"{directory.name}: {msg}")
+            else:
+                success_count += 1
+                print(f"Successfully deleted directory: {directory.name}")
 
         # Show results
         if error_messages:
@@ -3403,45 +5783,29 @@ Last Modified: {file.timestamp}
         # Handle multiple selection - GET ALL SELECTED DIRECTORIES
         if len(self.selected_items) > 1:
             # Get ALL directory names that exist in current directory
-            dir_names = []
-            for item_name in self.selected_items:
-                # Check if this item is actually a directory in the current directory
-                if any(d.name == item_name for d in self.current_directory.subdirectories):
-                    dir_names.append(item_name)
+            directories = self.selection.nodes("directory")
 
-            if not dir_names:
+            if not directories:
                 messagebox.showerror("Error", "No directories selected for deletion.")
                 return
 
             # SIMPLIFIED confirmation - NO DIRECTORY LIST
             result = messagebox.askyesno("Confirm Permanent Delete", 
-                                       f"Are you sure you want to permanently delete {len(dir_names)} directory(ies) and all their contents?\n\nThis action cannot be undone!")
+                                       f"Are you sure you want to permanently delete {len(directories)} directory(ies) and all their contents?\n\nThis action cannot be undone!")
             if not result:
                 return
 
-            # Delete each selected directory - CREATE A COPY OF THE LIST TO AVOID MODIFICATION DURING ITERATION
-            dirs_to_delete = dir_names.copy()
             success_count = 0
             error_messages = []
 
-            for dirname in dirs_to_delete:
-                try:
-                    # Find the directory object
-                    dir_to_delete = None
-                    for d in self.current_directory.subdirectories:
-                        if d.name == dirname:
-                            dir_to_delete = d
-                            break
-                        
-                    if dir_to_delete:
-                        # Remove from the subdirectories list
-                        self.current_directory.subdirectories.remove(dir_to_delete)
-                        success_count += 1
-                        print(f"Successfully deleted directory: {dirname}")
-                    else:
-                        error_messages.append(f"Directory '{dirname}' not found")
-                except Exception as e:
-                    error_messages.append(f"Error deleting '{dirname}': {str(e)}")
+            # Trash can hold several entries with one name, so act by inode
+            for directory in directories:
+                msg = self.current_directory.purge_entry(directory.inode)
+                if msg.startswith("Error"):
+                    error_messages.append(f"{directory.name}: {msg}")
+                else:
+                    success_count += 1
+                    print(f"Successfully deleted directory: {directory.name}")
 
             # Show results - SIMPLIFIED
             if error_messages:
@@ -3465,19 +5829,13 @@ Last Modified: {file.timestamp}
             return
 
         # Delete single directory
-        try:
-            dir_to_delete = None
-            for d in self.current_directory.subdirectories:
-                if d.name == self.selected_item:
-                    dir_to_delete = d
-                    break
-                
-            if dir_to_delete:
-                self.current_directory.subdirectories.remove(dir_to_delete)
-            else:
-                messagebox.showerror("Error", f"Directory '{self.selected_item}' not found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error deleting directory: {str(e)}")
+        directory = self.selected_node("directory")
+        if directory:
+            msg = self.current_directory.purge_entry(directory.inode)
+        else:
+            msg = self.current_directory.delete_directory_permanently(self.selected_item)
+        if msg.startswith("Error"):
+            messagebox.showerror("Error", msg)
 
         self.refresh_content()
         self.refresh_directory_tree()
@@ -3530,27 +5888,77 @@ Last Modified: {file.timestamp}
 
     def auto_save(self):
         """Auto-save without user dialogs"""
+        # A failed purge must never keep the journal from committing
         try:
-            save_file_system()
+            self.purge_trash_step()
+        except Exception as e:
+            print(f"Trash purge failed: {e}")
+        try:
+            persist_changes()
         except Exception as e:
             print(f"Auto-save failed: {e}")
+            return
+        if checkpoint_writer.busy and not self.checkpoint_polling:
+            self.checkpoint_polling = True
+            self.save_status_label.config(text="Saving...")
+            self.master.after(CHECKPOINT_POLL_MS, self.check_checkpoint)
+
+    def purge_trash_step(self):
+        """Work the trash down to its budget one batch per autosave tick"""
+        purged, reclaimed_bytes, reclaimed_blocks = purge_trash()
+        if not purged:
+            return
+        self.trash_reclaimed_bytes += reclaimed_bytes
+        print(f"Purged {purged} item(s) from trash, reclaiming {format_size(reclaimed_bytes)} "
+              f"and {reclaimed_blocks} blocks")
+        self.save_status_label.config(text=f"Trash purge reclaimed {format_size(self.trash_reclaimed_bytes)}")
+        # Purged folders leave the sidebar; the icon view (and with it the
+        # selection and any search results) is only redrawn if it shows Trash
+        self.refresh_directory_tree()
+        if not inode_table.contains(self.current_directory):
+            self.navigate_to_directory(trash_dir)
+        elif self.current_directory is trash_dir and self.search_scope is None:
+            self.refresh_content()
+
+    def check_checkpoint(self):
+        """Poll the background checkpoint and show its result once it's written"""
+        if not self.master.winfo_exists():
+            return
+        msg = checkpoint_writer.poll()
+        if msg is None:
+            self.master.after(CHECKPOINT_POLL_MS, self.check_checkpoint)
+            return
+        self.checkpoint_polling = False
+        if msg.startswith("Error"):
+            print(f"Auto-save failed: {msg}")
+            self.save_status_label.config(text="Save failed")
+        else:
+            print(f"Checkpoint written ({checkpoint_writer.get_metrics_display()})")
+            self.save_status_label.config(
+                text=f"Saved {format_timestamp(checkpoint_writer.last_saved)} "
+                     f"({checkpoint_writer.write_seconds:.2f} s)")
     
     def setup_auto_save(self):
-        """Set up automatic saving every 5 minutes"""
+        """Group-commit the journal every JOURNAL_COMMIT_INTERVAL_MS, checkpointing when checkpoint_due()"""
+        self.checkpoint_polling = False
+        self.trash_reclaimed_bytes = 0
+
         def auto_save_timer():
             if self.master.winfo_exists():
                 self.auto_save()
                 # Schedule next auto-save
-                self.master.after(300000, auto_save_timer)  # 300000 ms = 5 minutes
+                self.master.after(JOURNAL_COMMIT_INTERVAL_MS, auto_save_timer)
 
         # Start the auto-save timer
-        self.master.after(300000, auto_save_timer)  # First save after 5 minutes
+        self.master.after(JOURNAL_COMMIT_INTERVAL_MS, auto_save_timer)
 
     def on_close(self):
         """Handle application close - save silently without dialogs"""
         try:
-            # Save silently without showing any dialogs
-            save_file_system()
+            # Save silently without showing any dialogs. The journal is enough to
+            # recover from, so only a checkpoint already being written is waited for.
+            checkpoint_writer.wait()
+            journal.commit()
         except Exception as e:
             # Only print error to console, don't show dialogs during close
             print(f"Warning: Could not save state during close: {e}")
@@ -3575,6 +5983,10 @@ Last Modified: {file.timestamp}
 
 # Run app
 if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--convert":
+        # python file_management_system.py --convert file_system_state.json file_system_state.fsb
+        print(convert_snapshot(sys.argv[2], sys.argv[3]))
+        sys.exit(0)
     root_tk = tk.Tk()
     app = FileSystemApp(root_tk)
     root_tk.mainloop()
\ No newline at end of file
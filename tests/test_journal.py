@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+import file_management_system as fms
+
+
+class JournalTornTailTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.path = "journal.jsonl"
+
+    def tearDown(self):
+        os.chdir(self.saved_cwd)
+
+    def write_torn_journal(self):
+        journal = fms.Journal(self.path)
+        journal.record("create_file", None, "one.txt")
+        journal.commit()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"seq": 2, "op": "create_fi')  # Crash mid-append
+
+    def test_commit_after_reopen_starts_on_a_fresh_line(self):
+        self.write_torn_journal()
+        journal = fms.Journal(self.path)
+        journal.seq = 1
+        journal.record("create_file", None, "two.txt")
+        journal.commit()
+
+        reloaded = list(fms.Journal(self.path).read())
+        self.assertEqual([entry["args"] for entry in reloaded], [["one.txt"], ["two.txt"]])
+        self.assertEqual(journal.size, os.path.getsize(self.path))
+
+    def test_later_records_survive_discard_through(self):
+        self.write_torn_journal()
+        journal = fms.Journal(self.path)
+        journal.seq = 1
+        for name in ("two.txt", "three.txt"):
+            journal.record("create_file", None, name)
+            journal.commit()
+        journal.discard_through(2)
+
+        self.assertEqual([entry["args"] for entry in fms.Journal(self.path).read()], [["three.txt"]])
+
+
+if __name__ == "__main__":
+    unittest.main()